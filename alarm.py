@@ -0,0 +1,314 @@
+"""
+Audible expiry alarm with a preloaded, pre-decoded sound.
+
+The sound is decoded into memory and the audio sink is opened when a
+countdown starts, not when it expires. The alarm has its own playback
+thread, which waits on an event, so expiry only sets that event. The first
+chunk of samples reaches the sink within a thread wakeup of the expiry, and
+the GUI thread never waits on audio.
+
+Sinks:
+
+- device: plays through ``aplay`` or ``paplay``, started when the alarm is
+  prepared and waiting on its input (Linux), or else through ``winsound``
+  from a WAV file written when the alarm is prepared (Windows)
+- file:PATH: writes what would be played to a WAV file
+- null: discards the samples, for headless runs and measurements
+"""
+import array
+import collections
+import logging
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+
+SAMPLE_RATE = 44100
+
+logger = logging.getLogger("countdown.alarm")
+
+# Commands playing raw signed 16-bit little-endian mono or stereo samples
+# from their input, by executable name
+PLAYERS = {
+    "aplay": ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", "{rate}", "-c", "{channels}"],
+    "paplay": ["paplay", "--raw", "--format=s16le", "--rate={rate}",
+               "--channels={channels}"],
+}
+
+
+class Sound:
+    """Decoded PCM frames and their format"""
+
+    def __init__(self, frames, rate=SAMPLE_RATE, channels=1, width=2):
+        self.frames = frames
+        self.rate = rate
+        self.channels = channels
+        # Bytes per sample
+        self.width = width
+
+    @property
+    def frame_size(self):
+        return self.channels * self.width
+
+    @property
+    def duration(self):
+        return len(self.frames) / (self.frame_size * self.rate)
+
+    @classmethod
+    def load(cls, path):
+        """Decode a 16-bit WAV file"""
+        with wave.open(path, "rb") as file:
+            if file.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit WAV files are supported")
+            return cls(file.readframes(file.getnframes()), file.getframerate(),
+                       file.getnchannels(), file.getsampwidth())
+
+    @classmethod
+    def tone(cls, frequency=880.0, beeps=3, beep=0.2, gap=0.1, volume=0.5,
+             rate=SAMPLE_RATE):
+        """Synthesize a few short beeps"""
+        amplitude = int(32767 * volume)
+        step = 2 * math.pi * frequency / rate
+        samples = array.array("h")
+        for _ in range(beeps):
+            samples.extend(int(amplitude * math.sin(step * index))
+                           for index in range(int(beep * rate)))
+            samples.extend([0] * int(gap * rate))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        return cls(samples.tobytes(), rate)
+
+
+class NullSink:
+    """Discard the samples"""
+
+    def open(self, sound):
+        pass
+
+    def write(self, data):
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Write the samples to a WAV file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def open(self, sound):
+        self._file = wave.open(self.path, "wb")
+        self._file.setnchannels(sound.channels)
+        self._file.setsampwidth(sound.width)
+        self._file.setframerate(sound.rate)
+
+    def write(self, data):
+        self._file.writeframesraw(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class DeviceSink:
+    """Play the samples through a command-line player reading its input"""
+
+    def __init__(self, command):
+        self.command = command
+        self._process = None
+
+    @classmethod
+    def find(cls):
+        """Return a sink for the first player installed, None if there is none"""
+        for name, command in PLAYERS.items():
+            if shutil.which(name):
+                return cls(command)
+        return None
+
+    def open(self, sound):
+        command = [part.format(rate=sound.rate, channels=sound.channels)
+                   for part in self.command]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE,
+                                         stdout=subprocess.DEVNULL,
+                                         stderr=subprocess.DEVNULL)
+
+    def write(self, data):
+        self._process.stdin.write(data)
+        self._process.stdin.flush()
+
+    def close(self):
+        if self._process is not None:
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._process.wait()
+            self._process = None
+
+
+class WinSoundSink:
+    """
+    Play the samples with winsound (Windows): the sound is written to a
+    WAV file when the sink is opened and played asynchronously on the first
+    write, each write then waiting for as long as its samples play, so a
+    stop takes effect within a chunk
+    """
+
+    def __init__(self, winsound):
+        self.winsound = winsound
+        self._path = None
+        self._bytes_per_second = 0
+        self._playing = False
+
+    @classmethod
+    def find(cls):
+        """Return a sink if winsound is available, None if it is not"""
+        try:
+            import winsound
+        except ImportError:
+            return None
+        return cls(winsound)
+
+    def open(self, sound):
+        descriptor, self._path = tempfile.mkstemp(prefix="countdown-alarm-", suffix=".wav")
+        with os.fdopen(descriptor, "wb") as file, wave.open(file, "wb") as output:
+            output.setnchannels(sound.channels)
+            output.setsampwidth(sound.width)
+            output.setframerate(sound.rate)
+            output.writeframes(sound.frames)
+        self._bytes_per_second = sound.rate * sound.frame_size
+
+    def write(self, data):
+        if not self._playing:
+            self.winsound.PlaySound(self._path, self.winsound.SND_FILENAME
+                                    | self.winsound.SND_ASYNC | self.winsound.SND_NODEFAULT)
+            self._playing = True
+        time.sleep(len(data) / self._bytes_per_second)
+
+    def close(self):
+        if self._playing:
+            self.winsound.PlaySound(None, 0)
+            self._playing = False
+        if self._path is not None:
+            try:
+                os.remove(self._path)
+            except OSError:
+                pass
+            self._path = None
+
+
+def make_alarm(sink="device", path=None):
+    """
+    Return an alarm playing the WAV file at path, or a built-in tone, through
+    the named sink, or None when the sink is off or no player is available
+    """
+    if sink == "off":
+        return None
+    if sink == "null":
+        return AlarmPlayer(NullSink(), path)
+    if sink.startswith("file:"):
+        return AlarmPlayer(FileSink(sink[len("file:"):]), path)
+    if sink == "device":
+        device = DeviceSink.find() or WinSoundSink.find()
+        if device is None:
+            logger.warning("no audio player found (%s or winsound), the alarm is silent",
+                           ", ".join(PLAYERS))
+            return None
+        return AlarmPlayer(device, path)
+    raise ValueError(f"unknown alarm sink: {sink}")
+
+
+class AlarmPlayer:
+    """Play a preloaded sound on a dedicated thread"""
+
+    # Frames written to the sink at a time, about 23ms at 44.1kHz
+    CHUNK_FRAMES = 1024
+
+    def __init__(self, sink, path=None, clock=time.perf_counter, history=256):
+        self.sink = sink
+        # WAV file to play, None for the built-in tone
+        self.path = path
+        self.clock = clock
+        self.sound = None
+        # Seconds from each play() to its first samples reaching the sink
+        self.latency = collections.deque(maxlen=history)
+        self._open = False
+        self._requested = None
+        # Whether a play() is waiting for the playback thread
+        self._pending = False
+        self._lock = threading.Lock()
+        # Wakes the playback thread, to prepare, play or close
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="alarm", daemon=True)
+        self._thread.start()
+
+    def prepare(self):
+        """
+        Decode the sound and open the sink ahead of the expiry, on the
+        playback thread and without waiting, once any ringing is over
+        """
+        self._wake.set()
+
+    def play(self):
+        """Start playing, from any thread and without waiting"""
+        self._requested = self.clock()
+        self._stop.clear()
+        self._pending = True
+        self._wake.set()
+
+    def stop(self):
+        """Stop a sound that is playing"""
+        self._stop.set()
+
+    def close(self):
+        """Stop playing, close the sink and end the playback thread"""
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _prepare(self):
+        if self.sound is None:
+            self.sound = Sound.load(self.path) if self.path else Sound.tone()
+        if not self._open:
+            self.sink.open(self.sound)
+            self._open = True
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                break
+            with self._lock:
+                # Decoding here only happens when prepare() was not called
+                self._prepare()
+                if not self._pending:
+                    continue
+                self._pending = False
+                frames = self.sound.frames
+                chunk = self.CHUNK_FRAMES * self.sound.frame_size
+                for offset in range(0, len(frames), chunk):
+                    if self._stop.is_set():
+                        break
+                    if offset == 0:
+                        self.latency.append(self.clock() - self._requested)
+                    self.sink.write(frames[offset:offset + chunk])
+                self.sink.close()
+                self._open = False
+        with self._lock:
+            if self._open:
+                self.sink.close()
+                self._open = False
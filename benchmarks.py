@@ -0,0 +1,1325 @@
+"""
+Benchmarks for the countdown timer.
+
+Run ``python benchmarks.py`` to run every benchmark, or
+``python benchmarks.py <name> ...`` to run only some of them. Add
+``--json results.json`` to write the results in a machine-readable form.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from countdown_core import Countdown, FakeClock, get_time
+from render import Renderer
+from scheduler import Scheduler
+
+
+# Registered benchmarks, by command line name
+BENCHMARKS = {}
+
+# QApplication of the benchmarks run in this process, created on first use
+_application = None
+
+# Directory of the application modules
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Run in a fresh interpreter to time importing the application and
+# getting its tray icon up
+STARTUP_PROBE = """
+import json, sys, time
+begin = time.perf_counter()
+import countdown_app
+imported = time.perf_counter()
+app, widget = countdown_app.create_app(sys.argv[:1])
+app.processEvents()
+visible = time.perf_counter()
+print(json.dumps({"import": imported - begin, "tray_visible": visible - begin,
+                  "window_built": widget.layout_created}))
+"""
+
+# Run in a fresh interpreter to measure resident memory with the tray
+# only, with the window open and after closing it again
+WINDOW_MEMORY_PROBE = """
+import json, sys
+import countdown_app
+from benchmarks import rss_bytes
+app, widget = countdown_app.create_app(sys.argv)
+app.processEvents()
+result = {"tray_only": rss_bytes(), "opened": [], "closed": []}
+for _ in range(int(sys.argv[1])):
+    widget.open_window()
+    app.processEvents()
+    result["opened"].append(rss_bytes())
+    widget.close()
+    app.processEvents()
+    result["closed"].append(rss_bytes())
+print(json.dumps(result))
+"""
+
+# Run in a fresh interpreter to leave the widget ticking in one state for
+# a number of seconds, and measure tick latency, wakeups, CPU and memory.
+# A tick is due when the display timer was last armed for, by whichever
+# path armed it
+IDLE_COST_PROBE = """
+import json, sys, time
+from PyQt5.QtCore import QTimer
+from benchmarks import qt_application, rss_bytes
+app = qt_application()
+from countdown_app import CountdownWidget
+state, seconds = sys.argv[1], float(sys.argv[2])
+widget = CountdownWidget(time_left=24 * 3600, reset_value=1500, break_time=300)
+widget.create_layout_menu()
+widget.show_notification = lambda title, message: None
+if state == "running":
+    widget.open_window()
+latency, wakeups, due, fired = [], [], [None], []
+start_timer = widget.timer.start
+def arm(msec):
+    due[0] = time.monotonic() + msec / 1000
+    start_timer(msec)
+widget.timer.start = arm
+# Connected around update_timer, which arms the next tick, so latency
+# runs from the due time of this one up to the display update
+widget.timer.timeout.disconnect(widget.update_timer)
+widget.timer.timeout.connect(lambda: fired.append(due[0]))
+widget.timer.timeout.connect(widget.update_timer)
+def tick():
+    now = time.monotonic()
+    wakeups.append(now)
+    latency.append(now - fired.pop())
+widget.timer.timeout.connect(tick)
+widget.wakeup.timeout.connect(lambda: wakeups.append(time.monotonic()))
+app.processEvents()
+if state != "paused":
+    widget.start()
+rss, cpu, begin = rss_bytes(), time.process_time(), time.monotonic()
+QTimer.singleShot(int(seconds * 1000), app.quit)
+app.exec_()
+elapsed = time.monotonic() - begin
+print(json.dumps({"elapsed": elapsed, "latency": latency, "wakeups": len(wakeups),
+                  "cpu": time.process_time() - cpu, "rss": rss}))
+"""
+
+# Run in a fresh interpreter to leave the widget in one state for a number
+# of hours simulated on a fake clock, every tick firing on the way, and
+# print resident memory after each hour
+MEMORY_GROWTH_PROBE = """
+import json, sys
+from benchmarks import qt_application, rss_bytes
+app = qt_application()
+from countdown_app import CountdownWidget
+from countdown_core import FakeClock
+state, hours = sys.argv[1], int(sys.argv[2])
+clock = FakeClock()
+widget = CountdownWidget(time_left=(hours + 1) * 3600, reset_value=1500, break_time=300,
+                         clock=clock)
+widget.create_layout_menu()
+widget.show_notification = lambda title, message: None
+if state == "running":
+    widget.open_window()
+if state != "paused":
+    widget.start()
+samples = []
+for _ in range(hours):
+    for _ in range(60):
+        clock.advance(60)
+        app.processEvents()
+    samples.append(rss_bytes())
+print(json.dumps(samples))
+"""
+
+# Run in a fresh interpreter to follow the event stream of a status
+# server with a number of clients and print their delivery latencies
+EVENT_CLIENTS_PROBE = """
+import asyncio, json, sys
+from benchmarks import follow_events
+port, count, ticks = (int(arg) for arg in sys.argv[1:])
+print(json.dumps(asyncio.run(follow_events(port, count, ticks))))
+"""
+
+# Run in a fresh interpreter to time getting the tray icon up in a locale,
+# loading its catalog included, and measure resident memory once it is
+LOCALE_PROBE = """
+import json, sys, time
+begin = time.perf_counter()
+import countdown_app
+from benchmarks import rss_bytes
+imported = time.perf_counter()
+app, widget = countdown_app.create_app(sys.argv[:1], sys.argv[1])
+app.processEvents()
+visible = time.perf_counter()
+print(json.dumps({"import": imported - begin, "tray_visible": visible - begin,
+                  "rss": rss_bytes(), "messages": len(widget.catalog)}))
+"""
+
+
+def benchmark(func):
+    """Register a benchmark under its function name"""
+    BENCHMARKS[func.__name__.replace("_", "-")] = func
+    return func
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    """Return the given percentiles of samples, by percentile"""
+    ordered = sorted(samples)
+    return {point: ordered[min(len(ordered) - 1, len(ordered) * point // 100)]
+            for point in points}
+
+
+def rss_bytes():
+    """Return the resident set size of this process in bytes (Linux only)"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def probe_env(home):
+    """
+    Return the environment of a probe interpreter: the offscreen platform,
+    and home, a scratch directory, as the home directory, so create_app
+    neither reads nor writes the user's own ~/.countdown
+    """
+    return dict(os.environ, QT_QPA_PLATFORM="offscreen", HOME=home, USERPROFILE=home)
+
+
+def qt_application():
+    """
+    Return the QApplication, creating it on the offscreen platform and
+    keeping it alive for the callers that drop it
+    """
+    global _application
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    if _application is None:
+        _application = QApplication.instance() or QApplication([])
+    return _application
+
+
+@benchmark
+def drift(duration=3600, max_lateness=0.05, seed=0):
+    """
+    Simulate a long countdown on a loaded machine, where every timeout
+    arrives up to max_lateness seconds late, and compare how late the
+    per-tick decrement and the deadline countdown expire
+    """
+    rng = random.Random(seed)
+
+    # Per-tick decrement: every late timeout adds to the total run time
+    now = 0.0
+    time_left = duration
+    while time_left >= 0:
+        now += 1.0 + rng.uniform(0, max_lateness)
+        time_left -= 1
+    decrement_error = now - duration
+
+    # Deadline countdown: every tick is re-armed from the deadline
+    now = 0.0
+    countdown = Countdown(duration, clock=lambda: now)
+    countdown.start()
+    while not countdown.expired():
+        now += countdown.seconds_to_next_change() + rng.uniform(0, max_lateness)
+    deadline_error = now - duration
+
+    print(f"drift over {duration}s with up to {max_lateness * 1000:.0f}ms late ticks")
+    print(f"  per-tick decrement: expired {decrement_error:.3f}s late")
+    print(f"  deadline countdown: expired {deadline_error:.3f}s late")
+    return {"decrement_error": decrement_error, "deadline_error": deadline_error}
+
+
+@benchmark
+def scheduler(count=10000, seed=0):
+    """
+    Drive many concurrent countdowns from one scheduler and time insert,
+    cancel, the idle tick and firing every entry
+    """
+    rng = random.Random(seed)
+    now = 0.0
+    wakeups = []
+    sched = Scheduler(clock=lambda: now)
+    sched.on_rearm = wakeups.append
+
+    begin = time.perf_counter()
+    for index in range(count):
+        sched.add_countdown(index, rng.uniform(1, 3600))
+        sched.start(index)
+    insert = (time.perf_counter() - begin) / count
+
+    begin = time.perf_counter()
+    for _ in range(count):
+        sched.run_due()
+    idle_tick = (time.perf_counter() - begin) / count
+
+    begin = time.perf_counter()
+    for index in range(0, count, 2):
+        sched.pause(index)
+    cancel = (time.perf_counter() - begin) / (count // 2)
+
+    now = 3600.0
+    begin = time.perf_counter()
+    fired = sched.run_due()
+    fire = (time.perf_counter() - begin) / max(1, len(fired))
+
+    print(f"scheduler with {count} timers, {len(wakeups)} wakeup re-arms")
+    print(f"  insert:    {insert * 1e6:.2f}us per timer")
+    print(f"  idle tick: {idle_tick * 1e6:.2f}us")
+    print(f"  cancel:    {cancel * 1e6:.2f}us per timer")
+    print(f"  fire:      {fire * 1e6:.2f}us per timer ({len(fired)} fired)")
+    return {"insert": insert, "idle_tick": idle_tick, "cancel": cancel, "fire": fire}
+
+
+@benchmark
+def render(minutes=60):
+    """
+    Count the native calls the dirty-checked renderer makes for a running
+    countdown, with the window shown and with only the tray shown
+    """
+    results = {}
+    for state, visible, step in (("shown", True, 1), ("hidden", False, 10)):
+        now = 0.0
+        calls = []
+        renderer = Renderer(clock=lambda: now)
+        renderer.add("label", calls.append, lambda: visible)
+        renderer.add("menu", calls.append, lambda: False)
+        renderer.add("tooltip", calls.append)
+        renderer.add("icon", calls.append)
+        countdown = Countdown(minutes * 60, clock=lambda: now)
+        countdown.start()
+        ticks = 0
+        while not countdown.expired():
+            now += countdown.seconds_to_next_change(step)
+            ticks += 1
+            hours, mins, secs = get_time(countdown.time_left())
+            text = f"Time left: {countdown.time_left() // 60:02d}:{secs:02d}"
+            renderer.render({"label": f"{hours:02d}:{mins:02d}:{secs:02d}",
+                             "menu": text, "tooltip": text, "icon": "icon"})
+        # Every tick used to push all four surfaces, once per second
+        before = 4 * 60
+        after = renderer.stats.per_minute(renderer.stats.pushed)
+        print(f"render with the window {state}, {ticks} ticks")
+        print(f"  native calls: {before:.0f}/min before, {after:.1f}/min now")
+        print(f"  {renderer.stats.summary()}")
+        results[state] = {"before": before, "after": after}
+    return results
+
+
+@benchmark
+def tray_icon(duration=3600):
+    """
+    Time the per-tick cost of the dynamic tray icon over a whole
+    countdown, with the frame cache cold and pre-warmed
+    """
+    qt_application()
+    from tray_icons import TrayIconRenderer
+
+    results = {}
+    for state in ("cold", "warm"):
+        icons = TrayIconRenderer()
+        begin = time.perf_counter()
+        if state == "warm":
+            icons.prewarm(duration, duration)
+        prewarm = time.perf_counter() - begin
+        begin = time.perf_counter()
+        for time_left in range(duration, -1, -1):
+            icons.icon(time_left, 1.0 - time_left / duration)
+        per_tick = (time.perf_counter() - begin) / (duration + 1)
+        print(f"tray icon over {duration} ticks, cache {state}")
+        print(f"  prewarm:  {prewarm * 1000:.1f}ms")
+        print(f"  per tick: {per_tick * 1e6:.2f}us "
+              f"({icons.hits} hits, {icons.misses} misses)")
+        results[state] = {"prewarm": prewarm, "per_tick": per_tick}
+    return results
+
+
+@benchmark
+def startup(runs=5, budget=0.5):
+    """
+    Time importing the application and showing its tray icon in a fresh
+    interpreter on the offscreen platform, against a budget in seconds
+    """
+    samples = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as home:
+            begin = time.perf_counter()
+            output = subprocess.run([sys.executable, "-c", STARTUP_PROBE], cwd=ROOT,
+                                    env=probe_env(home), check=True, capture_output=True,
+                                    text=True).stdout
+        sample = json.loads(output.splitlines()[-1])
+        sample["process"] = time.perf_counter() - begin
+        samples.append(sample)
+    result = {key: statistics.median(sample[key] for sample in samples)
+              for key in ("import", "tray_visible", "process")}
+    result["window_built"] = any(sample["window_built"] for sample in samples)
+    verdict = "within" if result["tray_visible"] <= budget else "OVER"
+    print(f"startup, median of {runs} runs")
+    print(f"  import:       {result['import'] * 1000:.1f}ms")
+    print(f"  tray visible: {result['tray_visible'] * 1000:.1f}ms "
+          f"({verdict} the {budget * 1000:.0f}ms budget)")
+    print(f"  process:      {result['process'] * 1000:.1f}ms")
+    print(f"  window built at startup: {result['window_built']}")
+    return result
+
+
+@benchmark
+def window_memory(cycles=5):
+    """
+    Measure resident memory with the tray only, with the window open and
+    after closing it again, over open/close cycles
+    """
+    with tempfile.TemporaryDirectory() as home:
+        output = subprocess.run([sys.executable, "-c", WINDOW_MEMORY_PROBE, str(cycles)],
+                                cwd=ROOT, env=probe_env(home), check=True,
+                                capture_output=True, text=True).stdout
+    result = json.loads(output.splitlines()[-1])
+    mib = 1024 * 1024
+    print(f"window memory, {cycles} open/close cycles")
+    print(f"  tray only:    {result['tray_only'] / mib:.1f}MiB")
+    print(f"  window open:  {result['opened'][-1] / mib:.1f}MiB")
+    print(f"  after close:  {result['closed'][-1] / mib:.1f}MiB "
+          f"(first cycle {result['closed'][0] / mib:.1f}MiB)")
+    return result
+
+
+def control_round_trips(path, count):
+    """Send count status commands over one connection and time each of them"""
+    from control import ControlClient
+    client = ControlClient(path)
+    samples = []
+    for _ in range(count):
+        begin = time.perf_counter()
+        client.send("status")
+        samples.append(time.perf_counter() - begin)
+    client.close()
+    return samples
+
+
+@benchmark
+def control(count=2000):
+    """
+    Time control socket round trips and throughput, with commands answered
+    on the server thread and handed to the Qt GUI thread
+    """
+    from control import ControlServer, gui_dispatcher
+
+    path = os.path.join(tempfile.mkdtemp(), "control.sock")
+
+    def handler(command, args):
+        return {"command": command}
+
+    results = {}
+    server = ControlServer(path, handler)
+    server.start()
+    results["server-thread"] = control_round_trips(path, count)
+    server.stop()
+
+    app = qt_application()
+    from PyQt5.QtCore import QTimer
+    server = ControlServer(path, gui_dispatcher(handler))
+    server.start()
+    samples = []
+    client = threading.Thread(target=lambda: samples.extend(control_round_trips(path, count)))
+    poll = QTimer()
+    poll.timeout.connect(lambda: client.is_alive() or app.quit())
+    poll.start(10)
+    client.start()
+    app.exec_()
+    server.stop()
+    results["gui-thread"] = samples
+
+    for mode, samples in results.items():
+        points = percentiles(samples)
+        print(f"control socket, {count} commands answered on the {mode}")
+        print("  round trip: " + ", ".join(f"p{point} {value * 1e6:.0f}us"
+                                          for point, value in points.items()))
+        print(f"  throughput: {len(samples) / sum(samples):.0f} commands/s")
+        results[mode] = {"percentiles": points, "throughput": len(samples) / sum(samples)}
+    return results
+
+
+@benchmark
+def simulated_day(blocks=8, work=3600, rest=900):
+    """
+    Run a whole day of work and break countdowns through the real widget
+    on a fake clock and the offscreen platform, and time it
+    """
+    qt_application()
+    from countdown_app import CountdownWidget
+
+    clock = FakeClock()
+    widget = CountdownWidget(time_left=1800, reset_value=work, break_time=rest, clock=clock)
+    widget.create_layout_menu()
+    notifications = []
+    widget.show_notification = lambda title, message: notifications.append(title)
+    ticks = []
+    widget.timer.timeout.connect(lambda: ticks.append(clock.monotonic()))
+
+    begin = time.perf_counter()
+    for _ in range(blocks):
+        widget.custom_countdown()
+        clock.advance(work + 1)
+        widget.break_time_countdown()
+        clock.advance(rest + 1)
+    elapsed = time.perf_counter() - begin
+
+    expired = notifications.count("Time's up")
+    print(f"simulated day of {blocks} work/break blocks, "
+          f"{clock.monotonic() / 3600:.1f}h of countdown")
+    print(f"  ran in {elapsed * 1000:.0f}ms, {len(ticks)} ticks, "
+          f"{expired} of {2 * blocks} expiries notified")
+    return {"elapsed": elapsed, "ticks": len(ticks), "expired": expired}
+
+
+@benchmark
+def worker_expiry(rounds=20, delay=0.05, block=0.2):
+    """
+    Block the GUI thread across a deadline and compare how late the expiry
+    fires on the timing worker thread and on a GUI-thread wakeup
+    """
+    app = qt_application()
+    from PyQt5.QtCore import QObject, QTimer, Qt, pyqtSlot
+    from timing_worker import TimingWorker
+
+    fired = {}
+
+    class Receiver(QObject):
+        # Lives in the GUI thread, so worker expiries are queued to it
+        @pyqtSlot(object)
+        def expire(self, name):
+            fired[name] = time.monotonic()
+
+    scheduler = Scheduler()
+    worker = TimingWorker(scheduler)
+    scheduler.on_rearm = worker.arm
+    receiver = Receiver()
+    worker.expired.connect(receiver.expire)
+    worker.start()
+
+    worker_late, delivered_late, gui_late = [], [], []
+    for index in range(rounds):
+        name = f"alarm-{index}"
+        scheduler.add_alarm(name, delay, worker.fire)
+        deadline = time.monotonic() + delay
+        wakeup = QTimer()
+        wakeup.setSingleShot(True)
+        wakeup.setTimerType(Qt.PreciseTimer)
+        wakeup.timeout.connect(lambda: fired.setdefault("gui", time.monotonic()))
+        wakeup.start(int(delay * 1000))
+        # A slow native call or notification backend holding the GUI thread
+        time.sleep(block)
+        while name not in fired or "gui" not in fired:
+            app.processEvents()
+        worker_late.append(worker.lateness[-1])
+        delivered_late.append(fired.pop(name) - deadline)
+        gui_late.append(fired.pop("gui") - deadline)
+    worker.stop()
+
+    print(f"expiry lateness with the GUI thread blocked {block * 1000:.0f}ms "
+          f"across a {delay * 1000:.0f}ms deadline, {rounds} rounds")
+    results = {}
+    for label, samples in (("worker thread fired", worker_late),
+                           ("GUI notified", delivered_late),
+                           ("GUI-thread wakeup", gui_late)):
+        points = percentiles(samples)
+        print(f"  {label + ':':21s}" + ", ".join(f"p{point} {value * 1000:.1f}ms"
+                                                for point, value in points.items()))
+        results[label] = points
+    return results
+
+
+@benchmark
+def idle_cost(seconds=30, simulated_hours=24, growth_budget=1024 * 1024):
+    """
+    Leave the real widget running with its window open, running with only
+    the tray shown, and paused, each in a fresh interpreter on the
+    offscreen platform, and report tick latency and jitter, wakeups per
+    minute and CPU time per hour. Then simulate simulated_hours in each
+    state on a fake clock and report resident memory growth, from the end
+    of the first hour to the end of the last, against a budget in bytes
+    """
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    results = {}
+    for state in ("running", "hidden", "paused"):
+        output = subprocess.run([sys.executable, "-c", IDLE_COST_PROBE, state, str(seconds)],
+                                cwd=ROOT, env=env, check=True, capture_output=True,
+                                text=True).stdout
+        sample = json.loads(output.splitlines()[-1])
+        output = subprocess.run([sys.executable, "-c", MEMORY_GROWTH_PROBE, state,
+                                 str(simulated_hours)], cwd=ROOT, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        rss = json.loads(output.splitlines()[-1])
+        hours = sample["elapsed"] / 3600
+        latency = sample["latency"]
+        result = {
+            "ticks": len(latency),
+            "latency": percentiles(latency) if latency else {},
+            "jitter": statistics.pstdev(latency) if latency else 0.0,
+            "wakeups_per_minute": sample["wakeups"] / (hours * 60),
+            "cpu_per_hour": sample["cpu"] / hours,
+            "rss": sample["rss"],
+            # The first hour warms the caches up
+            "rss_growth": rss[-1] - rss[0],
+            "rss_per_hour": (rss[-1] - rss[0]) / max(1, len(rss) - 1),
+        }
+        results[state] = result
+        print(f"idle cost, {state}, {sample['elapsed']:.0f}s")
+        if latency:
+            print("  tick latency: " + ", ".join(
+                f"p{point} {value * 1000:.2f}ms"
+                for point, value in result["latency"].items())
+                + f", jitter {result['jitter'] * 1000:.2f}ms")
+        print(f"  wakeups:      {result['wakeups_per_minute']:.1f}/min")
+        print(f"  CPU:          {result['cpu_per_hour']:.2f}s per hour")
+        verdict = "within" if result["rss_growth"] <= growth_budget else "OVER"
+        print(f"  memory:       {result['rss'] / 1024 / 1024:.1f}MiB, "
+              f"{result['rss_growth'] / 1024:+.0f}KiB over {simulated_hours - 1} simulated hours "
+              f"({verdict} the {growth_budget / 1024:.0f}KiB budget)")
+    return results
+
+
+@benchmark
+def metrics_overhead(calls=20000):
+    """
+    Time the widget's hot paths with metrics disabled and enabled, on a
+    fake clock and the offscreen platform, and check that disabling them
+    leaves the hot paths untouched
+    """
+    qt_application()
+    import countdown_app
+    from metrics import HOT_PATHS, Metrics
+
+    original = {name: vars(countdown_app.CountdownWidget)[name] for name in HOT_PATHS}
+
+    class InstrumentedWidget(countdown_app.CountdownWidget):
+        pass
+
+    metrics = Metrics()
+    metrics.instrument(InstrumentedWidget)
+    untouched = all(vars(countdown_app.CountdownWidget)[name] is func
+                    for name, func in original.items())
+
+    results = {"untouched": untouched}
+    for state, cls in (("disabled", countdown_app.CountdownWidget),
+                       ("enabled", InstrumentedWidget)):
+        clock = FakeClock()
+        widget = cls(time_left=24 * 3600, reset_value=1500, break_time=300, clock=clock)
+        widget.create_layout_menu()
+        widget.show_notification = lambda title, message: None
+        widget.start()
+        begin = time.perf_counter()
+        for _ in range(calls):
+            clock.advance(1)
+        results[state] = (time.perf_counter() - begin) / calls
+    overhead = results["enabled"] - results["disabled"]
+    lateness = metrics.histograms["tick_lateness"]
+    print(f"metrics overhead over {calls} simulated ticks")
+    print(f"  disabled: {results['disabled'] * 1e6:.2f}us per tick, hot paths "
+          + ("untouched" if untouched else "MODIFIED"))
+    print(f"  enabled:  {results['enabled'] * 1e6:.2f}us per tick "
+          f"({overhead * 1e6:+.2f}us)")
+    print("  recorded: " + ", ".join(f"{name} {histogram.count}"
+                                    for name, histogram in metrics.histograms.items()))
+    print(f"  tick lateness p99 bucket: {lateness.quantile(0.99) * 1000:.2f}ms")
+    results["overhead"] = overhead
+    return results
+
+
+@benchmark
+def notification_burst(clicks=1000, interval=0.05, backend_delay=0.02):
+    """
+    Send a burst of start notifications, one every interval seconds, through
+    the dispatcher on a fake clock with a backend that blocks for
+    backend_delay seconds, and time the timer path
+    """
+    from notifications import NotificationDispatcher
+
+    class SlowBackend:
+        def __init__(self):
+            self.shown = 0
+
+        def show(self, title, message):
+            time.sleep(backend_delay)
+            self.shown += 1
+
+    clock = FakeClock()
+    backend = SlowBackend()
+    dispatcher = NotificationDispatcher(backend, clock)
+    samples = []
+    for _ in range(clicks):
+        begin = time.perf_counter()
+        dispatcher.notify("timer starts", "Timer started")
+        samples.append(time.perf_counter() - begin)
+        clock.advance(interval)
+    clock.advance(dispatcher.dedup_window + dispatcher.min_interval)
+    points = percentiles(samples)
+    print(f"notification burst of {clicks} clicks, one every {interval * 1000:.0f}ms")
+    print("  notify: " + ", ".join(f"p{point} {value * 1e6:.1f}us"
+                                  for point, value in points.items()))
+    print(f"  shown {backend.shown}, coalesced {dispatcher.coalesced}, "
+          f"skipped {dispatcher.duplicates} duplicates, dropped {dispatcher.dropped}")
+    print(f"  synchronous calls would have blocked {clicks * backend_delay:.1f}s")
+    return {"notify": points, "shown": backend.shown, "coalesced": dispatcher.coalesced,
+            "duplicates": dispatcher.duplicates, "dropped": dispatcher.dropped}
+
+
+@benchmark
+def alarm_latency(runs=50):
+    """
+    Time from expiry to the first alarm samples reaching a null sink, with
+    the sound decoded when the countdown starts and decoded at expiry
+    """
+    from alarm import AlarmPlayer, NullSink
+
+    results = {}
+    for state in ("preloaded", "decoded at expiry"):
+        player = AlarmPlayer(NullSink())
+        for _ in range(runs):
+            if state == "preloaded":
+                # Prepared on the alarm's thread, well before the expiry
+                player.prepare()
+                time.sleep(0.05)
+            else:
+                player.sound = None
+            played = len(player.latency)
+            player.play()
+            while len(player.latency) == played:
+                time.sleep(0.001)
+            player.stop()
+        player.close()
+        points = percentiles(player.latency)
+        print(f"alarm latency, sound {state}, {runs} expiries")
+        print("  expiry to first sample: " + ", ".join(
+            f"p{point} {value * 1000:.3f}ms" for point, value in points.items()))
+        results[state] = points
+    return results
+
+
+@benchmark
+def timeline(blocks=50000, seeks=100000, seed=0):
+    """
+    Compile a sequence of many work/break blocks and time seeking to random
+    offsets with the binary search, against a linear scan of the segments
+    """
+    from timeline import Timeline
+
+    rng = random.Random(seed)
+    begin = time.perf_counter()
+    line = Timeline.parse(f"{blocks}x(50m work, 10m break), 30m long-break")
+    compiled = time.perf_counter() - begin
+    offsets = [rng.uniform(0, line.total) for _ in range(seeks)]
+
+    begin = time.perf_counter()
+    for offset in offsets:
+        line.index_at(offset)
+    search = (time.perf_counter() - begin) / seeks
+
+    def scan(offset):
+        for index, end in enumerate(line.ends):
+            if end > offset:
+                return index
+        return len(line)
+
+    scans = offsets[:max(1, seeks // 1000)]
+    begin = time.perf_counter()
+    for offset in scans:
+        scan(offset)
+    linear = (time.perf_counter() - begin) / len(scans)
+
+    print(f"timeline of {len(line)} segments, {line.total / 3600:.0f}h")
+    print(f"  compile:     {compiled * 1000:.1f}ms")
+    print(f"  seek:        {search * 1e6:.2f}us binary search, "
+          f"{linear * 1e6:.0f}us linear scan")
+    return {"segments": len(line), "compile": compiled, "seek": search, "linear": linear}
+
+
+@benchmark
+def suspend(sleep=17 * 60, awake=15):
+    """
+    Suspend the machine across several boundaries of a 5m/5m sequence, on a
+    fake clock, and check when and where the widget lands after the resume,
+    with and without a clock counting suspends, logind and catching up
+    """
+    qt_application()
+    from countdown_app import CountdownWidget
+
+    results = {}
+    for case, counts_suspend, logind, catch_up in (
+            ("boot time, next tick", True, False, True),
+            ("boot time, logind resume", True, True, True),
+            ("no boot time, logind resume", False, True, True),
+            ("no boot time, next tick", False, False, True),
+            ("no catch-up", False, False, False)):
+        clock = FakeClock(counts_suspend=counts_suspend)
+        widget = CountdownWidget(time_left=1800, reset_value=3000, break_time=600,
+                                 clock=clock)
+        widget.create_layout_menu()
+        shown = []
+        widget.show_notification = lambda title, message: shown.append(clock.monotonic())
+        if not catch_up:
+            widget.catch_up = lambda: False
+        widget.start_sequence("12x(5m work, 5m break)")
+        clock.advance(60)
+        if logind:
+            widget.on_sleep(True)
+        clock.suspend(sleep)
+        resumed = clock.monotonic()
+        started = len(shown)
+        if logind:
+            widget.on_sleep(False)
+        clock.advance(awake)
+        transitions = shown[started:]
+        # Where the sequence should be, by the time that really passed
+        elapsed = 60 + sleep + awake
+        expected = widget.sequence.timeline.index_at(elapsed)
+        result = {
+            "transitions": len(transitions),
+            "late": transitions[0] - resumed if transitions else None,
+            "segment": widget.sequence.index,
+            "expected": expected,
+            "error": widget.sequence.elapsed() - elapsed,
+        }
+        results[case] = result
+        late = "never" if result["late"] is None else f"{result['late']:.1f}s"
+        print(f"suspend of {sleep}s, {case}")
+        print(f"  {result['transitions']} transition(s) after resume, first {late} "
+              f"after it, in segment {result['segment']} "
+              f"(expected {expected}), sequence off by {result['error']:+.1f}s")
+    return results
+
+
+@benchmark
+def clock_alarms(count=5000, days=7, seed=0):
+    """
+    Ring thousands of recurring fixed-time alarms over simulated days, on a
+    fake clock, with a single scheduler wakeup armed for the nearest one
+    """
+    from clock_alarms import ClockAlarm, ClockAlarms, RECURRENCES
+
+    rng = random.Random(seed)
+    clock = FakeClock(wall_start=time.time())
+    scheduler = Scheduler(clock=clock.monotonic)
+    wakeup = clock.create_timer()
+    wakeup.setSingleShot(True)
+    wakeup.timeout.connect(scheduler.run_due)
+    wakeups = []
+
+    def arm(deadline):
+        if deadline is None:
+            wakeup.stop()
+        else:
+            wakeup.start(max(0, int((deadline - clock.monotonic()) * 1000) + 1))
+
+    scheduler.on_rearm = arm
+    wakeup.timeout.connect(lambda: wakeups.append(clock.monotonic()))
+    rung = []
+    alarms = ClockAlarms(scheduler, clock.wall, lambda name, alarm: rung.append(name))
+
+    begin = time.perf_counter()
+    for index in range(count):
+        days_of_week = rng.choice(list(RECURRENCES.values()))
+        alarms.add(f"alarm-{index}", ClockAlarm(rng.randrange(24), rng.randrange(60),
+                                                days_of_week))
+    add = (time.perf_counter() - begin) / count
+    begin = time.perf_counter()
+    clock.advance(days * 86400)
+    elapsed = time.perf_counter() - begin
+
+    print(f"clock alarms, {count} recurring alarms over {days} days")
+    print(f"  add:    {add * 1e6:.1f}us per alarm, {len(scheduler)} scheduler entry armed")
+    print(f"  ring:   {len(rung)} rings in {elapsed * 1000:.0f}ms, "
+          f"{elapsed / max(1, len(rung)) * 1e6:.1f}us per ring")
+    print(f"  wakeups: {len(wakeups)}, {len(wakeups) / days:.0f} per day")
+    return {"add": add, "rings": len(rung), "per_ring": elapsed / max(1, len(rung)),
+            "wakeups": len(wakeups)}
+
+
+def child_cpu(command, **kwargs):
+    """Run a command to completion and return its output and CPU seconds"""
+    # Only imported here, the other benchmarks also run where it is missing (Windows)
+    import resource
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    output = subprocess.run(command, cwd=ROOT, check=True, capture_output=True,
+                            text=True, **kwargs).stdout
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return output, (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+@benchmark
+def headless(runs=5, seconds=20):
+    """
+    Compare the terminal countdown with the Qt build: time to the first
+    drawn line against time to the tray icon, and CPU per hour of a
+    running countdown, each in fresh interpreters
+    """
+    command = [sys.executable, os.path.join(ROOT, "terminal.py")]
+    first_line = []
+    for _ in range(runs):
+        begin = time.perf_counter()
+        with subprocess.Popen(command + ["1"], cwd=ROOT, stdout=subprocess.PIPE) as process:
+            process.stdout.readline()
+            first_line.append(time.perf_counter() - begin)
+            process.stdout.read()
+    # Startup alone, from a countdown expiring at once, is taken out of
+    # the CPU of a full run to leave the cost of counting down
+    startup_cpu = statistics.median(child_cpu(command + ["0"])[1] for _ in range(runs))
+    output, cpu = child_cpu(command + [str(seconds)])
+    terminal = {"startup": statistics.median(first_line),
+                "startup_cpu": startup_cpu,
+                "redraws": len(output.splitlines()),
+                "cpu_per_hour": max(0.0, cpu - startup_cpu) / seconds * 3600}
+
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    tray_visible = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as home:
+            output, qt_startup_cpu = child_cpu([sys.executable, "-c", STARTUP_PROBE],
+                                               env=probe_env(home))
+        tray_visible.append(json.loads(output.splitlines()[-1])["tray_visible"])
+    output = child_cpu([sys.executable, "-c", IDLE_COST_PROBE, "running", str(seconds)],
+                       env=env)[0]
+    sample = json.loads(output.splitlines()[-1])
+    qt = {"startup": statistics.median(tray_visible), "startup_cpu": qt_startup_cpu,
+          "cpu_per_hour": sample["cpu"] / (sample["elapsed"] / 3600)}
+
+    print(f"headless, median of {runs} starts, {seconds}s running")
+    print(f"  terminal: first line {terminal['startup'] * 1000:.1f}ms "
+          f"({terminal['startup_cpu'] * 1000:.0f}ms CPU), "
+          f"{terminal['cpu_per_hour']:.2f}s CPU per hour, "
+          f"{terminal['redraws']} redraws")
+    print(f"  Qt tray:  tray visible {qt['startup'] * 1000:.1f}ms "
+          f"({qt['startup_cpu'] * 1000:.0f}ms CPU), "
+          f"{qt['cpu_per_hour']:.2f}s CPU per hour")
+    return {"terminal": terminal, "qt": qt}
+
+
+async def follow_events(port, count, ticks):
+    """
+    Open count event streams and return, for each tick event, the delay
+    between its publication and its arrival, once ticks have arrived on
+    every stream
+    """
+    received = []
+
+    async def client():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        await reader.readuntil(b"\r\n\r\n")
+        connected.release()
+        seen = 0
+        while seen < ticks:
+            line = await reader.readline()
+            if line.startswith(b"data: ") and b'"sent"' in line:
+                received.append(time.monotonic() - json.loads(line[6:])["sent"])
+                seen += 1
+        writer.close()
+
+    connected = asyncio.Semaphore(0)
+    tasks = [asyncio.ensure_future(client()) for _ in range(count)]
+    for _ in range(count):
+        await connected.acquire()
+    print("connected", flush=True)
+    await asyncio.gather(*tasks)
+    return received
+
+
+@benchmark
+def status_stream(clients=(1, 100, 400), ticks=60, interval=0.1, burst_events=5000):
+    """
+    Publish tick events on a timer to growing numbers of event stream
+    clients, run in another process, and report the timer's lateness and
+    publish cost next to the delivery latency, with one stalled client
+    that never reads
+    """
+    from status_stream import StatusStream
+
+    results = {}
+    for count in clients:
+        stream = StatusStream(buffer=8)
+        stream.start()
+        process = subprocess.Popen([sys.executable, "-c", EVENT_CLIENTS_PROBE,
+                                    str(stream.port), str(count), str(ticks)],
+                                   cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        process.stdout.readline()
+        # A small receive window, so the stalled client's socket fills up
+        stalled = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        stalled.connect(("127.0.0.1", stream.port))
+        stalled.sendall(b"GET /events HTTP/1.1\r\n\r\n")
+        while len(stream.subscribers) < count + 1:
+            time.sleep(0.01)
+
+        lateness, publish = [], []
+        deadline = time.monotonic()
+        for tick in range(ticks):
+            deadline += interval
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            woke = time.monotonic()
+            lateness.append(woke - deadline)
+            stream.publish("tick", {"tick": tick, "time_left": ticks - tick,
+                                    "running": True, "text": "00:00:00", "sent": woke})
+            publish.append(time.monotonic() - woke)
+        received = json.loads(process.communicate()[0].splitlines()[-1])
+        # Then a burst larger than every socket and transport buffer on
+        # the way, which only the stalled client's own buffer may lose
+        burst = time.monotonic()
+        for tick in range(burst_events):
+            stream.publish("tick", {"tick": tick, "padding": "x" * 2048})
+        burst = time.monotonic() - burst
+        # Let the server thread fan the burst out
+        time.sleep(0.2)
+        dropped = max(subscriber.dropped for subscriber in stream.subscribers)
+        stalled.close()
+        stream.stop()
+
+        result = {"lateness": percentiles(lateness), "publish": percentiles(publish),
+                  "delivery": percentiles(received), "events": len(received),
+                  "burst_publish": burst / burst_events, "stalled_dropped": dropped}
+        results[count] = result
+        print(f"status stream, {count} clients and a stalled one, {ticks} ticks")
+        for key, label in (("lateness", "tick lateness"), ("publish", "publish"),
+                           ("delivery", "delivery")):
+            print(f"  {label + ':':15}" + ", ".join(
+                f"p{point} {value * 1000:.3f}ms" for point, value in result[key].items()))
+        print(f"  events delivered: {len(received)}, then a burst of {burst_events} "
+              f"published at {result['burst_publish'] * 1e6:.1f}us each, "
+              f"{dropped} dropped for the stalled client")
+    return results
+
+
+@benchmark
+def dashboard(counts=(50, 5000), seconds=60):
+    """
+    Run the dashboard with every timer counting down at its own phase and
+    the view scrolling each second, on a fake clock and the offscreen
+    platform, and time the shared tick over the visible rows against a
+    tick over every row
+    """
+    app = qt_application()
+    from dashboard import Dashboard, TimersModel
+
+    results = {}
+    for count in counts:
+        clock = FakeClock()
+        scheduler = Scheduler(clock=clock.monotonic)
+        model = TimersModel(scheduler)
+        for row in range(count):
+            # Tenths of a second apart, so rows change at different phases
+            model.add(f"timer {row}", 3600 + row % 10 / 10)
+            scheduler.start(model.timers[row].key)
+        window = Dashboard(model, clock)
+        window.resize(420, 600)
+        window.show()
+        app.processEvents()
+        emitted = []
+        model.dataChanged.connect(
+            lambda first, last, roles: emitted.append(last.row() - first.row() + 1))
+
+        scrollbar = window.view.verticalScrollBar()
+        ticks, paints = [], []
+        for second in range(seconds):
+            scrollbar.setValue(second * 7 % (scrollbar.maximum() + 1))
+            for _ in range(10):
+                begin = time.perf_counter()
+                # Fires the shared tick when a visible row is due
+                clock.advance(0.1)
+                ticked = time.perf_counter()
+                app.processEvents()
+                ticks.append(ticked - begin)
+                paints.append(time.perf_counter() - ticked)
+        # Closed, so only the tick over every row runs
+        window.close()
+        begin = time.perf_counter()
+        for _ in range(seconds):
+            clock.advance(1)
+            model.tick(0, count - 1)
+        every_row = (time.perf_counter() - begin) / seconds
+
+        result = {"tick": percentiles(ticks), "paint": percentiles(paints),
+                  "rows_changed_per_second": sum(emitted) / seconds,
+                  "every_row_tick": every_row}
+        results[count] = result
+        print(f"dashboard, {count} timers, {seconds}s with scrolling")
+        for key in ("tick", "paint"):
+            print(f"  {key + ':':7}" + ", ".join(
+                f"p{point} {value * 1000:.3f}ms" for point, value in result[key].items()))
+        print(f"  rows changed: {result['rows_changed_per_second']:.0f}/s, "
+              f"ticking every row instead: {every_row * 1000:.3f}ms per tick")
+    return results
+
+
+@benchmark
+def lan_sync(skews=(0.0, 2.5, -1.3, 0.8), changes=50, port=42425):
+    """
+    Run synchronized instances over loopback multicast, their wall clocks
+    skewed by seconds, and report how fast their offset estimates converge,
+    how long changes take to reach every instance, how far the applied
+    deadlines are from the true one, and how fast a late joiner catches up
+    """
+    from lan_sync import LanSync
+
+    def instance(skew, applied):
+        peer = LanSync("benchmark", lambda state: applied.append((time.perf_counter(), state)),
+                       port=port, interface="127.0.0.1",
+                       wall=lambda: time.time() + skew)
+        peer.PING_SECONDS = 0.2
+        peer.ANNOUNCE_SECONDS = 0.5
+        peer.start()
+        return peer
+
+    applied = [[] for _ in skews]
+    peers = [instance(skew, received) for skew, received in zip(skews, applied)]
+    begin = time.perf_counter()
+    while not all(len(peer.samples) == len(peers) - 1 and all(
+            abs(peer.offset(other.peer) - (skews[j] - skews[i])) < 0.001
+            for j, other in enumerate(peers) if other is not peer)
+            for i, peer in enumerate(peers)):
+        time.sleep(0.01)
+    converged = time.perf_counter() - begin
+
+    latencies, errors = [], []
+    for change in range(changes):
+        source = change % len(peers)
+        for received in applied:
+            received.clear()
+        sent = time.perf_counter()
+        deadline = time.time() + 1500
+        peers[source].publish("start", True, 1500, 1500, "reset")
+        while not all(applied[i] for i in range(len(peers)) if i != source):
+            time.sleep(0.0005)
+        for i, received in enumerate(applied):
+            if i != source:
+                arrived, state = received[0]
+                latencies.append(arrived - sent)
+                # Back on the true clock, from the instance's skewed one
+                errors.append(abs(state["deadline"] - skews[i] - deadline))
+
+    # A late instance, clock skewed too, takes the running timer over
+    # from the next announcement
+    late_applied = []
+    joined = time.perf_counter()
+    late = instance(-4.2, late_applied)
+    while not late_applied or abs(late_applied[-1][1]["deadline"] + 4.2 - deadline) > 0.001:
+        time.sleep(0.01)
+    caught_up = late_applied[-1][0] - joined
+    for peer in peers + [late]:
+        peer.stop()
+
+    result = {"offsets_converged": converged, "latency": percentiles(latencies),
+              "deadline_error": percentiles(errors), "late_join": caught_up}
+    print(f"lan sync, {len(peers)} instances over loopback, {changes} changes")
+    print(f"  clock offsets within 1ms after {converged * 1000:.0f}ms")
+    print("  propagation:    " + ", ".join(
+        f"p{point} {value * 1000:.3f}ms" for point, value in result["latency"].items()))
+    print("  deadline error: " + ", ".join(
+        f"p{point} {value * 1000:.3f}ms" for point, value in result["deadline_error"].items()))
+    print(f"  late joiner in sync after {caught_up * 1000:.0f}ms")
+    return result
+
+
+@benchmark
+def presets(count=5000, searches=2000, frame=1 / 60):
+    """
+    Time parsing a preset file of count presets against loading it from
+    its cache, and the latency of prefix and fuzzy quick-searches against
+    a frame
+    """
+    from presets import PresetLibrary
+
+    rng = random.Random(0)
+    words = ["tea", "pomodoro", "focus", "deep", "work", "stretch", "review", "standup",
+             "laundry", "oven", "pasta", "rice", "walk", "read", "call", "nap"]
+    tags = ["work", "kitchen", "home", "sport", "study"]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "presets.txt")
+        cache = os.path.join(directory, "presets.cache")
+        with open(path, "w") as file:
+            for index in range(count):
+                name = " ".join(rng.sample(words, 2))
+                file.write(f"{rng.randint(1, 120)}m {name} {index} #{rng.choice(tags)}\n")
+        begin = time.perf_counter()
+        PresetLibrary(path, cache).refresh()
+        parsed = time.perf_counter() - begin
+        begin = time.perf_counter()
+        library = PresetLibrary(path, cache)
+        library.refresh()
+        cached = time.perf_counter() - begin
+
+    queries = {"prefix": [rng.choice(words)[:rng.randint(1, 4)] for _ in range(searches)],
+               "fuzzy": ["".join(rng.sample(rng.choice(words), 3)) for _ in range(searches)],
+               "miss": ["zqx" for _ in range(searches)]}
+    result = {"presets": count, "parse": parsed, "cached_load": cached}
+    print(f"presets, {count} in the library")
+    print(f"  parse and index: {parsed * 1000:.1f}ms, from the cache: {cached * 1000:.1f}ms")
+    for kind, texts in queries.items():
+        latencies = []
+        for text in texts:
+            begin = time.perf_counter()
+            library.search(text)
+            latencies.append(time.perf_counter() - begin)
+        result[kind] = percentiles(latencies)
+        print(f"  {kind + ' search:':15} " + ", ".join(
+            f"p{point} {value * 1000:.3f}ms" for point, value in result[kind].items())
+            + f" (frame {frame * 1000:.1f}ms)")
+    return result
+
+
+@benchmark
+def locales(runs=5):
+    """
+    Drive the widget through the same script in every locale on a fake
+    clock and check the timer behaves identically, then compare loading
+    the catalog, startup and memory per locale in fresh interpreters
+    """
+    qt_application()
+    from countdown_app import CountdownWidget
+    from i18n import available_locales, load_catalog
+
+    def trace(locale):
+        clock = FakeClock()
+        widget = CountdownWidget(time_left=1800, reset_value=3000, break_time=600,
+                                 clock=clock, catalog=load_catalog(locale))
+        widget.create_layout_menu()
+        notifications = []
+        widget.show_notification = lambda title, message: notifications.append(clock.monotonic())
+        steps = []
+
+        def step(action, seconds=0):
+            action()
+            clock.advance(seconds)
+            status = widget.status()
+            steps.append((status, widget.timer.isActive(), widget.timer.interval(),
+                          widget.scheduler.next_deadline(), len(notifications)))
+
+        step(widget.start, 61.5)
+        step(widget.pause, 30)
+        step(lambda: widget.handle_command("set", ["90"]), 0)
+        step(widget.start, 95)
+        step(widget.break_time_countdown, 300)
+        step(widget.custom_countdown, 10)
+        step(lambda: widget.start_sequence("2x(1m work, 30s break)"), 75)
+        step(widget.skip_segment, 200)
+        for command, args in (("skip", []), ("alarm", ["remove", "25:00"])):
+            try:
+                widget.handle_command(command, args)
+            except ValueError:
+                steps.append(command)
+        return steps
+
+    names = available_locales()
+    traces = {locale: trace(locale) for locale in names}
+    identical = all(traces[locale] == traces[names[0]] for locale in names)
+
+    results = {"locales": names, "identical": identical}
+    print(f"locales {', '.join(names)}, median of {runs} runs")
+    print(f"  timer behavior over {len(traces[names[0]])} steps: "
+          + ("identical" if identical else "DIFFERS"))
+    for locale in names:
+        begin = time.perf_counter()
+        for _ in range(1000):
+            load_catalog(locale)
+        load = (time.perf_counter() - begin) / 1000
+        samples = []
+        for _ in range(runs):
+            with tempfile.TemporaryDirectory() as home:
+                output = subprocess.run([sys.executable, "-c", LOCALE_PROBE, locale],
+                                        cwd=ROOT, env=probe_env(home), check=True,
+                                        capture_output=True, text=True).stdout
+            samples.append(json.loads(output.splitlines()[-1]))
+        result = {key: statistics.median(sample[key] for sample in samples)
+                  for key in ("import", "tray_visible", "rss")}
+        result.update(catalog_load=load, messages=samples[0]["messages"])
+        results[locale] = result
+        print(f"  {locale}: {result['messages']} messages loaded in "
+              f"{load * 1e6:.0f}us, tray visible {result['tray_visible'] * 1000:.1f}ms, "
+              f"{result['rss'] / (1024 * 1024):.1f}MiB resident")
+    return results
+
+
+@benchmark
+def precision(seconds=3.0, rates=(10, 30, 60), refresh_rate=60.0):
+    """
+    Run the sub-second display at each rate for seconds on the offscreen
+    platform, frames paced on a refresh grid, and report CPU, frame jitter
+    and the cells repainted per frame, against a QLabel set every frame
+    """
+    app = qt_application()
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QLabel
+    from countdown_core import SystemClock, precise_text
+    from precision_display import DigitDisplay, FramePacer
+
+    results = {}
+    print(f"precision display, {seconds}s per rate, {refresh_rate:.0f}Hz refresh grid")
+    for rate in rates:
+        digits = 1 if rate <= 10 else 2
+        result = {}
+        for kind in ("digits", "label"):
+            clock = SystemClock()
+            countdown = Countdown(600, clock.monotonic)
+            if kind == "digits":
+                display = DigitDisplay(precise_text(countdown.remaining(), digits))
+            else:
+                display = QLabel(precise_text(countdown.remaining(), digits))
+            display.show()
+            app.processEvents()
+
+            def frame():
+                remaining = countdown.remaining()
+                display.setText(precise_text(remaining, digits))
+                pacer.arm(remaining, rate)
+
+            pacer = FramePacer(clock, frame, refresh_rate)
+            countdown.start()
+            pacer.request()
+            cpu = time.process_time()
+            QTimer.singleShot(int(seconds * 1000), app.quit)
+            app.exec_()
+            cpu = time.process_time() - cpu
+            pacer.stop()
+            frames = len(pacer.lateness)
+            result[kind] = {"frames": frames, "cpu_per_second": cpu / seconds,
+                            "lateness": percentiles(pacer.lateness)}
+            if kind == "digits":
+                result[kind]["cells_per_frame"] = display.cells_updated / max(1, display.updates)
+            display.close()
+        results[rate] = result
+        digits_result, label = result["digits"], result["label"]
+        print(f"  {rate}Hz: {digits_result['frames']} frames, "
+              f"{digits_result['cpu_per_second'] * 1000:.1f}ms CPU/s "
+              f"({label['cpu_per_second'] * 1000:.1f}ms with a QLabel), "
+              f"{digits_result['cells_per_frame']:.1f} cells repainted per frame")
+        print("        late after the refresh: " + ", ".join(
+            f"p{point} {value * 1000:.2f}ms"
+            for point, value in digits_result["lateness"].items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*",
+                        help="benchmarks to run, all of them by default: "
+                             + ", ".join(BENCHMARKS))
+    parser.add_argument("--json", metavar="FILE",
+                        help="also write the results to FILE, to compare releases")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+    results = {}
+    for name in args.names or BENCHMARKS:
+        results[name] = BENCHMARKS[name]()
+    if args.json:
+        report = {"created": time.time(), "python": sys.version.split()[0],
+                  "platform": sys.platform, "results": results}
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
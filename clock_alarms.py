@@ -0,0 +1,231 @@
+"""
+Alarms at fixed times of day, such as 12:30 daily or 17:55 on weekdays.
+
+Each alarm keeps only its next occurrence, worked out from local time when
+it is added and again when it fires, so recurrences are expanded lazily
+and never materialized ahead of time. The next occurrences are kept in a
+min-heap keyed on wall-clock time, and only the nearest one is handed to
+the countdown scheduler, so thousands of alarms still arm a single wakeup.
+
+Occurrences are computed with mktime, which applies the daylight saving
+rules of their own date. A wakeup is never armed more than an hour ahead,
+and every wakeup checks the timezone and the offset between the wall clock
+and the scheduler's clock. When either has changed (travel, a new zone, the
+clock being set), every next occurrence is computed again.
+"""
+import heapq
+import itertools
+import os
+import time
+
+
+# Days of the week of each recurrence name, Monday is 0
+DAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+RECURRENCES = {"daily": tuple(range(7)), "weekdays": tuple(range(5)),
+               "weekends": (5, 6)}
+
+
+class ClockAlarm:
+    """A time of day with the days of the week it rings on"""
+
+    def __init__(self, hour, minute, days=RECURRENCES["daily"], once=False):
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"invalid time of day: {hour:02d}:{minute:02d}")
+        self.hour = hour
+        self.minute = minute
+        self.days = tuple(sorted(set(days)))
+        # A one-off alarm is removed once it has rung
+        self.once = once
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parse ``HH:MM [daily|weekdays|weekends|once|mon,wed,...]``,
+        daily by default
+        """
+        words = text.split()
+        if not 1 <= len(words) <= 2:
+            raise ValueError(f"invalid alarm: {text!r}")
+        try:
+            hour, minute = (int(part) for part in words[0].split(":"))
+        except ValueError:
+            raise ValueError(f"invalid alarm time: {words[0]!r}") from None
+        recurrence = words[1] if len(words) == 2 else "daily"
+        if recurrence == "once":
+            return cls(hour, minute, once=True)
+        if recurrence in RECURRENCES:
+            return cls(hour, minute, RECURRENCES[recurrence])
+        try:
+            days = [DAYS[day] for day in recurrence.split(",")]
+        except KeyError:
+            raise ValueError(f"invalid alarm days: {recurrence!r}") from None
+        return cls(hour, minute, days)
+
+    def __str__(self):
+        if self.once:
+            recurrence = "once"
+        else:
+            recurrence = next((name for name, days in RECURRENCES.items()
+                               if days == self.days), None)
+            if recurrence is None:
+                names = {day: name for name, day in DAYS.items()}
+                recurrence = ",".join(names[day] for day in self.days)
+        return f"{self.hour:02d}:{self.minute:02d} {recurrence}"
+
+    def next_after(self, wall):
+        """Return the wall-clock time of the first occurrence after wall"""
+        now = time.localtime(wall)
+        for offset in range(8):
+            # mktime normalizes the day overflow and applies that date's DST
+            candidate = time.mktime((now.tm_year, now.tm_mon, now.tm_mday + offset,
+                                     self.hour, self.minute, 0, 0, 0, -1))
+            if candidate > wall and (self.once or
+                                     time.localtime(candidate).tm_wday in self.days):
+                return candidate
+        raise ValueError(f"alarm never rings: {self}")
+
+
+class ClockAlarms:
+    """Fixed-time alarms sharing one scheduler entry for the nearest of them"""
+
+    # Name of the scheduler entry waking up for the nearest alarm
+    ENTRY = "clock-alarms"
+    # Longest time in seconds the scheduler entry is armed for, so that
+    # clock and timezone changes are noticed
+    HORIZON = 3600
+    # Change in seconds of the wall-clock offset taken for a clock change
+    CLOCK_STEP = 2.0
+
+    def __init__(self, scheduler, wall_clock, callback, wakeup=None):
+        self.scheduler = scheduler
+        self.wall_clock = wall_clock
+        # Called with (name, alarm) from run_due, once per ring even if
+        # several occurrences were missed
+        self.callback = callback
+        # Scheduler callback of the entry, which must lead to run_due on
+        # the thread owning the alarms
+        self.wakeup = wakeup if wakeup is not None else lambda name: self.run_due()
+        self.alarms = {}
+        # Next occurrences as (wall time, sequence, name), with entries
+        # left behind by removed or rescheduled alarms skipped lazily
+        self._heap = []
+        self._armed = {}
+        self._sequence = itertools.count()
+        self._zone = self._offset = None
+        self._clock_changed()
+        # Wall-clock time up to which alarms have rung
+        self._rung_until = wall_clock()
+
+    def __len__(self):
+        return len(self.alarms)
+
+    def add(self, name, alarm):
+        """Add or replace an alarm"""
+        self._check_clock()
+        self.alarms[name] = alarm
+        self._schedule(name, self.wall_clock())
+        self._arm()
+
+    def remove(self, name):
+        """Remove an alarm"""
+        del self.alarms[name]
+        self._armed.pop(name, None)
+        self._arm()
+
+    def load(self, path):
+        """Add the alarms saved in a file, one per line, if it exists"""
+        try:
+            with open(path, encoding="ascii") as file:
+                lines = [line.strip() for line in file]
+        except FileNotFoundError:
+            return
+        for line in lines:
+            if line:
+                alarm = ClockAlarm.parse(line)
+                self.add(str(alarm), alarm)
+
+    def save(self, path):
+        """Atomically replace a file with the alarms, one per line"""
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="ascii") as file:
+            file.writelines(f"{alarm}\n" for alarm in self.alarms.values())
+        os.replace(temporary, path)
+
+    def next(self):
+        """Return (wall time, name) of the nearest alarm, or None"""
+        heap = self._heap
+        while heap and self._armed.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+        return (heap[0][0], heap[0][2]) if heap else None
+
+    def run_due(self):
+        """Ring every alarm that is due and arm the wakeup for the next one"""
+        self._check_clock()
+        now = self.wall_clock()
+        rung = []
+        while True:
+            nearest = self.next()
+            if nearest is None or nearest[0] > now:
+                break
+            name = nearest[1]
+            alarm = self.alarms[name]
+            heapq.heappop(self._heap)
+            if alarm.once:
+                del self.alarms[name]
+                del self._armed[name]
+            else:
+                # Only the occurrence after now, missed ones ring once
+                self._schedule(name, now)
+            rung.append((name, alarm))
+        self._rung_until = now
+        self._arm()
+        for name, alarm in rung:
+            self.callback(name, alarm)
+        return rung
+
+    def rebuild(self):
+        """
+        Work out every next occurrence again, after a clock or zone change,
+        from the time alarms last rang so that none due is skipped
+        """
+        after = min(self._rung_until, self.wall_clock())
+        self._heap = []
+        self._armed = {}
+        for name in self.alarms:
+            self._schedule(name, after)
+        self._arm()
+
+    def _schedule(self, name, after):
+        sequence = next(self._sequence)
+        self._armed[name] = sequence
+        heapq.heappush(self._heap, (self.alarms[name].next_after(after), sequence, name))
+
+    def _check_clock(self):
+        if self._clock_changed():
+            self.rebuild()
+
+    def _clock_changed(self):
+        """Whether the timezone or the wall clock changed since last asked"""
+        # The zone is read again from TZ where the platform can (Unix)
+        tzset = getattr(time, "tzset", None)
+        if tzset is not None:
+            tzset()
+        zone = (time.timezone, time.altzone, time.tzname)
+        offset = self.wall_clock() - self.scheduler.clock()
+        changed = (self._zone is not None and
+                   (zone != self._zone or abs(offset - self._offset) > self.CLOCK_STEP))
+        self._zone, self._offset = zone, offset
+        return changed
+
+    def _arm(self):
+        """Arm the scheduler entry for the nearest alarm, or drop it"""
+        nearest = self.next()
+        if nearest is None:
+            if self.ENTRY in self.scheduler:
+                self.scheduler.remove(self.ENTRY)
+            return
+        delay = min(max(0.0, nearest[0] - self.wall_clock()), self.HORIZON)
+        if self.ENTRY in self.scheduler:
+            self.scheduler.reset(self.ENTRY, delay)
+        else:
+            self.scheduler.add_alarm(self.ENTRY, delay, self.wakeup)
@@ -0,0 +1,210 @@
+"""
+Local control socket for scripting the countdown.
+
+A running instance listens on a Unix-domain socket in the per-user state
+directory. Each request is one line, a command followed by its arguments,
+and is answered with one line of JSON. Commands are handed to the GUI thread
+through a queued Qt signal, so the asyncio server never touches widgets.
+
+Run ``python control.py <command> [args]`` to send a command, one of:
+start, pause, reset, break, set <seconds|mm:ss|hh:mm:ss>, status, open,
+metrics, sequence <spec>, skip, preset <name or search>, alarm [list |
+add <HH:MM> [days] | remove <HH:MM> [days]], where spec is a sequence such as
+"4x(50m work, 10m break), 30m long-break" and days is daily, weekdays,
+weekends, once or a list such as mon,wed.
+"""
+import asyncio
+import concurrent.futures
+import json
+import os
+import socket
+import sys
+import threading
+
+from countdown_core import state_path
+
+
+# Commands understood by the running instance
+COMMANDS = ("start", "pause", "reset", "break", "set", "status", "open", "metrics",
+            "sequence", "skip", "preset", "alarm")
+
+# Unix-domain sockets are not available everywhere (older Windows)
+AVAILABLE = hasattr(socket, "AF_UNIX") and sys.platform != "win32"
+
+
+def socket_path():
+    """Return the path of the control socket"""
+    return state_path("control.sock")
+
+
+def parse_request(line):
+    """Split a request line into its command and arguments"""
+    words = line.split()
+    if not words or words[0] not in COMMANDS:
+        raise ValueError(f"unknown command: {line.strip()!r}")
+    return words[0], words[1:]
+
+
+class ControlServer:
+    """asyncio Unix-domain-socket server running in a background thread"""
+
+    def __init__(self, path, dispatch):
+        self.path = path
+        # Called with (command, args) and returning the reply, or a
+        # concurrent.futures.Future of it
+        self.dispatch = dispatch
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        # Writers of the open connections
+        self._writers = set()
+
+    def start(self):
+        """Start listening, replacing a socket file left behind by a crash"""
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._thread = threading.Thread(target=self._run, name="control-server",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        """Stop listening and remove the socket file"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _run(self):
+        loop = self.loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(asyncio.start_unix_server(self._serve, self.path))
+        self._ready.set()
+        loop.run_forever()
+        # Stopped: close the listener and the open connections
+        server.close()
+        for writer in self._writers:
+            writer.close()
+        # The loop is not running any more, so gather it explicitly and
+        # only when connections are left to finish
+        tasks = asyncio.all_tasks(loop)
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    async def _serve(self, reader, writer):
+        """Answer the requests of one connection until it is closed"""
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                writer.write(await self._answer(line.decode()))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(self, line):
+        try:
+            command, args = parse_request(line)
+            reply = self.dispatch(command, args)
+            if isinstance(reply, concurrent.futures.Future):
+                reply = await asyncio.wrap_future(reply)
+            reply = {"ok": True, **reply}
+        except Exception as error:
+            reply = {"ok": False, "error": str(error)}
+        return (json.dumps(reply) + "\n").encode()
+
+
+def gui_dispatcher(handler):
+    """
+    Return a dispatch function that runs handler(command, args) on the
+    Qt GUI thread and returns a future of its result
+    """
+    from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+    class Bridge(QObject):
+        requested = pyqtSignal(object)
+
+        def __init__(self):
+            super().__init__()
+            # The bridge lives in the GUI thread, so signals emitted
+            # from the server thread are queued to it
+            self.requested.connect(self.run)
+
+        @pyqtSlot(object)
+        def run(self, request):
+            future, command, args = request
+            try:
+                future.set_result(handler(command, args))
+            except Exception as error:
+                future.set_exception(error)
+
+    bridge = Bridge()
+
+    def dispatch(command, args):
+        future = concurrent.futures.Future()
+        bridge.requested.emit((future, command, args))
+        return future
+
+    # Keep the bridge alive as long as the dispatch function
+    dispatch.bridge = bridge
+    return dispatch
+
+
+class ControlClient:
+    """Blocking client keeping one connection to the control socket"""
+
+    def __init__(self, path=None, timeout=2.0):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.settimeout(timeout)
+        self.socket.connect(path or socket_path())
+        self._file = self.socket.makefile("rb")
+
+    def send(self, command, *args):
+        """Send one command and return the decoded reply"""
+        self.socket.sendall((" ".join((command,) + args) + "\n").encode())
+        return json.loads(self._file.readline())
+
+    def close(self):
+        self._file.close()
+        self.socket.close()
+
+
+def forward(args, path=None, timeout=2.0):
+    """
+    Send a command to an already running instance and return its reply,
+    or None when no instance is listening
+    """
+    if not AVAILABLE:
+        return None
+    try:
+        client = ControlClient(path, timeout)
+    except OSError:
+        return None
+    try:
+        return client.send(*(args or ["open"]))
+    except (OSError, ValueError) as error:
+        # The instance stopped answering, or closed the connection mid-reply
+        return {"ok": False, "error": f"no reply from the running instance: {error}"}
+    finally:
+        client.close()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        sys.exit(__doc__.strip())
+    reply = forward(sys.argv[1:])
+    if reply is None:
+        sys.exit("no running countdown")
+    print(json.dumps(reply))
+    sys.exit(0 if reply["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1174 @@
+"""
+This program implements a simple countdown timer and it can also runs in the system tray. 
+
+The user interface is written once, in English, and translated by the
+catalog of the locale chosen with --locale=en|zh, see i18n.py;
+count_down_en.py and count_down_zh.py start it in either language.
+"""
+import math
+import sys
+from PyQt5.QtCore import Qt,QTime, pyqtSignal, QStringListModel
+from PyQt5.QtGui import QIcon, QFont, QPalette
+from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction, QWidget 
+from PyQt5.QtWidgets import QLabel, QPushButton, QCheckBox, QCompleter, QLineEdit
+from PyQt5.QtWidgets import QVBoxLayout, QHBoxLayout, QTimeEdit
+
+import control
+from alarm import make_alarm
+from clock_alarms import ClockAlarm, ClockAlarms
+from countdown_core import (BREAK_TIME, INIT_TIME_LEFT_AMOUNT, RESET_VALUE, SEQUENCE,
+                            SystemClock, get_option, get_time, parse_duration,
+                            precise_text, state_path)
+from i18n import Catalog, load_catalog
+from journal import Journal
+from metrics import Metrics
+from notifications import NotificationDispatcher, make_backend
+from presets import PresetLibrary
+from render import Renderer
+from scheduler import Scheduler
+from suspend import SuspendDetector, watch_sleep
+from timeline import Sequence, Timeline, is_break
+from tray_icons import TrayIconRenderer
+
+
+class CountdownWidget(QWidget):
+    # State of the shared timer received from another instance,
+    # emitted from the sync thread and queued to the GUI thread
+    synced = pyqtSignal(object)
+    # Seconds between display updates while only the tray is shown
+    HIDDEN_TICK_SECONDS = 10
+    # Seconds between two dumps of the metrics file, with --metrics
+    METRICS_DUMP_SECONDS = 60
+
+    def __init__(self, time_left, reset_value, break_time,
+                 scheduler=None, name="countdown",
+                 journal=None, history=None, clock=None, threaded=False,
+                 metrics=None, notify="tray", alarm=None, sequence=None,
+                 alarms_path=None, presets=None, catalog=None, precision=0):
+        super().__init__()
+        
+        # Initialize instance variables
+        # Clock providing time reads and timers, tests pass a FakeClock
+        self.clock = clock if clock is not None else SystemClock()
+        # Scheduler holding every countdown, with a single wakeup
+        # armed for the next expiry
+        if scheduler is None:
+            scheduler = Scheduler(clock=self.clock.monotonic)
+        self.scheduler = scheduler
+        # Scheduler entry shown by this widget, keeping an absolute
+        # deadline on a monotonic clock
+        self.name = name
+        # With threaded, expiries are fired by a worker thread and
+        # queued back to the GUI thread, so a busy GUI does not delay them
+        self.worker = None
+        if threaded:
+            from timing_worker import TimingWorker
+            self.worker = TimingWorker(self.scheduler)
+            self.worker.expired.connect(self.expire)
+        self.countdown = self.scheduler.add_countdown(name, time_left, self.on_expiry)
+        self.reset_value = reset_value
+        # set break time
+        self.break_time = break_time
+        # create timer refreshing the display, when a timeout signal
+        # is sent, the self.update timer method is triggered
+        self.timer = self.clock.create_timer()
+        # A coarse timer may fire up to 5% of its interval early, and
+        # every early tick is re-armed, so the second would change late
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_timer)
+        # create single-shot timer for the scheduler's next expiry
+        self.wakeup = self.clock.create_timer()
+        self.wakeup.setSingleShot(True)
+        self.wakeup.setTimerType(Qt.PreciseTimer)
+        self.wakeup.timeout.connect(self.scheduler.run_due)
+        if self.worker is not None:
+            self.scheduler.on_rearm = self.worker.arm
+            self.worker.start()
+        else:
+            self.scheduler.on_rearm = self.arm_wakeup
+        # The window layout is only built when the window is first opened
+        self.layout_created = False
+        # Journal of state transitions, used to resume the countdown
+        # when the application is launched again
+        self.journal = journal
+        # Control socket server receiving commands from scripts
+        # and later launches
+        self.control_server = None
+        # Server of the status and its live event stream over HTTP,
+        # with --status-port
+        self.status_stream = None
+        # Synchronization of this countdown with the other instances
+        # on the network sharing its timer, with --sync
+        self.lan_sync = None
+        self.synced.connect(self.apply_sync)
+        # History of finished and aborted countdowns, with the
+        # current one and the preset that started it
+        self.history = history
+        self.session = None
+        self.preset = "custom"
+        # Whether the time edit changed the time left since editing
+        # last finished
+        self.time_edited = False
+        # Sequence offered in the tray menu, such as
+        # 4x(50m work, 10m break), and the sequence being played
+        self.sequence_text = sequence
+        self.sequence = None
+        # Alarms at fixed times of day, sharing the scheduler's wakeup,
+        # and the file they are saved to, None to keep them in memory
+        self.clock_alarms = ClockAlarms(self.scheduler, self.clock.wall,
+                                        self.ring_clock_alarm, wakeup=self.on_expiry)
+        self.alarms_path = alarms_path
+        # Library of named presets, loaded from its file on first use
+        # and whenever the file changes
+        self.presets = presets if presets is not None else PresetLibrary()
+        # Translations of the user interface, the texts formatted on
+        # every tick or reset bound once
+        self.catalog = catalog if catalog is not None else Catalog()
+        self.format_time_left = self.catalog.formatter("Time left: {minutes:02d}:{seconds:02d}")
+        self.format_minutes_left = self.catalog.formatter("Time left: {minutes} min")
+        self.format_countdown = self.catalog.formatter(
+            "{hours:02d}:{minutes:02d}:{seconds:02d} countdown")
+        self.format_break = self.catalog.formatter("break: {hours:02d}:{minutes:02d}:{seconds:02d}")
+        # Decimals of a second shown in the window, 0 for whole seconds;
+        # with decimals the window paints them on frames paced by the
+        # display refresh, created with the window's widgets
+        self.precision = precision
+        self.pacer = None
+        # Window of many concurrent countdowns sharing the scheduler,
+        # built when first opened, its timers run while it is closed
+        self.dashboard = None
+        # Push only changed, visible values to the label,
+        # tray tooltip, tray menu and tray icon
+        self.renderer = Renderer(clock=self.clock.monotonic)
+        # Detects suspends, so that the countdown catches up on wake,
+        # with a logind sleep watcher where there is one
+        self.suspend_detector = SuspendDetector(self.clock)
+        self.sleep_watcher = None
+        # Name of the backend showing notifications: tray, dbus or log,
+        # the dispatcher queuing them is created with the tray icon
+        self.notify = notify
+        self.notifier = None
+        # Alarm sounded on expiry, None for the notification only
+        self.alarm = alarm
+        # Hot-path metrics, None when disabled, dumped to their
+        # file periodically
+        self.metrics = metrics
+        if metrics is not None:
+            self.metrics_timer = self.clock.create_timer()
+            self.metrics_timer.timeout.connect(metrics.dump)
+            self.metrics_timer.start(self.METRICS_DUMP_SECONDS * 1000)
+
+    def create_widget_layout(self):
+        """Create widget window layout"""
+        _ = self.catalog.gettext
+
+        # Create the label used to display the countdown
+        hours,minutes,seconds =self.get_time(self.time_left)
+        if self.precision:
+            # Sub-second digits are painted from the deadline on frames of
+            # their own, whole-second updates of the label only ask for one
+            from precision_display import DigitDisplay, FramePacer
+            self.label = DigitDisplay(precise_text(self.countdown.remaining(), self.precision))
+            screen = QApplication.primaryScreen()
+            self.pacer = FramePacer(self.clock, self.precise_frame,
+                                    screen.refreshRate() if screen is not None else 60.0)
+            self.renderer.add("label", lambda text: self.pacer.request(), self.isVisible)
+        else:
+            self.label = QLabel(f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+            self.label.setAlignment(Qt.AlignCenter)
+            self.renderer.add("label", self.label.setText, self.isVisible)
+
+        # Create the Start button to start the countdown
+        self.start_button = QPushButton(_("Start"))
+        self.start_button.clicked.connect(self.start)
+
+        # Create the Pause button to pause the countdown
+        self.pause_button = QPushButton(_("Pause"))
+        self.pause_button.clicked.connect(self.pause)
+
+        # Create button to reset countdown and start countdown immediately
+        hours,minutes,seconds =self.get_time(self.reset_value)
+        self.reset_button = QPushButton(
+            self.format_countdown(hours=hours, minutes=minutes, seconds=seconds))
+        self.reset_button.clicked.connect(self.custom_countdown)
+
+        # Create a rest button to reset the countdown and
+        # start countdown to rest immediately
+        hours,minutes,seconds =self.get_time(self.break_time)
+        self.break_time_button = QPushButton(
+            self.format_break(hours=hours, minutes=minutes, seconds=seconds))
+        self.break_time_button.clicked.connect(self.break_time_countdown)
+
+        # Create a q widget containing q time edit and add it to the layout
+        self.time_edit = QTimeEdit()
+        self.time_edit.setDisplayFormat("hh:mm:ss")
+        hours,minutes,seconds =self.get_time(self.time_left)
+        self.time_edit.setTime(QTime(hours, minutes, seconds))
+        self.time_edit.timeChanged.connect(self.update_time_left)
+        self.time_edit.editingFinished.connect(self.finish_time_edit)
+
+        # Create a quick-launch box starting a preset found by prefix
+        # or fuzzy search in the preset library
+        self.preset_edit = QLineEdit()
+        self.preset_edit.setPlaceholderText(_("Start a preset..."))
+        self.preset_completions = QStringListModel()
+        completer = QCompleter(self.preset_completions, self.preset_edit)
+        completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        completer.activated[str].connect(self.launch_preset)
+        self.preset_edit.setCompleter(completer)
+        self.preset_edit.textEdited.connect(self.search_presets)
+        self.preset_edit.returnPressed.connect(self.launch_preset)
+
+        # Create a button adding a daily alarm at the time in the time edit
+        self.clock_alarm_button = QPushButton(_("Alarm daily at this time"))
+        self.clock_alarm_button.clicked.connect(self.add_clock_alarm_from_edit)
+
+        # Create a checkbox to pin the window on top
+        self.pin_checkbox = QCheckBox(_("Pin to top"))
+        self.pin_checkbox.setChecked(bool(self.windowFlags() & Qt.WindowStaysOnTopHint))
+        self.pin_checkbox.stateChanged.connect(self.toggle_pin)
+
+        # Create the layout for the window
+        layout = QVBoxLayout()
+        layout.addWidget(self.label)
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(self.start_button)
+        control_layout.addWidget(self.pause_button)
+        layout.addLayout(control_layout)
+        layout.addWidget(self.reset_button)
+        layout.addWidget(self.break_time_button)
+        layout.addWidget(self.time_edit)
+        layout.addWidget(self.preset_edit)
+        layout.addWidget(self.clock_alarm_button)
+        layout.addWidget(self.pin_checkbox)
+        self.setLayout(layout)
+        self.layout_created = True
+
+    def create_tray_icon(self):
+        """Create a tray icon and its menu"""
+        _ = self.catalog.gettext
+        menu = QMenu()
+
+        self.icon = QIcon("icon.png")
+        self.tray_icon = QSystemTrayIcon(self.icon)
+        self.tray_icon.show()
+        # Notifications are queued, coalesced and rate limited, and
+        # shown from the event loop by the backend
+        self.notifier = NotificationDispatcher(make_backend(self.notify, self.tray_icon),
+                                               self.clock)
+        # While counting down, the tray icon shows the minutes left
+        # and a progress ring, painted frames are cached
+        self.icon_renderer = TrayIconRenderer()
+
+        # Add the time left action to the menuG
+        self.time_left_action = QAction(self.format_time_left(minutes=30, seconds=0))
+        menu.addAction(self.time_left_action)
+        menu.addSeparator()
+
+        # Menu and tray are only updated when their content changes,
+        # the menu catches up on the time left when it opens
+        self.renderer.add("menu", self.time_left_action.setText, menu.isVisible)
+        menu.aboutToShow.connect(self.open_tray_menu)
+        self.renderer.add("tooltip", self.tray_icon.setToolTip)
+        self.renderer.add("icon", self.tray_icon.setIcon)
+
+        # Add the Open action to the menu
+        open_action = QAction(_("Open main window"), self)
+        open_action.triggered.connect(self.open_window)
+        menu.addAction(open_action)
+        menu.addSeparator()
+        dashboard_action = menu.addAction(_("Dashboard"))
+        dashboard_action.triggered.connect(self.open_dashboard)
+        menu.addSeparator()
+
+        # Add the Start, Pause, 30minutes and Quit actions to the menu
+        open_action = menu.addAction(_("Start"))
+        open_action.triggered.connect(self.start)
+        menu.addSeparator()
+        stop_action = menu.addAction(_("Pause"))
+        stop_action.triggered.connect(self.pause)   
+        menu.addSeparator()
+        hours,minutes,seconds =self.get_time(self.reset_value)
+        reset_action = menu.addAction(
+            self.format_countdown(hours=hours, minutes=minutes, seconds=seconds))
+        reset_action.triggered.connect(self.custom_countdown)        
+        menu.addSeparator()
+        hours,minutes,seconds =self.get_time(self.break_time)
+        reset_action = menu.addAction(_("break {hours:02d}:{minutes:02d}:{seconds:02d}").format(
+            hours=hours, minutes=minutes, seconds=seconds))
+        reset_action.triggered.connect(self.break_time_countdown)        
+        menu.addSeparator()
+        # The presets submenu and its tag submenus are only filled
+        # when they are about to show
+        presets_menu = menu.addMenu(_("Presets"))
+        presets_menu.aboutToShow.connect(lambda: self.fill_presets_menu(presets_menu))
+        menu.addSeparator()
+        if self.sequence_text is not None:
+            sequence_action = menu.addAction(
+                _("sequence {sequence}").format(sequence=self.sequence_text))
+            sequence_action.triggered.connect(
+                lambda: self.start_sequence(self.sequence_text))
+            menu.addSeparator()
+        quit_action = menu.addAction(_("quit"))
+        quit_action.triggered.connect(self.quit)
+
+        self.tray_icon.setContextMenu(menu)
+    
+    def create_layout_menu(self):
+        """
+        System status bar creates menu, the widget layout is
+        created when the window is first opened
+        """
+        self.create_tray_icon()
+        self.update_tray_icon()         
+
+    def open_window(self):
+        """
+        Show the main window, creating its layout on first use
+        """
+        if not self.layout_created:
+            self.create_widget_layout()
+        self.show()
+
+    def open_dashboard(self):
+        """
+        Show the dashboard of concurrent countdowns, creating it on first use
+        """
+        if self.dashboard is None:
+            # Imported on first use, like the window widgets
+            from dashboard import Dashboard, TimersModel
+            model = TimersModel(self.scheduler, self.catalog)
+            model.finished.connect(
+                lambda name: self.show_notification(
+                    self.catalog.gettext("Time's up"),
+                    self.catalog.gettext("{name} has expired").format(name=name)))
+            self.dashboard = Dashboard(model, self.clock, self.catalog)
+            self.dashboard.resize(420, 600)
+        self.dashboard.show()
+        self.dashboard.raise_()
+
+    def resize_windows(self, width, high):
+        """Set the default size of the window"""
+        self.resize(width, high)
+
+    def get_time(self, time):
+        """
+        Get the amount of time left in hours, minutes,
+        and seconds format
+        """
+        return get_time(time)
+
+    @property
+    def time_left(self):
+        """The time left in whole seconds, rounded up"""
+        return self.countdown.time_left()
+
+    def schedule_tick(self):
+        """
+        Arm the timer for the moment the displayed second changes,
+        so a late timeout never accumulates into drift, ticking less
+        often while the window is hidden and no event stream is followed
+        """
+        delay = self.countdown.seconds_to_next_change(self.tick_step())
+        self.timer.start(int(delay * 1000) + 1)
+        if self.pacer is not None:
+            self.pacer.request()
+
+    def tick_step(self):
+        """
+        Return the seconds between two ticks, more than one while the
+        window is hidden and no event stream is followed
+        """
+        followed = self.status_stream is not None and self.status_stream.subscribers
+        return 1 if self.isVisible() or followed else self.HIDDEN_TICK_SECONDS
+
+    def precise_frame(self):
+        """
+        Paint the sub-second digits from the deadline and, while the
+        countdown runs, arm the frame showing their next change
+        """
+        if self.label is None or not self.isVisible():
+            return
+        remaining = self.countdown.remaining()
+        self.label.setText(precise_text(remaining, self.precision))
+        if self.countdown.running and remaining > 0:
+            # Changes faster than the display refreshes are shown once
+            # per refresh
+            self.pacer.arm(remaining, min(10 ** self.precision, 1 / self.pacer.period))
+
+    def start(self):
+        """
+        Start the countdown timer at the user's request, silencing
+        the alarm if it is still ringing
+        """
+        if self.alarm is not None:
+            self.alarm.stop()
+        self.start_countdown()
+
+    def start_countdown(self):
+        """
+        Start the countdown timer and update the tray icon
+        """
+        # Turn the time left into a deadline and tick
+        # on the next second boundary
+        self.begin_session()
+        self.scheduler.start(self.name)
+        if self.sequence is not None:
+            self.sequence.start()
+        self.schedule_tick()
+        # Paint the tray icons this countdown is going to show
+        self.icon_renderer.prewarm(self.time_left, self.countdown.duration)
+        # Decode the alarm sound and open its sink now, on the alarm's
+        # thread once it is done ringing, so it sounds as soon as the
+        # countdown expires
+        if self.alarm is not None:
+            self.alarm.prepare()
+        self.update_tray_icon()
+        self.record("start")
+        hours, minutes, seconds = self.get_time(self.time_left)
+        _ = self.catalog.gettext
+        self.show_notification(_("timer starts"),
+                               _("start {hours:02d}:{minutes:02d}:{seconds:02d}").format(
+                                   hours=hours, minutes=minutes, seconds=seconds))
+
+    def pause(self):
+        """
+        Pause the countdown timer and update the tray icon
+        """
+        if self.session is not None and self.countdown.running:
+            self.session.pauses += 1
+        self.scheduler.pause(self.name)
+        if self.sequence is not None:
+            self.sequence.pause()
+        self.timer.stop()
+        self.update_tray_icon()
+        self.record("pause")
+        hours, minutes, seconds = self.get_time(self.time_left)
+        # self.show_notification("Time pause",
+        #                        f"Start {hours:02d}:{minutes:02d}:{seconds:02d}")
+
+    def custom_countdown(self):
+        """
+        Reset the countdown timer to 30 minutes and
+        start the countdown immediately
+        """
+        self.end_session("aborted")
+        self.sequence = None
+        self.scheduler.reset(self.name, self.reset_value)
+        hours,minutes,seconds =self.get_time(self.reset_value)
+        self.renderer.set("label", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.set_time_edit(hours, minutes, seconds)
+        self.preset = "reset"
+        self.start()
+        self.update_tray_icon()
+        self.record("reset")
+
+    def break_time_countdown(self):
+        """Set a countdown to a break and start the countdown immediately
+        """
+        self.end_session("aborted")
+        self.sequence = None
+        self.scheduler.reset(self.name, self.break_time)
+        hours,minutes,seconds =self.get_time(self.break_time)
+        self.renderer.set("label", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.set_time_edit(hours, minutes, seconds)
+        self.preset = "break"
+        self.start()
+        self.update_tray_icon()
+        self.record("break")
+
+    def fill_presets_menu(self, menu):
+        """
+        Fill the presets submenu with one empty submenu per tag,
+        once and again after the library file changed
+        """
+        if not self.presets.refresh() and not menu.isEmpty():
+            return
+        menu.clear()
+        groups = dict(sorted(self.presets.tags.items()))
+        untagged = [preset for preset in self.presets.presets if not preset.tags]
+        if untagged:
+            groups[self.catalog.gettext("other")] = untagged
+        for tag, presets in groups.items():
+            tag_menu = menu.addMenu(tag)
+            tag_menu.aboutToShow.connect(
+                lambda tag_menu=tag_menu, presets=presets: self.fill_tag_menu(tag_menu, presets))
+
+    def fill_tag_menu(self, menu, presets):
+        """
+        Add the actions of the presets of a tag, the first time it shows
+        """
+        if not menu.isEmpty():
+            return
+        for preset in presets:
+            hours, minutes, seconds = self.get_time(preset.seconds)
+            action = menu.addAction(f"{preset.name}  {hours:02d}:{minutes:02d}:{seconds:02d}")
+            action.triggered.connect(lambda checked, preset=preset: self.start_preset(preset))
+
+    def search_presets(self, text):
+        """
+        Offer the presets matching the text typed in the quick-launch box
+        """
+        self.presets.refresh()
+        self.preset_completions.setStringList(
+            [preset.name for preset in self.presets.search(text)])
+
+    def launch_preset(self, text=None):
+        """
+        Start the preset named in the quick-launch box, or its best match
+        """
+        text = self.preset_edit.text() if text is None else text
+        if not text.strip():
+            return
+        self.start_preset(self.match_preset(text))
+        self.preset_edit.clear()
+
+    def match_preset(self, text):
+        """
+        Return the preset named text, or the best match of a search
+        """
+        self.presets.refresh()
+        preset = self.presets.find(text) or next(iter(self.presets.search(text, 1)), None)
+        if preset is None:
+            raise ValueError(self.catalog.gettext("no preset matches {text!r}").format(text=text))
+        return preset
+
+    def start_preset(self, preset):
+        """
+        Set the countdown to a preset of the library and start it immediately
+        """
+        self.end_session("aborted")
+        self.sequence = None
+        self.scheduler.reset(self.name, preset.seconds)
+        hours, minutes, seconds = self.get_time(preset.seconds)
+        self.renderer.set("label", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.set_time_edit(hours, minutes, seconds)
+        self.preset = preset.name
+        self.start()
+        self.update_tray_icon()
+        self.record("preset")
+
+    def start_sequence(self, text):
+        """
+        Compile a sequence such as 4x(50m work, 10m break), 30m long-break
+        into a timeline and start its first segment
+        """
+        timeline = Timeline.parse(text)
+        self.end_session("aborted")
+        self.sequence = Sequence(timeline, self.clock.monotonic)
+        self.enter_segment()
+
+    def enter_segment(self):
+        """
+        Count down what is left of the current segment of the sequence
+        """
+        segment = self.sequence.segment
+        remaining = self.sequence.remaining()
+        self.scheduler.reset(self.name, remaining)
+        hours, minutes, seconds = self.get_time(math.ceil(remaining))
+        self.renderer.set("label", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.set_time_edit(hours, minutes, seconds)
+        self.preset = "break" if is_break(segment) else segment.label
+        # Entered on expiry too, where the alarm that just started rings on
+        self.start_countdown()
+        self.update_tray_icon()
+
+    def skip_segment(self):
+        """
+        Skip the rest of the current segment of the sequence
+        """
+        if self.sequence is None:
+            raise ValueError(self.catalog.gettext("no sequence is playing"))
+        if self.alarm is not None:
+            self.alarm.stop()
+        self.end_session("aborted")
+        if self.sequence.advance():
+            self.enter_segment()
+        else:
+            self.sequence = None
+            self.time_left_set_zero()
+
+    def time_left_set_zero(self):
+        """
+        Set the time left to 0, pause the countdown timer,
+        and update the label and time edit
+        """
+        self.scheduler.reset(self.name, 0)
+        self.pause()
+        self.renderer.set("label", "00:00:00")
+        self.set_time_edit(0, 0, 0)
+        self.update_tray_icon()
+
+    def update_timer(self):
+        """
+        Update the countdown label and tray icon every second,
+        expiry is handled by the scheduler wakeup
+        """
+        # After a suspend, catching up redraws once on its own
+        if self.catch_up():
+            return
+        hours, minutes, seconds = self.get_time(self.time_left)
+        self.renderer.set("label", f"{hours:02d}:{minutes:02d}:{seconds:02d}")
+        self.update_tray_icon()
+        self.publish("tick")
+        if self.journal is not None:
+            self.journal.sync()
+        if self.countdown.running:
+            self.schedule_tick()
+
+    def catch_up(self):
+        """
+        Bring the countdown up to date after a suspend: fire the expiries
+        missed while asleep at once, re-arm the timers and redraw once,
+        and return whether a suspend was detected
+        """
+        slept = self.suspend_detector.check()
+        if not slept:
+            return False
+        if not self.clock.counts_suspend:
+            # The deadlines' clock stood still during the suspend
+            self.scheduler.shift(slept)
+            if self.sequence is not None:
+                self.sequence.countdown.shift(slept)
+        self.scheduler.run_due()
+        self.scheduler.rearm()
+        self.update_timer()
+        return True
+
+    def on_sleep(self, sleeping):
+        """
+        Sleep watcher callback: save the journal before a suspend
+        and catch up as soon as the machine resumes
+        """
+        self.suspend_detector.announce(sleeping)
+        if not sleeping:
+            self.catch_up()
+        elif self.journal is not None:
+            self.journal.sync(force=True)
+
+    def ring_clock_alarm(self, name, alarm):
+        """
+        Sound the alarm and show a notification when a
+        fixed-time alarm rings
+        """
+        if self.alarm is not None:
+            self.alarm.play()
+        _ = self.catalog.gettext
+        self.show_notification(_("Alarm"), _("It is {hour:02d}:{minute:02d}").format(
+            hour=alarm.hour, minute=alarm.minute))
+        if alarm.once:
+            self.save_clock_alarms()
+
+    def add_clock_alarm(self, text):
+        """
+        Add an alarm such as 12:30, 17:55 weekdays or 08:00 once
+        """
+        alarm = ClockAlarm.parse(text)
+        self.clock_alarms.add(str(alarm), alarm)
+        self.save_clock_alarms()
+
+    def add_clock_alarm_from_edit(self):
+        """
+        Add a daily alarm at the hours and minutes of the time edit
+        """
+        qtime = self.time_edit.time()
+        self.add_clock_alarm(f"{qtime.hour():02d}:{qtime.minute():02d}")
+
+    def remove_clock_alarm(self, text):
+        """
+        Remove an alarm given as when it was added
+        """
+        name = str(ClockAlarm.parse(text))
+        if name not in self.clock_alarms.alarms:
+            raise ValueError(self.catalog.gettext("no such alarm: {text}").format(text=text))
+        self.clock_alarms.remove(name)
+        self.save_clock_alarms()
+
+    def save_clock_alarms(self):
+        """
+        Save the fixed-time alarms, if they have a file
+        """
+        if self.alarms_path is not None:
+            self.clock_alarms.save(self.alarms_path)
+
+    def on_expiry(self, name):
+        """
+        Scheduler callback, on the timing worker thread when threaded:
+        sound the alarm at once and hand the expiry to the GUI thread
+        """
+        if self.alarm is not None and name == self.name:
+            self.alarm.play()
+        if self.worker is not None:
+            self.worker.fire(name)
+        else:
+            self.expire(name)
+
+    def expire(self, name):
+        """
+        Stop the countdown and show a notification when
+        its scheduler entry expires
+        """
+        # The shared entry of the fixed-time alarms woke up
+        if name == ClockAlarms.ENTRY:
+            self.clock_alarms.run_due()
+            return
+        # A reset or start handled before this queued expiry superseded it
+        if not self.countdown.expired():
+            return
+        self.end_session("finished")
+        if self.sequence is not None and self.sequence.advance():
+            # Carry straight on with the next segment of the sequence
+            self.enter_segment()
+            return
+        self.sequence = None
+        self.time_left_set_zero()
+        self.show_notification(self.catalog.gettext("Time's up"),
+                               self.catalog.gettext("Your countdown timer has expired!"))
+
+    def arm_wakeup(self, deadline):
+        """
+        Arm the single wakeup for the scheduler's next expiry
+        """
+        if deadline is None:
+            self.wakeup.stop()
+            return
+        delay = max(0.0, deadline - self.scheduler.clock())
+        self.wakeup.start(math.ceil(delay * 1000))
+
+    def set_time_edit(self, hours, minutes, seconds):
+        """
+        Show a time in the time edit, once the window exists,
+        without handling it as a user edit
+        """
+        if not self.layout_created:
+            return
+        self.time_edit.blockSignals(True)
+        self.time_edit.setTime(QTime(hours, minutes, seconds))
+        self.time_edit.blockSignals(False)
+
+    def begin_session(self):
+        """
+        Start recording a countdown, unless one is already being recorded
+        """
+        if self.session is None:
+            from history import Session
+            self.session = Session(self.preset, self.countdown.remaining(),
+                                   started=self.clock.wall())
+
+    def end_session(self, outcome):
+        """
+        End the recorded countdown and hand it to the history,
+        which writes it in the background
+        """
+        if self.session is None:
+            return
+        row = self.session.end(outcome, self.countdown.remaining(),
+                               ended=self.clock.wall())
+        self.session = None
+        if self.history is not None:
+            self.history.add(row)
+
+    def record(self, event):
+        """
+        Write a state transition to the journal, push it to the
+        event stream and send it to the synchronized instances
+        """
+        if self.journal is not None:
+            self.journal.record(event, self.countdown)
+        self.publish("state", transition=event)
+        if self.lan_sync is not None:
+            self.lan_sync.publish(event, self.countdown.running, self.countdown.remaining(),
+                                  self.countdown.duration, self.preset)
+
+    def apply_sync(self, state):
+        """
+        Take over a change of the shared timer made by another instance,
+        without sending it back
+        """
+        if state.get("refined") and state["running"] and self.countdown.running:
+            # The same change announced again with a better estimate of
+            # the sender's clock offset: the session carries on, only its
+            # deadline moves
+            self.scheduler.reset(self.name, max(0.0, state["deadline"] - self.clock.wall()))
+            if self.journal is not None:
+                self.journal.record(state["event"], self.countdown)
+            self.update_timer()
+            return
+        if state["event"] in ("reset", "break", "edit", "preset"):
+            self.end_session("aborted")
+        self.sequence = None
+        self.preset = state["preset"]
+        if state["running"]:
+            # The deadline is on the local wall clock, corrected for the
+            # sender's clock offset
+            self.scheduler.reset(self.name, max(0.0, state["deadline"] - self.clock.wall()))
+            self.begin_session()
+            self.scheduler.start(self.name)
+        else:
+            if self.session is not None and self.countdown.running:
+                self.session.pauses += 1
+            self.scheduler.pause(self.name)
+            self.scheduler.reset(self.name, state["remaining"])
+            self.timer.stop()
+        self.countdown.duration = state["duration"]
+        if self.journal is not None:
+            self.journal.record(state["event"], self.countdown)
+        self.publish("state", transition=state["event"])
+        self.set_time_edit(*self.get_time(self.time_left))
+        self.update_timer()
+
+    def publish(self, event, **extra):
+        """
+        Push the status to the event stream, if it is served
+        """
+        if self.status_stream is not None:
+            self.status_stream.publish(event, {**self.status(), **extra})
+
+    def restore_state(self):
+        """
+        Restore the countdown from the journal, a running countdown
+        carries on towards its saved deadline
+        """
+        state = self.journal.restore() if self.journal is not None else None
+        if state is None:
+            return
+        event, running, remaining, duration = state
+        self.scheduler.reset(self.name, remaining)
+        self.countdown.duration = duration
+        if running and remaining <= 0:
+            self.expire(self.name)
+        elif running:
+            self.begin_session()
+            self.scheduler.start(self.name)
+            self.schedule_tick()
+        self.update_tray_icon()
+
+    def update_tray_icon(self):
+        """
+        Update the tray icon with the time left and tooltip
+        """
+        if self.tick_step() > 1:
+            # Seconds would be stale between two coarse ticks, the minutes
+            # rounded up change on a tick, as on the icon
+            text = self.format_minutes_left(minutes=(self.time_left + 59) // 60)
+        else:
+            minutes = self.time_left // 60
+            seconds = self.time_left % 60
+            text = self.format_time_left(minutes=minutes, seconds=seconds)
+        icon = self.icon
+        if self.countdown.running:
+            icon = self.icon_renderer.icon(self.time_left, self.countdown.progress())
+        self.renderer.render({"menu": text, "tooltip": text, "icon": icon})
+
+    def open_tray_menu(self):
+        """Bring the time left up to date as the tray menu opens"""
+        self.update_tray_icon()
+        self.renderer.flush("menu")
+
+    def quit(self):
+        """
+        Hide the tray icon and exit the application
+        """
+        self.tray_icon.hide()
+        if self.control_server is not None:
+            self.control_server.stop()
+        if self.status_stream is not None:
+            self.status_stream.stop()
+        if self.lan_sync is not None:
+            self.lan_sync.stop()
+        if self.worker is not None:
+            self.worker.stop()
+        self.end_session("aborted")
+        if self.history is not None:
+            self.history.close()
+        if self.journal is not None:
+            self.journal.close()
+        if self.metrics is not None:
+            self.metrics.dump()
+        if self.alarm is not None:
+            self.alarm.close()
+        sys.exit()
+    
+    def update_time_left(self, qtime):
+        """
+        Update the time left based on the user input in the time edit
+        """
+        try:
+            hours, minutes, seconds = qtime.hour(), qtime.minute(), qtime.second()
+            self.edit_time_left(hours * 3600 + minutes * 60 + seconds)
+        except ValueError:
+            pass
+
+    def set_time_left(self, time):
+        """
+        Set the time left, keeping the countdown running or paused
+        """
+        self.edit_time_left(time)
+        self.finish_time_edit()
+
+    def edit_time_left(self, time):
+        """
+        Follow the time left while it is being edited, the session
+        boundary is only recorded once editing finishes
+        """
+        if self.session is not None:
+            # The time spent in the session stays what it was
+            self.session.planned += time - self.countdown.remaining()
+        self.sequence = None
+        self.scheduler.reset(self.name, time)
+        self.preset = "custom"
+        self.time_edited = True
+        if self.time_left == 0:
+            self.renderer.set("label", "00:00:00")
+            return
+        self.update_timer()
+
+    def finish_time_edit(self):
+        """
+        End the session running before the time left was edited and
+        start recording one with the edited time
+        """
+        if not self.time_edited:
+            return
+        self.time_edited = False
+        self.end_session("aborted")
+        self.record("edit")
+        if self.countdown.running:
+            self.begin_session()
+
+    def handle_command(self, command, args):
+        """
+        Run a command received on the control socket
+        and return the resulting status
+        """
+        if command == "start":
+            self.start()
+        elif command == "pause":
+            self.pause()
+        elif command == "reset":
+            self.custom_countdown()
+        elif command == "break":
+            self.break_time_countdown()
+        elif command == "set":
+            if len(args) != 1:
+                raise ValueError("usage: set <seconds|mm:ss|hh:mm:ss>")
+            time_left = parse_duration(args[0])
+            self.set_time_edit(*self.get_time(time_left))
+            self.set_time_left(time_left)
+        elif command == "open":
+            self.open_window()
+        elif command == "sequence":
+            self.start_sequence(" ".join(args))
+        elif command == "skip":
+            self.skip_segment()
+        elif command == "preset":
+            self.start_preset(self.match_preset(" ".join(args)))
+        elif command == "alarm":
+            action = args[0] if args else "list"
+            if action == "add" and len(args) > 1:
+                self.add_clock_alarm(" ".join(args[1:]))
+            elif action == "remove" and len(args) > 1:
+                self.remove_clock_alarm(" ".join(args[1:]))
+            elif action != "list":
+                raise ValueError(self.catalog.gettext(
+                    "usage: alarm [list | add <HH:MM> [days] | remove <HH:MM> [days]]"))
+            return {**self.status(), "alarms": list(self.clock_alarms.alarms)}
+        elif command == "metrics":
+            if self.metrics is None:
+                raise ValueError(self.catalog.gettext("metrics are disabled, start with --metrics"))
+            return {**self.status(), "metrics": self.metrics.text()}
+        return self.status()
+
+    def status(self):
+        """
+        Return the current state of the countdown
+        """
+        hours, minutes, seconds = self.get_time(self.time_left)
+        status = {"time_left": self.time_left,
+                  "running": self.countdown.running,
+                  "preset": self.preset,
+                  "text": f"{hours:02d}:{minutes:02d}:{seconds:02d}"}
+        if self.sequence is not None:
+            status["segment"] = {"label": self.sequence.segment.label,
+                                 "index": self.sequence.index,
+                                 "segments": len(self.sequence.timeline),
+                                 "progress": self.sequence.progress()}
+        return status
+    
+    def toggle_pin(self, state):
+        """
+        Toggle the pin checkbox to keep the window on top or not
+
+        The | operator can be used to process flags
+        In the code, the | operator is used to add the
+        Qt.WindowStaysOnTopHint flag to the flags of the current window.
+        """
+        if state == Qt.Checked:
+            self.setWindowFlags(self.windowFlags() | Qt.WindowStaysOnTopHint)
+        else:
+            self.setWindowFlags(self.windowFlags() & ~Qt.WindowStaysOnTopHint)
+        self.show()
+    
+    def show_notification(self, string1, string2):
+        """
+        Queue a notification with a message and title,
+        it is shown from the event loop
+        """
+        self.notifier.notify(string1, string2)
+    
+    def closeEvent(self, event):
+        """
+        Override the close event to hide the window instead of closing it
+        """
+        self.hide()
+        event.ignore()
+    
+    def showEvent(self, event):
+        """
+        Override the show event to move the window to the bottom right
+        of the screen
+        """
+        super().showEvent(event)
+        tray_geometry = self.tray_icon.geometry()
+        widget_geometry = self.frameGeometry()
+        x = tray_geometry.right()
+        y = tray_geometry.bottom() - int(widget_geometry.height()*(1+1/3))
+        self.move(x, y)
+        # Catch up on changes made while hidden and tick every second again
+        self.update_timer()
+
+
+def create_app(argv, locale="en"):
+    """
+    Create the application and its tray icon, the main window
+    is only built when it is first opened
+    """
+    app = QApplication(argv)
+    # Only the catalog of the locale, --locale=en|zh or the given one,
+    # is loaded
+    catalog = load_catalog(get_option(argv, "locale", locale))
+    # Set the application window name
+    app.setApplicationName(catalog.gettext("Countdown"))
+
+    # Set the palette to black background and white font
+    palette = QPalette()
+    palette.setColor(QPalette.Window, Qt.lightGray)
+    palette.setColor(QPalette.WindowText, Qt.black)
+    palette.setColor(QPalette.Button, Qt.gray)
+    palette.setColor(QPalette.ButtonText, Qt.black)
+    app.setPalette(palette)
+    
+    # Set global font size
+    font = QFont("Arial", 14, QFont.Bold)
+    QApplication.setFont(font)
+
+    # Backend showing notifications, chosen with --notify=tray|dbus|log
+    notify = get_option(argv, "notify", "tray")
+
+    # Expiry alarm, played through --alarm-sink=device|null|file:PATH|off,
+    # with the sound of --alarm-sound=PATH.wav or a built-in tone
+    alarm = make_alarm(get_option(argv, "alarm-sink", "device"),
+                       get_option(argv, "alarm-sound"))
+
+    # With --metrics, time the hot paths of the widget, leaving the
+    # class untouched otherwise
+    metrics = None
+    if "--metrics" in argv[1:]:
+        metrics = Metrics(state_path("metrics.txt"))
+        metrics.instrument(CountdownWidget)
+
+    # Session history, always kept, imported here so the widget module
+    # does not load SQLite for tests and tools that do without it
+    from history import History
+
+    # Create a CountdownWidget object, with --precision=1|2 showing
+    # tenths or hundredths of a second in the window
+    countdownwidget = CountdownWidget(time_left=INIT_TIME_LEFT_AMOUNT,
+                                      reset_value=RESET_VALUE,
+                                      break_time=BREAK_TIME,
+                                      journal=Journal(state_path("journal.log")),
+                                      history=History(state_path("history.sqlite3")),
+                                      threaded=True,
+                                      metrics=metrics,
+                                      notify=notify,
+                                      alarm=alarm,
+                                      sequence=SEQUENCE,
+                                      alarms_path=state_path("alarms.txt"),
+                                      presets=PresetLibrary(state_path("presets.txt"),
+                                                            state_path("presets.cache")),
+                                      catalog=catalog,
+                                      precision=int(get_option(argv, "precision", 0)))
+    # set window size
+    countdownwidget.resize_windows(300, 200)
+    # System status bar creates menu
+    countdownwidget.create_layout_menu()
+    # Resume the countdown that was running before a quit or crash
+    countdownwidget.restore_state()
+    # Fixed-time alarms saved by the last run
+    countdownwidget.clock_alarms.load(countdownwidget.alarms_path)
+    # Catch up as soon as logind announces a resume
+    countdownwidget.sleep_watcher = watch_sleep(countdownwidget.on_sleep)
+    # With --status-port=PORT, serve the status and its live event
+    # stream over HTTP, on --status-host=HOST or localhost only
+    status_port = get_option(argv, "status-port")
+    if status_port is not None:
+        from status_stream import StatusStream
+        countdownwidget.status_stream = StatusStream(
+            get_option(argv, "status-host", "127.0.0.1"), int(status_port))
+        countdownwidget.status_stream.start()
+        countdownwidget.publish("state")
+    # With --sync=NAME, share the countdown with the instances on the
+    # network started with the same name, over --sync-interface=IP
+    sync = get_option(argv, "sync")
+    if sync is not None:
+        from lan_sync import LanSync
+        countdownwidget.lan_sync = LanSync(
+            sync, countdownwidget.synced.emit,
+            interface=get_option(argv, "sync-interface", "0.0.0.0"),
+            wall=countdownwidget.clock.wall)
+        countdownwidget.lan_sync.start()
+    return app, countdownwidget
+
+
+def main(argv, locale="en"):
+    """
+    Run the application in a locale, or hand the command line to the
+    instance already running
+    """
+    # Hand the command line to an instance that is already running
+    # instead of starting a second timer
+    command = [arg for arg in argv[1:] if not arg.startswith("--")]
+    reply = control.forward(command)
+    if reply is not None:
+        return 0 if reply["ok"] else 1
+    request = None
+    if command:
+        try:
+            request = control.parse_request(" ".join(command))
+        except ValueError as error:
+            print(f"{error}\n\n{control.__doc__.strip()}", file=sys.stderr)
+            return 1
+
+    app, countdownwidget = create_app(argv, locale)
+
+    # Listen for commands from scripts and later launches
+    if control.AVAILABLE:
+        countdownwidget.control_server = control.ControlServer(
+            control.socket_path(),
+            control.gui_dispatcher(countdownwidget.handle_command))
+        countdownwidget.control_server.start()
+    if request is not None:
+        try:
+            countdownwidget.handle_command(*request)
+        except ValueError as error:
+            # As for a command on the control socket, the timer carries on
+            print(error, file=sys.stderr)
+
+    # If you want to start countdown immediately then uncomment below
+    # countdownwidget.start()
+
+    return app.exec_()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,326 @@
+"""
+Qt-independent timing core shared by the countdown front ends.
+
+The countdown keeps an absolute deadline on a monotonic clock instead of
+decrementing a counter once per tick, so late or coalesced timer events
+never add drift: the remaining time is always worked out from the deadline.
+
+Time reads and timers go through a clock object. SystemClock uses the real
+clocks and Qt timers, FakeClock only moves when a test tells it to, so hours
+of countdown can be simulated in milliseconds. Where the platform has one,
+deadlines are kept on a clock that keeps counting while the machine is
+suspended, so a countdown still expires on time after a wake.
+"""
+import math
+import os
+import time
+
+
+# Clock counting the time spent suspended, None where there is none
+CLOCK_BOOTTIME = getattr(time, "CLOCK_BOOTTIME", None)
+
+# Presets shared by the tray application and the terminal countdown
+# Seconds of the initial value of the timer
+INIT_TIME_LEFT_AMOUNT = 1800
+# Seconds the timer is reset to
+RESET_VALUE = 60*60
+# Seconds of a break
+BREAK_TIME = 60*15
+# Work and break sequence offered to start in one go
+SEQUENCE = "4x(50m work, 10m break), 30m long-break"
+
+
+def get_time(time):
+    """
+    Get the amount of time left in hours, minutes,
+    and seconds format
+    """
+    hours = time // 3600
+    minutes = (time % 3600) // 60
+    seconds = time % 60
+    return hours, minutes, seconds
+
+
+def precise_text(remaining, digits):
+    """
+    Format a remaining time in seconds as hh:mm:ss with digits decimals,
+    rounded up like the whole-second display so it only shows zero once
+    the countdown has expired
+    """
+    units = 10 ** digits
+    # Rounded first, so 12.3 seconds is not shown as 12.4 by float error
+    count = math.ceil(round(remaining * units, 6))
+    whole, fraction = divmod(count, units)
+    hours, minutes, seconds = get_time(whole)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{fraction:0{digits}d}"
+
+
+def parse_duration(text):
+    """
+    Parse a duration given as seconds, mm:ss or hh:mm:ss
+    and return it in seconds
+    """
+    parts = text.split(":")
+    if not 1 <= len(parts) <= 3:
+        raise ValueError(f"invalid duration: {text!r}")
+    seconds = 0
+    for part in parts:
+        if not part.isdigit():
+            raise ValueError(f"invalid duration: {text!r}")
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def state_path(name):
+    """
+    Return the path of a file in the per-user state directory,
+    creating the directory if needed
+    """
+    directory = os.path.join(os.path.expanduser("~"), ".countdown")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, name)
+
+
+def get_option(argv, name, default=None):
+    """Return the value of a --name=value command line option, or default"""
+    prefix = f"--{name}="
+    return next((arg[len(prefix):] for arg in argv[1:] if arg.startswith(prefix)), default)
+
+
+class Countdown:
+    """A countdown stored as a deadline while running, or a remainder while paused"""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        # Function returning the current monotonic time in seconds
+        self.clock = clock
+        # Length of the countdown as last set, used for progress
+        self.duration = seconds
+        # Remaining seconds, only meaningful while the countdown is paused
+        self._remaining = float(seconds)
+        # Absolute monotonic deadline, None while the countdown is paused
+        self.deadline = None
+
+    @property
+    def running(self):
+        """Whether the countdown is currently counting down"""
+        return self.deadline is not None
+
+    def remaining(self):
+        """Return the exact remaining time in seconds, never below zero"""
+        if self.deadline is None:
+            return self._remaining
+        return max(0.0, self.deadline - self.clock())
+
+    def time_left(self):
+        """
+        Return the remaining time in whole seconds, rounded up so that
+        the display only reaches zero when the countdown has expired
+        """
+        return math.ceil(self.remaining())
+
+    def progress(self):
+        """Return the elapsed fraction of the countdown, from 0 to 1"""
+        if self.duration <= 0:
+            return 1.0
+        return 1.0 - self.remaining() / self.duration
+
+    def expired(self):
+        """Whether the countdown has reached zero"""
+        return self.remaining() <= 0
+
+    def start(self):
+        """Turn the remaining time into an absolute deadline"""
+        if self.deadline is None:
+            self.deadline = self.clock() + self._remaining
+
+    def pause(self):
+        """Freeze the remaining time and drop the deadline"""
+        if self.deadline is not None:
+            self._remaining = self.remaining()
+            self.deadline = None
+
+    def reset(self, seconds):
+        """Set the remaining time, keeping the running state unchanged"""
+        self.duration = seconds
+        if self.deadline is None:
+            self._remaining = float(seconds)
+        else:
+            self.deadline = self.clock() + seconds
+
+    def shift(self, seconds):
+        """
+        Move the deadline of a running countdown earlier by seconds its
+        clock missed, such as a suspend its clock did not count
+        """
+        if self.deadline is not None:
+            self.deadline -= seconds
+
+    def seconds_to_next_change(self, step=1):
+        """
+        Return the time until the displayed whole-second value next
+        reaches a multiple of step, used to align the next tick with
+        the second boundary
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            return float(step)
+        return remaining - (math.ceil(remaining) - 1) // step * step
+
+
+def boottime():
+    """Return the monotonic time including the time spent suspended (Linux)"""
+    return time.clock_gettime(CLOCK_BOOTTIME)
+
+
+class SystemClock:
+    """Real monotonic and wall-clock time, with Qt timers"""
+
+    wall = staticmethod(time.time)
+
+    def __init__(self):
+        # Whether monotonic keeps counting while the machine is suspended,
+        # otherwise deadlines are shifted by the suspend on wake
+        self.counts_suspend = CLOCK_BOOTTIME is not None
+        self.monotonic = boottime if self.counts_suspend else time.monotonic
+
+    def suspended(self):
+        """
+        Return a reading that grows by the time spent suspended, 0 where
+        there is no boot time: wall-clock minus monotonic time would also
+        move when the wall clock is set, and take that for a suspend
+        """
+        if self.counts_suspend:
+            return boottime() - time.monotonic()
+        return 0.0
+
+    def create_timer(self):
+        """Return a new QTimer"""
+        from PyQt5.QtCore import QTimer
+        return QTimer()
+
+
+class Signal:
+    """Minimal stand-in for a Qt signal"""
+
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class FakeTimer:
+    """The part of the QTimer interface the application uses, driven by a FakeClock"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.timeout = Signal()
+        self._interval = 0
+        self._single_shot = False
+        # Fake monotonic time of the next timeout, None while stopped
+        self.due = None
+
+    def setSingleShot(self, single_shot):
+        self._single_shot = single_shot
+
+    def setTimerType(self, timer_type):
+        pass
+
+    def setInterval(self, msec):
+        self._interval = msec
+
+    def interval(self):
+        return self._interval
+
+    def isActive(self):
+        return self.due is not None
+
+    def start(self, msec=None):
+        if msec is not None:
+            self._interval = msec
+        self.due = self.clock.monotonic() + self._interval / 1000
+        self.clock.timers.add(self)
+
+    def stop(self):
+        self.due = None
+        self.clock.timers.discard(self)
+
+    def fire(self):
+        """Emit timeout, re-arming a repeating timer first as QTimer does"""
+        if self._single_shot:
+            self.stop()
+        else:
+            self.due = self.clock.monotonic() + self._interval / 1000
+        self.timeout.emit()
+
+
+class FakeClock:
+    """Deterministic clock for tests, moving only when told to"""
+
+    def __init__(self, start=0.0, wall_start=1_700_000_000.0, counts_suspend=True):
+        self._now = start
+        # Difference between the fake wall clock and the fake monotonic clock
+        self._wall_offset = wall_start - start
+        # Active fake timers
+        self.timers = set()
+        # Whether monotonic counts simulated suspends, like boot time does
+        self.counts_suspend = counts_suspend
+        self._suspended = 0.0
+
+    def monotonic(self):
+        return self._now
+
+    def wall(self):
+        return self._now + self._wall_offset
+
+    def suspended(self):
+        # Like the system clock, only boot time can tell a suspend
+        return self._suspended if self.counts_suspend else 0.0
+
+    def create_timer(self):
+        """Return a new timer driven by this clock"""
+        return FakeTimer(self)
+
+    def advance(self, seconds):
+        """
+        Step time forward, firing every timeout in order at
+        its exact due time on the way
+        """
+        target = self._now + seconds
+        while self.timers:
+            timer = min(self.timers, key=lambda timer: timer.due)
+            if timer.due > target:
+                break
+            self._now = max(self._now, timer.due)
+            timer.fire()
+        self._now = target
+
+    def step_wall(self, seconds):
+        """Step the wall clock by seconds, like a user or NTP setting it"""
+        self._wall_offset += seconds
+
+    def jump(self, seconds):
+        """
+        Move time forward at once, then fire every overdue timer
+        once, like late wakeups after the process was stalled
+        """
+        self._now += seconds
+        self.advance(0)
+
+    def suspend(self, seconds):
+        """
+        Simulate a suspend of the machine: the wall clock moves on, and so
+        does monotonic if it counts suspends, but timers, which only count
+        awake time, fire that much later and none fires on the way
+        """
+        self._suspended += seconds
+        if self.counts_suspend:
+            self._now += seconds
+            for timer in self.timers:
+                timer.due += seconds
+        else:
+            self._wall_offset += seconds
@@ -0,0 +1,281 @@
+"""
+Dashboard of many concurrent countdowns, as a Qt model and view.
+
+Every timer of the dashboard is an entry of the application's scheduler,
+so however many are running, their expiries share its single wakeup. The
+view only asks the model for the rows it paints, with fixed row heights so
+it never measures the others. One shared tick walks the rows currently
+visible, compares each time left with the value last handed to the view
+and emits dataChanged for the contiguous ranges that changed: a tick costs
+the same with 50 timers as with 5,000, and scrolling only paints the rows
+coming into view.
+"""
+import itertools
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+from PyQt5.QtWidgets import (QAbstractItemView, QHBoxLayout, QHeaderView, QLineEdit,
+                             QPushButton, QTableView, QVBoxLayout, QWidget)
+
+from countdown_core import get_time, parse_duration
+from i18n import Catalog
+
+
+class Timer:
+    """One row of the dashboard"""
+
+    def __init__(self, name, key, duration, countdown):
+        self.name = name
+        # Name of the scheduler entry
+        self.key = key
+        # Seconds the timer is reset to
+        self.duration = duration
+        self.countdown = countdown
+        # Time left last handed to the view, None until painted
+        self.shown = None
+
+
+class TimersModel(QAbstractTableModel):
+    """Countdowns of the dashboard, one per row"""
+
+    NAME, TIME_LEFT, START, RESET = range(4)
+    # Column titles, translated by the model's catalog
+    HEADERS = ("Timer", "Time left", "", "")
+    # Prefix of the scheduler entries of the dashboard
+    PREFIX = "dashboard:"
+
+    # Emitted with the scheduler entry name, from whichever thread
+    # fires the scheduler, and queued to the model's thread
+    expired = pyqtSignal(str)
+    # Emitted with the timer name when a timer reaches zero
+    finished = pyqtSignal(str)
+
+    def __init__(self, scheduler, catalog=None):
+        super().__init__()
+        self.scheduler = scheduler
+        # Texts of the headers and button cells, translated once
+        _ = (catalog if catalog is not None else Catalog()).gettext
+        self.headers = tuple(_(header) for header in self.HEADERS)
+        self.texts = {"start": _("Start"), "pause": _("Pause"), "reset": _("Reset")}
+        self.timers = []
+        # Row of each timer, by scheduler entry name
+        self.rows = {}
+        self._keys = itertools.count()
+        self.expired.connect(self.expire)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.timers)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        timer = self.timers[index.row()]
+        column = index.column()
+        if column == self.NAME:
+            return timer.name
+        if column == self.TIME_LEFT:
+            timer.shown = timer.countdown.time_left()
+            hours, minutes, seconds = get_time(timer.shown)
+            return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        if column == self.START:
+            return self.texts["pause" if timer.countdown.running else "start"]
+        return self.texts["reset"]
+
+    def add(self, name, seconds):
+        """Append a paused timer and return its row"""
+        row = len(self.timers)
+        key = f"{self.PREFIX}{next(self._keys)}"
+        countdown = self.scheduler.add_countdown(key, seconds, self.expired.emit)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.timers.append(Timer(name, key, seconds, countdown))
+        self.rows[key] = row
+        self.endInsertRows()
+        return row
+
+    def remove(self, row):
+        """Remove the timer of a row"""
+        # Out of the scheduler and the rows first, so that an expiry of
+        # the timer queued meanwhile finds nothing to update
+        key = self.timers[row].key
+        self.scheduler.remove(key)
+        del self.rows[key]
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.timers[row]
+        self.rows = {timer.key: row for row, timer in enumerate(self.timers)}
+        self.endRemoveRows()
+
+    def activate(self, index):
+        """Start, pause or reset the timer of a clicked button cell"""
+        row = index.row()
+        timer = self.timers[row]
+        if index.column() == self.START:
+            if timer.countdown.running:
+                self.scheduler.pause(timer.key)
+            else:
+                if timer.countdown.expired():
+                    self.scheduler.reset(timer.key, timer.duration)
+                self.scheduler.start(timer.key)
+        elif index.column() == self.RESET:
+            self.scheduler.reset(timer.key, timer.duration)
+        else:
+            return
+        self.dataChanged.emit(self.index(row, self.TIME_LEFT),
+                              self.index(row, self.START), [Qt.DisplayRole])
+
+    def expire(self, key):
+        """Show a timer that reached zero as stopped"""
+        row = self.rows.get(key)
+        if row is None or row >= len(self.timers) or self.timers[row].key != key:
+            return
+        self.dataChanged.emit(self.index(row, self.TIME_LEFT),
+                              self.index(row, self.START), [Qt.DisplayRole])
+        self.finished.emit(self.timers[row].name)
+
+    def tick(self, first, last):
+        """
+        Emit dataChanged for the ranges of rows from first to last whose
+        time left differs from what the view shows, and return how many
+        rows changed
+        """
+        changed = 0
+        start = None
+        for row in range(first, last + 1):
+            timer = self.timers[row]
+            if timer.shown is not None and timer.countdown.time_left() != timer.shown:
+                changed += 1
+                if start is None:
+                    start = row
+            elif start is not None:
+                self._time_changed(start, row - 1)
+                start = None
+        if start is not None:
+            self._time_changed(start, last)
+        return changed
+
+    def next_change(self, first, last):
+        """
+        Return the seconds until the time left of a running timer from
+        first to last next changes, or None when none is running
+        """
+        delays = [timer.countdown.seconds_to_next_change()
+                  for timer in self.timers[first:last + 1] if timer.countdown.running]
+        return min(delays, default=None)
+
+    def _time_changed(self, first, last):
+        self.dataChanged.emit(self.index(first, self.TIME_LEFT),
+                              self.index(last, self.TIME_LEFT), [Qt.DisplayRole])
+
+
+class Dashboard(QWidget):
+    """Window listing the timers of a model, refreshed by one shared tick"""
+
+    # Shortest interval between two ticks in seconds, bounding the
+    # wakeups when visible timers change at many different phases
+    MIN_TICK_SECONDS = 0.1
+    ROW_HEIGHT = 24
+
+    def __init__(self, model, clock, catalog=None):
+        super().__init__()
+        self.catalog = catalog if catalog is not None else Catalog()
+        _ = self.catalog.gettext
+        self.setWindowTitle(_("Countdown dashboard"))
+        self.model = model
+
+        # Fixed row heights and column widths, so the view never
+        # measures rows it does not paint
+        self.view = QTableView()
+        self.view.setModel(model)
+        self.view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        rows = self.view.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(self.ROW_HEIGHT)
+        rows.hide()
+        columns = self.view.horizontalHeader()
+        columns.setSectionResizeMode(QHeaderView.Fixed)
+        columns.setSectionResizeMode(model.NAME, QHeaderView.Stretch)
+        self.view.clicked.connect(self.activate)
+        self.view.verticalScrollBar().valueChanged.connect(self.schedule_tick)
+        model.rowsInserted.connect(self.schedule_tick)
+
+        # Add timers as "name duration", such as "tea 4:00"
+        self.entry = QLineEdit()
+        self.entry.setPlaceholderText(_("name 25:00"))
+        self.entry.returnPressed.connect(self.add_from_entry)
+        add_button = QPushButton(_("Add"))
+        add_button.clicked.connect(self.add_from_entry)
+
+        entry_layout = QHBoxLayout()
+        entry_layout.addWidget(self.entry)
+        entry_layout.addWidget(add_button)
+        layout = QVBoxLayout()
+        layout.addWidget(self.view)
+        layout.addLayout(entry_layout)
+        self.setLayout(layout)
+
+        # The single tick refreshing every visible row
+        self.timer = clock.create_timer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.tick)
+
+    def visible_rows(self):
+        """Return the first and last rows in view, or None when there are none"""
+        count = self.model.rowCount()
+        if not count or not self.isVisible():
+            return None
+        first = self.view.rowAt(0)
+        last = self.view.rowAt(self.view.viewport().height() - 1)
+        return max(first, 0), last if last >= 0 else count - 1
+
+    def tick(self):
+        """Refresh the visible rows that changed and arm the next tick"""
+        rows = self.visible_rows()
+        if rows is not None:
+            self.model.tick(*rows)
+        self.schedule_tick()
+
+    def schedule_tick(self, *args):
+        """
+        Arm the tick for the next change of a visible running timer,
+        or stop it when none is in view
+        """
+        rows = self.visible_rows()
+        delay = self.model.next_change(*rows) if rows is not None else None
+        if delay is None:
+            self.timer.stop()
+            return
+        self.timer.start(int(max(delay, self.MIN_TICK_SECONDS) * 1000) + 1)
+
+    def activate(self, index):
+        self.model.activate(index)
+        self.schedule_tick()
+
+    def add_from_entry(self):
+        """Add the timer typed in the entry, such as "tea 4:00" """
+        words = self.entry.text().rsplit(None, 1)
+        try:
+            if len(words) != 2:
+                raise ValueError(self.catalog.gettext(
+                    "type a name and a duration, such as tea 4:00"))
+            self.model.add(words[0], parse_duration(words[1]))
+        except ValueError as error:
+            self.entry.setToolTip(str(error))
+            self.entry.selectAll()
+            return
+        self.entry.setToolTip("")
+        self.entry.clear()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_tick()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
@@ -0,0 +1,200 @@
+"""
+Indexed history of finished and aborted countdown sessions.
+
+Sessions are stored in an embedded SQLite database. They are handed to a
+writer thread and inserted in batches, so the GUI thread never waits on the
+disk. An insert trigger keeps a per-day rollup table up to date, which lets
+daily and weekly focus-time aggregates over years of history read a few
+hundred rows instead of scanning every session. Exports stream rows from a
+cursor and never hold the whole history in memory.
+
+Run ``python history.py daily|weekly|export`` to query the default database.
+"""
+import argparse
+import csv
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+from countdown_core import state_path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    day TEXT NOT NULL,
+    preset TEXT NOT NULL,
+    planned REAL NOT NULL,
+    actual REAL NOT NULL,
+    pauses INTEGER NOT NULL,
+    outcome TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_started ON sessions (started);
+CREATE TABLE IF NOT EXISTS daily_totals (
+    day TEXT PRIMARY KEY,
+    focus REAL NOT NULL,
+    sessions INTEGER NOT NULL,
+    finished INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS sessions_daily_totals AFTER INSERT ON sessions
+BEGIN
+    INSERT INTO daily_totals (day, focus, sessions, finished)
+    VALUES (NEW.day,
+            CASE WHEN NEW.preset = 'break' THEN 0 ELSE NEW.actual END,
+            1,
+            NEW.outcome = 'finished')
+    ON CONFLICT (day) DO UPDATE SET
+        focus = focus + excluded.focus,
+        sessions = sessions + 1,
+        finished = finished + excluded.finished;
+END;
+"""
+
+# Columns of a session, in storage and export order
+COLUMNS = ("started", "ended", "day", "preset", "planned", "actual", "pauses", "outcome")
+
+
+class Session:
+    """One countdown, from its start to its expiry or abort"""
+
+    def __init__(self, preset, planned, started=None):
+        # Name of the preset that started the countdown: reset, break or custom
+        self.preset = preset
+        # Seconds the countdown was set to when it started, moved by an
+        # edit of the time left until the edit finishes and ends the session
+        self.planned = planned
+        # Wall-clock start time
+        self.started = time.time() if started is None else started
+        self.pauses = 0
+
+    def end(self, outcome, remaining, ended=None):
+        """Return the row of the session ending with outcome and remaining seconds"""
+        ended = time.time() if ended is None else ended
+        day = time.strftime("%Y-%m-%d", time.localtime(self.started))
+        actual = max(0.0, self.planned - remaining)
+        return (self.started, ended, day, self.preset, self.planned, actual,
+                self.pauses, outcome)
+
+
+class History:
+    """Session store with a background batch writer"""
+
+    def __init__(self, path, batch_size=256):
+        self.path = path
+        # Largest number of sessions inserted in one transaction
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        connection.close()
+        # Connection for queries, used from the calling thread
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        self._reader_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_batches,
+                                        name="history-writer", daemon=True)
+        self._writer.start()
+
+    def add(self, row):
+        """Queue a session row for writing, without blocking"""
+        self._queue.put(row)
+
+    def flush(self):
+        """Wait until every queued session has been written"""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued sessions and stop the writer thread"""
+        self._queue.put(None)
+        self._writer.join()
+        self._reader.close()
+
+    def daily_totals(self, first_day, last_day):
+        """Return (day, focus seconds, sessions, finished) for each day with sessions"""
+        return self._query(
+            "SELECT day, focus, sessions, finished FROM daily_totals "
+            "WHERE day BETWEEN ? AND ? ORDER BY day", (first_day, last_day))
+
+    def weekly_totals(self, first_day, last_day):
+        """Return (week, focus seconds, sessions, finished) for each week with sessions"""
+        return self._query(
+            "SELECT strftime('%Y-W%W', day) AS week, SUM(focus), SUM(sessions), "
+            "SUM(finished) FROM daily_totals WHERE day BETWEEN ? AND ? "
+            "GROUP BY week ORDER BY week", (first_day, last_day))
+
+    def rows(self, since=0.0):
+        """Yield session rows started since a wall-clock time, oldest first"""
+        connection = sqlite3.connect(self.path)
+        try:
+            yield from connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sessions WHERE started >= ? "
+                "ORDER BY started", (since,))
+        finally:
+            connection.close()
+
+    def export(self, file, format="csv", since=0.0):
+        """Stream sessions to a text file as CSV or JSON lines"""
+        if format == "csv":
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS)
+            writer.writerows(self.rows(since))
+        elif format == "jsonl":
+            for row in self.rows(since):
+                file.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+        else:
+            raise ValueError(f"unknown export format: {format}")
+
+    def _query(self, sql, parameters):
+        with self._reader_lock:
+            return self._reader.execute(sql, parameters).fetchall()
+
+    def _write_batches(self):
+        """Insert queued sessions in batches until closed"""
+        connection = sqlite3.connect(self.path)
+        insert = (f"INSERT INTO sessions ({', '.join(COLUMNS)}) "
+                  f"VALUES ({', '.join('?' * len(COLUMNS))})")
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            running = len(rows) == len(batch)
+            if rows:
+                with connection:
+                    connection.executemany(insert, rows)
+            for _ in batch:
+                self._queue.task_done()
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the countdown session history")
+    parser.add_argument("command", choices=("daily", "weekly", "export"))
+    parser.add_argument("--from", dest="first_day", default="0000-00-00")
+    parser.add_argument("--to", dest="last_day", default="9999-99-99")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    args = parser.parse_args()
+
+    history = History(state_path("history.sqlite3"))
+    if args.command == "export":
+        history.export(sys.stdout, args.format)
+    else:
+        totals = (history.daily_totals if args.command == "daily"
+                  else history.weekly_totals)(args.first_day, args.last_day)
+        for period, focus, sessions, finished in totals:
+            print(f"{period}  {focus / 3600:6.2f}h focus  "
+                  f"{sessions:4d} sessions  {finished:4d} finished")
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Translations of the countdown's user interface.
+
+Messages are written in English in the code, and translated by a catalog
+per locale: ``locale/<locale>.po``, a subset of the gettext format edited
+by translators, is compiled ahead of time into ``locale/<locale>.catalog``,
+a marshalled dictionary loaded in one read without parsing. Only the
+active locale's catalog is loaded. A compiled catalog records the
+modification time and size of the source it was compiled from, and is
+compiled again on load when the source changed.
+
+Run ``python i18n.py`` to compile every catalog.
+"""
+import ast
+import marshal
+import os
+import sys
+
+
+# Language the messages are written in, needing no catalog
+SOURCE_LOCALE = "en"
+
+# Directory of the catalogs
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "locale")
+
+# Version of the compiled catalog layout, bumped when it changes
+CATALOG_FORMAT = 1
+
+
+class Catalog:
+    """Translations of the messages of one locale"""
+
+    def __init__(self, locale=SOURCE_LOCALE, messages=None):
+        self.locale = locale
+        # Translation of each message, by English message
+        self.messages = messages if messages is not None else {}
+
+    def __len__(self):
+        return len(self.messages)
+
+    def gettext(self, message):
+        """Return the translation of a message, the message itself when there is none"""
+        return self.messages.get(message, message)
+
+    def formatter(self, message):
+        """
+        Return the format method of a message's translation, to bind
+        once the texts that are formatted again and again
+        """
+        return self.gettext(message).format
+
+
+def parse_po(lines):
+    """
+    Parse the msgid and msgstr pairs of a .po file, strings continued on
+    the following lines included, skipping comments and untranslated
+    messages
+    """
+    messages = {}
+    entry = {}
+    field = None
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        keyword, _, text = line.partition(" ")
+        if keyword in ("msgid", "msgstr"):
+            if keyword == "msgid" and "msgstr" in entry:
+                if entry["msgid"] and entry["msgstr"]:
+                    messages[entry["msgid"]] = entry["msgstr"]
+                entry = {}
+            field = keyword
+            entry[field] = ""
+        elif line.startswith('"') and field is not None:
+            text = line
+        else:
+            raise ValueError(f"line {number}: invalid catalog line: {line!r}")
+        try:
+            entry[field] += ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            raise ValueError(f"line {number}: invalid string: {text!r}") from None
+    if entry.get("msgid") and entry.get("msgstr"):
+        messages[entry["msgid"]] = entry["msgstr"]
+    return messages
+
+
+def source_stamp(path):
+    """Return the (modification time, size) of a file, None when it is missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def compile_catalog(source, target):
+    """
+    Compile a .po file into a catalog file, atomically replaced, and
+    return its messages
+    """
+    stamp = source_stamp(source)
+    with open(source, encoding="utf-8") as file:
+        messages = parse_po(file)
+    temporary = target + ".tmp"
+    with open(temporary, "wb") as file:
+        marshal.dump((CATALOG_FORMAT, stamp, messages), file)
+    os.replace(temporary, target)
+    return messages
+
+
+def load_catalog(locale, directory=LOCALE_DIR):
+    """
+    Return the catalog of a locale, compiling it first when its source
+    changed since it was compiled
+    """
+    if locale == SOURCE_LOCALE:
+        return Catalog()
+    source = os.path.join(directory, f"{locale}.po")
+    target = os.path.join(directory, f"{locale}.catalog")
+    stamp = source_stamp(source)
+    try:
+        with open(target, "rb") as file:
+            compiled_format, compiled_stamp, messages = marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        compiled_format = compiled_stamp = None
+    # A compiled catalog shipped without its source is used as it is
+    if compiled_format == CATALOG_FORMAT and (stamp is None or tuple(compiled_stamp) == stamp):
+        return Catalog(locale, messages)
+    if stamp is None:
+        raise ValueError(f"unknown locale: {locale}")
+    try:
+        messages = compile_catalog(source, target)
+    except OSError:
+        # Read-only install: translate from the source this time
+        with open(source, encoding="utf-8") as file:
+            messages = parse_po(file)
+    return Catalog(locale, messages)
+
+
+def available_locales(directory=LOCALE_DIR):
+    """Return the locales there is a catalog for, the source one included"""
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    return sorted({SOURCE_LOCALE} | {os.path.splitext(name)[0] for name in names
+                                     if name.endswith((".po", ".catalog"))})
+
+
+def main():
+    """Compile every catalog"""
+    for name in sorted(os.listdir(LOCALE_DIR)):
+        if name.endswith(".po"):
+            source = os.path.join(LOCALE_DIR, name)
+            target = os.path.splitext(source)[0] + ".catalog"
+            messages = compile_catalog(source, target)
+            print(f"{target}: {len(messages)} messages, {os.path.getsize(target)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Crash-safe, append-only journal of countdown state transitions.
+
+Every start/pause/reset/break/edit appends one short line holding the whole
+state of the countdown, so resuming after a crash or a reboot only needs the
+last complete line, read from the end of the file, and never a replay of the
+log. Ticks write nothing. Lines reach the OS as soon as they are written,
+while fsync is batched to at most one call per interval, and the file is
+compacted down to its last line once it has grown long.
+
+A line reads ``<event> <running> <value> <duration>``, where value is the
+wall-clock deadline while running and the remaining seconds while paused.
+"""
+import os
+import time
+
+
+class Journal:
+    """Append-only state journal with batched fsync and compaction"""
+
+    # Bytes read from the end of the file when looking for the last line
+    TAIL_BYTES = 4096
+
+    def __init__(self, path, fsync_interval=5.0, compact_after=1000,
+                 clock=time.monotonic, wall_clock=time.time):
+        self.path = path
+        # Smallest number of seconds between two fsync calls
+        self.fsync_interval = fsync_interval
+        # Number of lines after which the file is compacted
+        self.compact_after = compact_after
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self._file = open(path, "a", encoding="ascii")
+        if self._file.tell() and not self._ends_with_newline():
+            # Terminate a line cut short by a crash before appending
+            self._file.write("\n")
+        self._lines = 0
+        self._last_line = None
+        self._dirty = False
+        self._synced = clock()
+
+    def record(self, event, countdown):
+        """Append the state of countdown after the transition event"""
+        if countdown.running:
+            value = self.wall_clock() + countdown.remaining()
+        else:
+            value = countdown.remaining()
+        line = f"{event} {int(countdown.running)} {value:.3f} {countdown.duration:g}\n"
+        self._file.write(line)
+        self._file.flush()
+        self._last_line = line
+        self._lines += 1
+        self._dirty = True
+        if self._lines >= self.compact_after:
+            self.compact()
+        else:
+            self.sync()
+
+    def sync(self, force=False):
+        """fsync pending lines if the fsync interval has passed, or if forced"""
+        if not self._dirty:
+            return
+        now = self.clock()
+        if force or now - self._synced >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._dirty = False
+            self._synced = now
+
+    def compact(self):
+        """Atomically replace the file with its last line"""
+        if self._last_line is None:
+            return
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="ascii") as file:
+            file.write(self._last_line)
+            file.flush()
+            os.fsync(file.fileno())
+        self._file.close()
+        os.replace(temporary, self.path)
+        self._file = open(self.path, "a", encoding="ascii")
+        self._lines = 1
+        self._dirty = False
+        self._synced = self.clock()
+
+    def restore(self):
+        """
+        Return (event, running, remaining, duration) from the last complete
+        line, with remaining worked out from the wall clock for a running
+        countdown, or None when there is nothing to restore
+        """
+        try:
+            with open(self.path, "rb") as file:
+                file.seek(0, os.SEEK_END)
+                size = file.tell()
+                file.seek(max(0, size - self.TAIL_BYTES))
+                tail = file.read()
+        except OSError:
+            return None
+        # A line cut short by a crash has no newline and is skipped
+        for line in reversed(tail.split(b"\n")[:-1]):
+            try:
+                event, running, value, duration = line.decode("ascii").split()
+                running, value, duration = running == "1", float(value), float(duration)
+            except ValueError:
+                continue
+            remaining = value - self.wall_clock() if running else value
+            return event, running, max(0.0, remaining), duration
+        return None
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as file:
+            file.seek(-1, os.SEEK_END)
+            return file.read(1) == b"\n"
+
+    def close(self):
+        """fsync pending lines and close the file"""
+        self.sync(force=True)
+        self._file.close()
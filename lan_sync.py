@@ -0,0 +1,208 @@
+"""
+Opt-in synchronization of a shared timer between instances on a LAN.
+
+Instances started with --sync=NAME join a UDP multicast group and share the
+state of one named timer: whether it runs, its absolute deadline while it
+does, what was left when it was paused, its duration and preset. Every
+state change is sent at once as a single datagram, so it reaches the other
+instances within a network round trip.
+
+Deadlines travel on the sender's wall clock. Each instance pings the group
+every few seconds and estimates the offset of every peer's clock from the
+replies, NTP-style, keeping the sample with the shortest round trip as the
+most accurate; a received deadline is moved by the sender's offset before
+it is applied. Concurrent changes are ordered by a version made of a
+counter and the id of the instance that made the change, the highest one
+wins. The latest state is announced again periodically, so that instances
+joining late converge, and so that deadlines applied before the offsets
+were known are corrected.
+
+All of it works over loopback, with several instances on one machine.
+"""
+import asyncio
+import collections
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+
+# Multicast group and port shared by the instances
+GROUP = "239.255.42.42"
+PORT = 42424
+
+
+def multicast_socket(group, port, interface):
+    """
+    Return a UDP socket bound to the port of a multicast group and joined
+    to it on an interface, shared with the other local instances
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "SO_REUSEPORT"):
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(("", port))
+    membership = struct.pack("4s4s", socket.inet_aton(group), socket.inet_aton(interface))
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface))
+    # Stay on the local network, and let local instances hear each other
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    sock.setblocking(False)
+    return sock
+
+
+class LanSync(asyncio.DatagramProtocol):
+    """Shared timer state over UDP multicast, served by a background thread"""
+
+    # Seconds between two pings measuring the peers' clock offsets
+    PING_SECONDS = 2.0
+    # Seconds between two announcements of the latest state
+    ANNOUNCE_SECONDS = 5.0
+    # Offset samples kept per peer
+    SAMPLES = 8
+    # Seconds a re-announced deadline may move before it is applied again
+    TOLERANCE = 0.005
+
+    def __init__(self, timer, on_state, group=GROUP, port=PORT,
+                 interface="0.0.0.0", wall=time.time):
+        self.timer = timer
+        # Called from the network thread with each state received,
+        # its deadline moved to the local wall clock
+        self.on_state = on_state
+        self.group = group
+        self.port = port
+        self.interface = interface
+        self.wall = wall
+        # Random id of this instance, ordering concurrent changes
+        self.peer = os.urandom(4).hex()
+        # Round trip and offset samples of each peer's clock, by peer
+        self.samples = collections.defaultdict(
+            lambda: collections.deque(maxlen=self.SAMPLES))
+        # Seconds from sending a change to receiving it, per change received
+        self.latencies = collections.deque(maxlen=1024)
+        self.loop = None
+        self.transport = None
+        # Version and message of the latest state, on this instance's clock
+        self._version = (0, "")
+        self._state = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Join the group and start the network thread"""
+        sock = multicast_socket(self.group, self.port, self.interface)
+        self._thread = threading.Thread(target=self._run, args=(sock,), name="lan-sync",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        """Leave the group"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop = None
+
+    def offset(self, peer):
+        """Return how far a peer's wall clock is ahead of this one, 0 when unknown"""
+        samples = self.samples.get(peer)
+        if not samples:
+            return 0.0
+        return min(samples)[1]
+
+    def publish(self, event, running, remaining, duration, preset):
+        """
+        Send a local state change to the other instances, from any thread
+        """
+        now = self.wall()
+        with self._lock:
+            self._version = (self._version[0] + 1, self.peer)
+            self._state = {"type": "state", "timer": self.timer, "event": event,
+                           "running": running, "remaining": remaining,
+                           "deadline": now + remaining if running else None,
+                           "duration": duration, "preset": preset,
+                           "version": self._version}
+            message = self._state
+        self._send(message)
+
+    def _send(self, message):
+        if self.transport is not None:
+            message = {**message, "peer": self.peer, "sent": self.wall()}
+            self.transport.sendto(json.dumps(message).encode(), (self.group, self.port))
+
+    def _run(self, sock):
+        loop = self.loop = asyncio.new_event_loop()
+        loop.run_until_complete(loop.create_datagram_endpoint(lambda: self, sock=sock))
+        self._ready.set()
+        loop.call_soon(self._ping)
+        loop.call_later(self.ANNOUNCE_SECONDS, self._announce)
+        loop.run_forever()
+        self.transport.close()
+        loop.run_until_complete(asyncio.sleep(0))
+        loop.close()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def _ping(self):
+        self._send({"type": "ping", "t0": self.wall()})
+        self.loop.call_later(self.PING_SECONDS, self._ping)
+
+    def _announce(self):
+        with self._lock:
+            message = self._state
+        if message is not None:
+            if message["running"]:
+                message = {**message, "remaining": max(0.0, message["deadline"] - self.wall())}
+            self._send(message)
+        self.loop.call_later(self.ANNOUNCE_SECONDS, self._announce)
+
+    def datagram_received(self, data, address):
+        received = self.wall()
+        try:
+            message = json.loads(data)
+            kind, peer = message["type"], message["peer"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if peer == self.peer:
+            return
+        if kind == "ping":
+            self._send({"type": "pong", "to": peer, "t0": message["t0"],
+                        "t1": received, "t2": self.wall()})
+        elif kind == "pong" and message.get("to") == self.peer:
+            t0, t1, t2 = message["t0"], message["t1"], message["t2"]
+            round_trip = (received - t0) - (t2 - t1)
+            self.samples[peer].append((round_trip, ((t1 - t0) + (t2 - received)) / 2))
+        elif kind == "state" and message.get("timer") == self.timer:
+            self._receive_state(message, peer, received)
+
+    def _receive_state(self, message, peer, received):
+        """
+        Apply a state at least as recent as the latest one, flagged as
+        refined when it only corrects the deadline of the latest one
+        """
+        version = tuple(message["version"])
+        offset = self.offset(peer)
+        deadline = message["deadline"] - offset if message["running"] else None
+        with self._lock:
+            if version < self._version:
+                return
+            refined = version == self._version
+            if refined:
+                # Only the instance that made the change refines its deadline
+                if (version[1] != peer or deadline is None or self._state is None
+                        or abs(deadline - self._state["deadline"]) < self.TOLERANCE):
+                    return
+            else:
+                self.latencies.append(received - (message["sent"] - offset))
+            self._version = version
+            self._state = {key: message[key] for key in
+                           ("type", "timer", "event", "running", "remaining",
+                            "duration", "preset")}
+            self._state.update(deadline=deadline, version=version)
+            state = dict(self._state, refined=refined)
+        self.on_state(state)
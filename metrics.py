@@ -0,0 +1,134 @@
+"""
+Optional instrumentation of the countdown's hot paths.
+
+Metrics are off unless the application is started with ``--metrics``.
+Instrumenting replaces the hot-path methods of the widget class with timed
+wrappers, so when metrics are disabled the class is left untouched and the
+hot paths run exactly the code they always did. Each instrumented method
+gets a call counter and a latency histogram, and the lateness of every
+display tick against the moment it was armed for is tracked as well.
+
+The metrics are dumped to a text file once a minute, in the Prometheus
+text format, and returned by the ``metrics`` command of the control socket.
+"""
+import bisect
+import functools
+import os
+import time
+
+
+# Methods of the widget timed when metrics are enabled
+HOT_PATHS = ("update_timer", "update_tray_icon", "show_notification", "showEvent")
+
+# Upper bounds of the histogram buckets in seconds, 10us to about 10s
+BUCKETS = tuple(1e-5 * 2 ** exponent for exponent in range(21))
+
+
+class Histogram:
+    """Counts of observed seconds in fixed exponential buckets"""
+
+    def __init__(self, bounds=BUCKETS):
+        self.bounds = bounds
+        # One count per bucket, and a last one for values above every bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction):
+        """Return the upper bound of the bucket holding the given quantile"""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    """Latency histograms, counting and timing calls, with a text dump"""
+
+    def __init__(self, path=None, clock=time.perf_counter):
+        # File the metrics are dumped to, None to only keep them in memory
+        self.path = path
+        self.clock = clock
+        self.histograms = {}
+
+    def observe(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+    def timed(self, name, func):
+        """Return func wrapped to count its calls and time them under name"""
+        clock = self.clock
+        observe = self.observe
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            begin = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, clock() - begin)
+
+        return wrapper
+
+    def instrument(self, cls, names=HOT_PATHS):
+        """
+        Time the named methods of a widget class and track how late its
+        display ticks fire, must be called before the widget is created
+        so that its signal connections pick up the wrappers
+        """
+        self._track_ticks(cls)
+        for name in names:
+            setattr(cls, name, self.timed(name, getattr(cls, name)))
+
+    def _track_ticks(self, cls):
+        schedule_tick, update_timer = cls.schedule_tick, cls.update_timer
+        observe = self.observe
+
+        @functools.wraps(schedule_tick)
+        def armed(widget):
+            schedule_tick(widget)
+            widget.tick_due = widget.clock.monotonic() + widget.timer.interval() / 1000
+
+        @functools.wraps(update_timer)
+        def ticked(widget):
+            due = getattr(widget, "tick_due", None)
+            if due is not None:
+                widget.tick_due = None
+                observe("tick_lateness", widget.clock.monotonic() - due)
+            update_timer(widget)
+
+        cls.schedule_tick, cls.update_timer = armed, ticked
+
+    def text(self):
+        """Return the metrics in the Prometheus text format"""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            metric = f"countdown_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum {histogram.sum:.9f}")
+            lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Atomically replace the dump file with the current metrics"""
+        if self.path is None:
+            return
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="ascii") as file:
+            file.write(self.text())
+        os.replace(temporary, self.path)
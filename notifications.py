@@ -0,0 +1,146 @@
+"""
+Asynchronous, coalescing delivery of desktop notifications.
+
+The timer path only hands a notification to the dispatcher, which queues it
+and returns at once. Queued notifications are delivered from the event loop
+by a single-shot timer, at most one per interval. A queued notification is
+merged with a newer identical one, the oldest ones are dropped when the
+queue is full, and a notification identical to one delivered a
+moment ago is skipped. So a burst of clicks or scripted commands produces a
+couple of notifications rather than a pile of them.
+
+Notifications are shown by a pluggable backend: the tray balloon, the
+freedesktop notification service over D-Bus, or the log only.
+"""
+import collections
+import logging
+
+
+# Names of the backends understood by make_backend
+BACKENDS = ("tray", "dbus", "log")
+
+logger = logging.getLogger("countdown.notifications")
+
+
+class TrayBackend:
+    """Show notifications as tray icon balloons"""
+
+    def __init__(self, tray_icon):
+        self.tray_icon = tray_icon
+
+    def show(self, title, message):
+        from PyQt5.QtWidgets import QSystemTrayIcon
+        self.tray_icon.showMessage(title, message, QSystemTrayIcon.Information)
+
+
+class DBusBackend:
+    """
+    Send notifications to the freedesktop notification service without
+    waiting for its reply
+    """
+
+    def __init__(self, app_name="countdown"):
+        from PyQt5.QtDBus import QDBusConnection, QDBusInterface
+        self.app_name = app_name
+        self.interface = QDBusInterface("org.freedesktop.Notifications",
+                                        "/org/freedesktop/Notifications",
+                                        "org.freedesktop.Notifications",
+                                        QDBusConnection.sessionBus())
+        if not self.interface.isValid():
+            raise OSError("no notification service on the session bus")
+
+    def show(self, title, message):
+        from PyQt5.QtCore import QMetaType, QVariant
+        from PyQt5.QtDBus import QDBusArgument
+        replaces_id = QVariant(0)
+        replaces_id.convert(QVariant.UInt)
+        actions = QDBusArgument([], QMetaType.QStringList)
+        # Notify(app_name, replaces_id, app_icon, summary, body, actions,
+        # hints, expire_timeout)
+        self.interface.asyncCall("Notify", self.app_name, replaces_id, "",
+                                 title, message, actions, {}, -1)
+
+
+class LogBackend:
+    """Only log notifications, for headless runs and scripting"""
+
+    def show(self, title, message):
+        logger.info("%s: %s", title, message)
+
+
+def make_backend(name, tray_icon):
+    """Return the named backend, falling back to the tray when D-Bus is unavailable"""
+    if name == "dbus":
+        try:
+            return DBusBackend()
+        except (ImportError, OSError) as error:
+            logger.warning("D-Bus notifications unavailable, using the tray: %s", error)
+            return TrayBackend(tray_icon)
+    if name == "log":
+        return LogBackend()
+    if name == "tray":
+        return TrayBackend(tray_icon)
+    raise ValueError(f"unknown notification backend: {name}")
+
+
+class NotificationDispatcher:
+    """Bounded, coalescing and rate-limited notification queue"""
+
+    def __init__(self, backend, clock, capacity=8, min_interval=1.0, dedup_window=5.0):
+        self.backend = backend
+        self.clock = clock
+        # Largest number of notifications waiting to be delivered
+        self.capacity = capacity
+        # Smallest number of seconds between two delivered notifications
+        self.min_interval = min_interval
+        # Seconds during which a delivered notification is not repeated
+        self.dedup_window = dedup_window
+        # (title, message) pairs waiting to be delivered, oldest first
+        self.queue = collections.OrderedDict()
+        # Monotonic time each recent (title, message) was delivered
+        self.delivered = {}
+        self._last = None
+        # Counters of delivered, merged, dropped and skipped notifications
+        self.shown = self.coalesced = self.dropped = self.duplicates = 0
+        self.timer = clock.create_timer()
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._deliver)
+
+    def notify(self, title, message):
+        """Queue a notification, never waiting on the backend"""
+        key = (title, message)
+        if key in self.queue:
+            del self.queue[key]
+            self.coalesced += 1
+        self.queue[key] = None
+        while len(self.queue) > self.capacity:
+            self.queue.popitem(last=False)
+            self.dropped += 1
+        if not self.timer.isActive():
+            self._schedule()
+
+    def _schedule(self):
+        delay = 0.0
+        if self._last is not None:
+            delay = max(0.0, self._last + self.min_interval - self.clock.monotonic())
+        self.timer.start(int(delay * 1000))
+
+    def _deliver(self):
+        if not self.queue:
+            return
+        (title, message), _ = self.queue.popitem(last=False)
+        now = self.clock.monotonic()
+        self.delivered = {key: shown for key, shown in self.delivered.items()
+                          if now - shown < self.dedup_window}
+        if (title, message) in self.delivered:
+            self.duplicates += 1
+        else:
+            try:
+                self.backend.show(title, message)
+            except Exception:
+                logger.exception("notification backend failed")
+            self.shown += 1
+            self._last = now
+            self.delivered[title, message] = now
+        if self.queue:
+            self._schedule()
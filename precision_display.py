@@ -0,0 +1,176 @@
+"""
+Sub-second countdown display, for short intervals and speech timing.
+
+With --precision=1 or 2 the window shows tenths or hundredths of a second.
+The value shown is worked out from the countdown's monotonic deadline on
+every frame, never counted down, so a late frame only shows its own value
+late. Frames are paced by a precise single-shot timer on a grid of the
+display's refresh period: each one is armed for the first refresh at or
+after the moment the value shown next changes, so that updates at 10, 30
+or 60 Hz land on whole refreshes instead of beating against them.
+
+The digits are painted by a widget of fixed-width cells from glyphs
+rendered once per font: a new value only repaints the cells whose
+character changed, usually the last digit or two, and never changes the
+widget's size, so the window is not laid out again.
+"""
+import collections
+import math
+
+from PyQt5.QtCore import QRect, QSize, Qt
+from PyQt5.QtGui import QFontMetrics, QPainter, QPixmap
+from PyQt5.QtWidgets import QWidget
+
+
+def next_frame(now, remaining, rate, anchor, period):
+    """
+    Return the time of the first refresh, on the grid of period seconds
+    from anchor, at or after the moment a value shown at rate changes per
+    second next changes, when remaining seconds are left at now
+
+    A frame running less than half a period late still belongs to the
+    refresh it was armed for, so the next change is looked for from
+    that refresh: looking from now instead would skip every other frame
+    whenever the changes fall just after the refreshes.
+    """
+    current = anchor + math.floor((now - anchor) / period + 0.5) * period
+    remaining += now - current
+    step = 1 / rate
+    change = current + remaining - (math.ceil(round(remaining / step, 6)) - 1) * step
+    return anchor + math.ceil(round((change - anchor) / period, 6)) * period
+
+
+class DigitDisplay(QWidget):
+    """Text of fixed-width cells painted from cached glyphs, repainting changed cells only"""
+
+    # Characters whose widest advance sets the width of every cell
+    CHARACTERS = "0123456789:."
+
+    def __init__(self, text=""):
+        super().__init__()
+        self.text = text
+        # Every pixel of a repainted cell is painted, so nothing
+        # behind the widget needs repainting
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        # Glyph pixmaps by character, for the current font and palette
+        self.glyphs = {}
+        self._cell = None
+        # Cells repainted since the counters were read, and updates
+        self.cells_updated = 0
+        self.updates = 0
+
+    def cell_size(self):
+        """Return the size of one character cell"""
+        if self._cell is None:
+            metrics = QFontMetrics(self.font())
+            width = max(metrics.horizontalAdvance(character) for character in self.CHARACTERS)
+            self._cell = QSize(width, metrics.height())
+        return self._cell
+
+    def sizeHint(self):
+        cell = self.cell_size()
+        return QSize(cell.width() * len(self.text), cell.height())
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def cell_rect(self, index):
+        """Return the rectangle of a character cell, the text centered in the widget"""
+        cell = self.cell_size()
+        left = (self.width() - cell.width() * len(self.text)) // 2
+        top = (self.height() - cell.height()) // 2
+        return QRect(left + index * cell.width(), top, cell.width(), cell.height())
+
+    def setText(self, text):
+        """Show text, scheduling a repaint of the cells that changed only"""
+        if len(text) != len(self.text):
+            self.text = text
+            self.updateGeometry()
+            self.update()
+            return
+        self.updates += 1
+        for index, (old, new) in enumerate(zip(self.text, text)):
+            if old != new:
+                self.update(self.cell_rect(index))
+                self.cells_updated += 1
+        self.text = text
+
+    def glyph(self, character):
+        """Return the pixmap of a character, rendering it on first use"""
+        pixmap = self.glyphs.get(character)
+        if pixmap is None:
+            ratio = self.devicePixelRatioF()
+            cell = self.cell_size()
+            pixmap = QPixmap(cell * ratio)
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(self.palette().color(self.backgroundRole()))
+            painter = QPainter(pixmap)
+            painter.setFont(self.font())
+            painter.setPen(self.palette().color(self.foregroundRole()))
+            painter.drawText(QRect(0, 0, cell.width(), cell.height()), Qt.AlignCenter, character)
+            painter.end()
+            self.glyphs[character] = pixmap
+        return pixmap
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        area = event.rect()
+        painter.fillRect(area, self.palette().color(self.backgroundRole()))
+        for index, character in enumerate(self.text):
+            rect = self.cell_rect(index)
+            if rect.intersects(area):
+                painter.drawPixmap(rect.topLeft(), self.glyph(character))
+        painter.end()
+
+    def changeEvent(self, event):
+        # Glyphs are rendered again in the new font or colors
+        if event.type() in (event.FontChange, event.PaletteChange):
+            self.glyphs.clear()
+            self._cell = None
+            self.updateGeometry()
+            self.update()
+        super().changeEvent(event)
+
+
+class FramePacer:
+    """Precise single-shot timer arming each frame on the display refresh grid"""
+
+    def __init__(self, clock, callback, refresh_rate=60.0):
+        self.clock = clock
+        self.callback = callback
+        # Seconds between two refreshes of the display
+        self.period = 1 / (refresh_rate or 60.0)
+        # Origin of the refresh grid
+        self.anchor = clock.monotonic()
+        self.timer = clock.create_timer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self._frame)
+        # Time the armed frame is due at, None when asked for at once
+        self.due = None
+        # Seconds each frame fired after the refresh it was armed for
+        self.lateness = collections.deque(maxlen=4096)
+
+    def request(self):
+        """Draw a frame as soon as possible, unless one is already armed"""
+        if not self.timer.isActive():
+            self.due = None
+            self.timer.start(0)
+
+    def arm(self, remaining, rate):
+        """
+        Arm the frame showing the next change of a value shown at rate
+        changes per second, remaining seconds being left now
+        """
+        now = self.clock.monotonic()
+        self.due = next_frame(now, remaining, rate, self.anchor, self.period)
+        # Never early: a frame drawn before the change shows the old value
+        self.timer.start(math.ceil((self.due - now) * 1000))
+
+    def stop(self):
+        self.timer.stop()
+
+    def _frame(self):
+        if self.due is not None:
+            self.lateness.append(self.clock.monotonic() - self.due)
+        self.callback()
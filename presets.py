@@ -0,0 +1,206 @@
+"""
+Library of named countdown presets, read from a text file.
+
+Each line of the file is ``<duration> <name> [#tag ...]``, such as
+``25m pomodoro #work`` or ``4:00 green tea #kitchen #tea``, the duration in
+seconds, mm:ss, hh:mm:ss or 50m; lines starting with # are comments.
+
+The file is parsed and indexed once, and the result is cached next to it
+in a compact marshalled form, keyed by the file's modification time and
+size, so later launches load hundreds of presets without parsing or
+indexing them again. Lookups go through the in-memory index: the
+lower-cased words of every name and tag, sorted, answer prefix searches
+with a binary search; fuzzy searches, which match the query's characters
+in order, only scan the names whose character set contains every
+character of the query, checked first as a bitmask.
+"""
+import bisect
+import collections
+import marshal
+import os
+
+from countdown_core import BREAK_TIME, RESET_VALUE
+from timeline import parse_segment
+
+
+# One preset of the library
+Preset = collections.namedtuple("Preset", "name seconds tags")
+
+# Presets of a library without a file
+DEFAULT_PRESETS = (Preset("countdown", RESET_VALUE, ("default",)),
+                   Preset("break", BREAK_TIME, ("default",)))
+
+# Version of the cache layout, bumped when it changes
+CACHE_FORMAT = 1
+
+
+def parse_preset(line):
+    """Parse ``<duration> <name> [#tag ...]``"""
+    words = line.split()
+    tags = tuple(word[1:].lower() for word in words[1:] if word.startswith("#") and word[1:])
+    name = " ".join(word for word in words[1:] if not word.startswith("#"))
+    if not words or not name:
+        raise ValueError(f"invalid preset: {line.strip()!r}")
+    return Preset(name, parse_segment(words[0]).seconds, tags)
+
+
+def parse_presets(lines):
+    """Parse the presets of a file's lines, skipping blanks and comments"""
+    presets = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            try:
+                presets.append(parse_preset(line))
+            except ValueError as error:
+                raise ValueError(f"line {number}: {error}") from None
+    return presets
+
+
+def character_mask(text):
+    """Return a bitmask of the characters of text, folded onto 63 bits"""
+    mask = 0
+    for character in text:
+        mask |= 1 << (ord(character) % 63)
+    return mask
+
+
+def is_subsequence(query, text):
+    """Whether the characters of query appear in text in order"""
+    characters = iter(text)
+    return all(character in characters for character in query)
+
+
+class PresetLibrary:
+    """Presets of a file, reloaded when it changes, with their search index"""
+
+    def __init__(self, path=None, cache_path=None):
+        self.path = path
+        # File caching the parsed presets, None to always parse
+        self.cache_path = cache_path
+        self.presets = list(DEFAULT_PRESETS)
+        # Presets by tag, in file order
+        self.tags = {}
+        # Sorted (word, index) pairs of the words of names and tags
+        self._words = []
+        # Lower-cased names and their character masks, by index
+        self._names = []
+        self._masks = []
+        # (modification time, size) of the file the presets come from
+        self._stamp = None
+        self._index()
+
+    def __len__(self):
+        return len(self.presets)
+
+    def refresh(self):
+        """
+        Load the presets again if the file changed since they were
+        loaded, and return whether it did
+        """
+        if self.path is None:
+            return False
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        if stamp is None:
+            self.presets = list(DEFAULT_PRESETS)
+            self._index()
+        elif not self._load_cache(stamp):
+            with open(self.path, encoding="utf-8") as file:
+                self.presets = parse_presets(file)
+            self._index()
+            self._save_cache(stamp)
+        return True
+
+    def find(self, name):
+        """Return the preset with a name, ignoring case, or None"""
+        name = name.lower()
+        return next((preset for preset, lowered in zip(self.presets, self._names)
+                     if lowered == name), None)
+
+    def search(self, query, limit=10):
+        """
+        Return up to limit presets matching query: those with a name or
+        tag word starting with it first, then fuzzy matches of the name
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.presets[:limit]
+        found = []
+        seen = set()
+        position = bisect.bisect_left(self._words, (query,))
+        while position < len(self._words) and len(found) < limit:
+            word, index = self._words[position]
+            if not word.startswith(query):
+                break
+            if index not in seen:
+                seen.add(index)
+                found.append(index)
+            position += 1
+        if len(found) < limit:
+            mask = character_mask(query)
+            for index, name in enumerate(self._names):
+                if (index not in seen and self._masks[index] & mask == mask
+                        and is_subsequence(query, name)):
+                    found.append(index)
+                    if len(found) == limit:
+                        break
+        return [self.presets[index] for index in found]
+
+    def _index(self):
+        self._names = [preset.name.lower() for preset in self.presets]
+        self._masks = [character_mask(name) for name in self._names]
+        words = set()
+        for index, preset in enumerate(self.presets):
+            words.update((word, index) for word in self._names[index].split())
+            words.update((tag, index) for tag in preset.tags)
+        self._words = sorted(words)
+        self._index_tags()
+
+    def _index_tags(self):
+        self.tags = {}
+        for preset in self.presets:
+            for tag in preset.tags:
+                self.tags.setdefault(tag, []).append(preset)
+
+    def _load_cache(self, stamp):
+        """
+        Load the cached presets and index if they come from this version
+        of the file, and return whether they did
+        """
+        if self.cache_path is None:
+            return False
+        try:
+            with open(self.cache_path, "rb") as file:
+                cached_format, cached_stamp, columns, words, masks = marshal.loads(file.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if cached_format != CACHE_FORMAT or tuple(cached_stamp) != stamp:
+            return False
+        self.presets = [Preset(*fields) for fields in zip(*columns)]
+        self._names = [preset.name.lower() for preset in self.presets]
+        self._masks = list(masks)
+        self._words = list(zip(*words))
+        self._index_tags()
+        return True
+
+    def _save_cache(self, stamp):
+        """
+        Atomically replace the cache with the presets and their index,
+        as parallel tuples
+        """
+        if self.cache_path is None:
+            return
+        columns = tuple(zip(*self.presets)) or ((), (), ())
+        words = tuple(zip(*self._words)) or ((), ())
+        temporary = self.cache_path + ".tmp"
+        with open(temporary, "wb") as file:
+            marshal.dump((CACHE_FORMAT, stamp, columns, words, tuple(self._masks)), file)
+        os.replace(temporary, self.cache_path)
@@ -0,0 +1,103 @@
+"""
+Dirty-checked rendering of the countdown's display surfaces.
+
+Each surface (window label, tray tooltip, tray menu entry, tray icon) keeps
+the value it last pushed. A new value is only pushed through the native
+setter when it differs from that and the surface is visible; a hidden
+surface keeps the value pending and receives it once when it is flushed.
+"""
+import time
+
+
+class Surface:
+    """One displayed value and the setter that pushes it"""
+
+    def __init__(self, setter, visible=None):
+        # Function pushing a value to the native widget
+        self.setter = setter
+        # Function telling whether the surface is visible, None if always
+        self.visible = visible
+        # Value last pushed through the setter
+        self.shown = None
+        # Value waiting to be pushed while the surface is hidden
+        self.pending = None
+        self.dirty = False
+
+
+class RenderStats:
+    """Counters of pushed and avoided native calls"""
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.started = clock()
+        # Values pushed through a native setter
+        self.pushed = 0
+        # Values equal to what the surface already shows
+        self.unchanged = 0
+        # Values held back because the surface was hidden
+        self.hidden = 0
+
+    @property
+    def saved(self):
+        """Native calls avoided so far"""
+        return self.unchanged + self.hidden
+
+    def per_minute(self, count):
+        """Scale a counter to a rate per minute since the stats started"""
+        elapsed = self.clock() - self.started
+        return count * 60 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        """Return a one-line description of the counters"""
+        return (f"pushed {self.per_minute(self.pushed):.1f}/min, "
+                f"saved {self.per_minute(self.saved):.1f}/min "
+                f"({self.unchanged} unchanged, {self.hidden} hidden)")
+
+
+class Renderer:
+    """Named surfaces receiving only the values that changed"""
+
+    def __init__(self, clock=time.monotonic):
+        self.surfaces = {}
+        self.stats = RenderStats(clock)
+
+    def add(self, name, setter, visible=None):
+        """Register a surface under name"""
+        self.surfaces[name] = Surface(setter, visible)
+
+    def set(self, name, value):
+        """
+        Show value on one surface if it changed and is visible,
+        surfaces that are not created yet are skipped
+        """
+        surface = self.surfaces.get(name)
+        if surface is None:
+            return
+        if value is surface.shown or value == surface.shown:
+            surface.dirty = False
+            self.stats.unchanged += 1
+            return
+        if surface.visible is not None and not surface.visible():
+            surface.pending = value
+            surface.dirty = True
+            self.stats.hidden += 1
+            return
+        self._push(surface, value)
+
+    def render(self, values):
+        """Show a value on each named surface"""
+        for name, value in values.items():
+            self.set(name, value)
+
+    def flush(self, name):
+        """Push the pending value of a surface that has just become visible"""
+        surface = self.surfaces[name]
+        if surface.dirty:
+            self._push(surface, surface.pending)
+
+    def _push(self, surface, value):
+        surface.setter(value)
+        surface.shown = value
+        surface.pending = None
+        surface.dirty = False
+        self.stats.pushed += 1
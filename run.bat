@@ -3,6 +3,10 @@
 cd G:\path\to\your\timer
 echo %CD%
 
+@REM Compile the translation catalogs, so the first launch does not have to
+@REM Note: Change to the path of pythonw.exe
+C:\path\to\your\pythonw.exe i18n.py
+
 @REM Note here: pythonw.exe is not python.exe, pythonw will not open a command line window to run Python scripts
 @REM Note: Change to the path of pythonw.exe
 start /min "" C:\path\to\your\pythonw.exe count_down_en.py
@@ -0,0 +1,183 @@
+"""
+Qt-independent scheduler for many named countdowns and alarms.
+
+Running entries are kept in a min-heap ordered by deadline, so however many
+timers are live, the host only has to arm a single OS wakeup for the next
+expiry. Inserting an entry costs O(log n); cancelling marks its heap entry
+stale in O(1) and stale entries are dropped lazily when they reach the top,
+or all at once when they outnumber the live ones.
+
+The scheduler may be driven from a worker thread while the GUI thread
+starts and pauses entries, so its state is guarded by a lock. Expiry
+callbacks run outside the lock.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from countdown_core import Countdown
+
+
+class Scheduler:
+    """Named countdowns and one-shot alarms sharing one wakeup"""
+
+    def __init__(self, clock=time.monotonic):
+        # Function returning the current monotonic time in seconds
+        self.clock = clock
+        # Countdown of every entry, by name
+        self.countdowns = {}
+        # Called with the entry name when an entry expires
+        self._callbacks = {}
+        # Names of the entries that are removed once they fire
+        self._alarms = set()
+        # Heap of (deadline, sequence, name) for the running entries
+        self._heap = []
+        # Sequence number of the live heap entry, by name
+        self._armed = {}
+        # Increasing sequence, so equal deadlines fire in insertion order
+        self._sequence = itertools.count()
+        # Called with the new next deadline (or None) when it changes,
+        # so the host can re-arm its single wakeup
+        self.on_rearm = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.countdowns)
+
+    def __contains__(self, name):
+        return name in self.countdowns
+
+    def add_countdown(self, name, seconds, callback=None):
+        """Add a paused countdown and return it"""
+        with self._lock:
+            if name in self.countdowns:
+                raise KeyError(f"timer already exists: {name}")
+            countdown = Countdown(seconds, clock=self.clock)
+            self.countdowns[name] = countdown
+            self._callbacks[name] = callback
+            return countdown
+
+    def add_alarm(self, name, delay, callback):
+        """Add an alarm that fires once after delay seconds and is then removed"""
+        with self._lock:
+            countdown = self.add_countdown(name, delay, callback)
+            self._alarms.add(name)
+            self.start(name)
+            return countdown
+
+    def remove(self, name):
+        """Cancel and forget an entry"""
+        with self._lock:
+            self.cancel(name)
+            del self.countdowns[name]
+            del self._callbacks[name]
+            self._alarms.discard(name)
+
+    def start(self, name):
+        """Start an entry and arm it for its deadline"""
+        with self._lock:
+            countdown = self.countdowns[name]
+            countdown.start()
+            self._arm(name, countdown.deadline)
+
+    def pause(self, name):
+        """Pause an entry, so it does not expire until started again"""
+        with self._lock:
+            self.countdowns[name].pause()
+            self.cancel(name)
+
+    def reset(self, name, seconds):
+        """Set the remaining time of an entry, keeping its running state"""
+        with self._lock:
+            countdown = self.countdowns[name]
+            countdown.reset(seconds)
+            if countdown.running:
+                self._arm(name, countdown.deadline)
+
+    def cancel(self, name):
+        """Disarm an entry without touching its remaining time"""
+        with self._lock:
+            if name not in self._armed:
+                return
+            before = self.next_deadline()
+            del self._armed[name]
+            if len(self._heap) > 2 * len(self._armed) + 64:
+                # Rebuild the heap once stale entries dominate it
+                self._heap = [entry for entry in self._heap
+                              if self._armed.get(entry[2]) == entry[1]]
+                heapq.heapify(self._heap)
+            self._rearm_if_changed(before)
+
+    def shift(self, seconds):
+        """
+        Move every running deadline earlier by seconds the clock missed,
+        such as a suspend it did not count, keeping their order
+        """
+        with self._lock:
+            for countdown in self.countdowns.values():
+                countdown.shift(seconds)
+            self._heap = [(deadline - seconds, sequence, name)
+                          for deadline, sequence, name in self._heap]
+
+    def rearm(self):
+        """
+        Arm the wakeup again for the next deadline, after the timer backing
+        it stood still, as timers do while the machine is suspended
+        """
+        if self.on_rearm is not None:
+            self.on_rearm(self.next_deadline())
+
+    def next_deadline(self):
+        """Return the deadline of the next expiry, or None when nothing is armed"""
+        with self._lock:
+            heap = self._heap
+            while heap and self._armed.get(heap[0][2]) != heap[0][1]:
+                heapq.heappop(heap)
+            return heap[0][0] if heap else None
+
+    def run_due(self, now=None):
+        """
+        Fire every entry whose deadline has passed, in deadline order,
+        and return their names
+        """
+        if now is None:
+            now = self.clock()
+        with self._lock:
+            fired = []
+            heap = self._heap
+            while heap and heap[0][0] <= now:
+                deadline, sequence, name = heapq.heappop(heap)
+                if self._armed.get(name) != sequence:
+                    continue
+                del self._armed[name]
+                countdown = self.countdowns[name]
+                countdown.pause()
+                countdown.reset(0)
+                fired.append((name, self._callbacks[name]))
+                if name in self._alarms:
+                    self.remove(name)
+            # Re-arm after every wakeup, even for the same deadline: a
+            # wakeup firing a little early found nothing due
+            if self.on_rearm is not None:
+                self.on_rearm(self.next_deadline())
+        for name, callback in fired:
+            if callback is not None:
+                callback(name)
+        return [name for name, callback in fired]
+
+    def _arm(self, name, deadline):
+        """Push a heap entry for name, superseding any earlier one"""
+        before = self.next_deadline()
+        sequence = next(self._sequence)
+        self._armed[name] = sequence
+        heapq.heappush(self._heap, (deadline, sequence, name))
+        self._rearm_if_changed(before)
+
+    def _rearm_if_changed(self, before):
+        """Tell the host about a new next deadline"""
+        if self.on_rearm is None:
+            return
+        after = self.next_deadline()
+        if after != before:
+            self.on_rearm(after)
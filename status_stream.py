@@ -0,0 +1,178 @@
+"""
+Live status of the countdown over HTTP, for wall displays and scripts.
+
+An asyncio HTTP server, started with --status-port=PORT, runs in a
+background thread and answers two requests:
+
+GET /status   the current status as JSON
+GET /events   a server-sent event stream, starting with a "status" event
+              and followed by a "state" event on every transition and a
+              "tick" event on every displayed second
+
+Every event is formatted and encoded once, by the thread publishing it,
+and the same bytes are appended to the buffer of each subscriber. Buffers
+are bounded: a client that falls a whole buffer behind loses its oldest
+events, which later statuses supersede anyway, so a slow or stalled client
+never holds up the timer or the other clients.
+"""
+import asyncio
+import collections
+import json
+import threading
+
+
+# Response headers of the event stream
+EVENTS_HEADER = (b"HTTP/1.1 200 OK\r\n"
+                 b"Content-Type: text/event-stream\r\n"
+                 b"Cache-Control: no-cache\r\n"
+                 b"Access-Control-Allow-Origin: *\r\n"
+                 b"\r\n")
+
+
+def format_event(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {data}\n\n".encode()
+
+
+def response(status, body, content_type="application/json"):
+    """Encode a complete response closing the connection"""
+    return (f"HTTP/1.1 {status}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Access-Control-Allow-Origin: *\r\n"
+            "Connection: close\r\n"
+            "\r\n").encode() + body
+
+
+class Subscriber:
+    """Events waiting to be written to one client"""
+
+    def __init__(self, size):
+        # Encoded events, the oldest dropped once size are waiting
+        self.buffer = collections.deque(maxlen=size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, payload):
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(payload)
+        self.ready.set()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+
+class StatusStream:
+    """HTTP status and event stream server running in a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, buffer=32, keepalive=15.0):
+        self.host = host
+        # Port listened on, the one picked by the system once started
+        # when 0
+        self.port = port
+        # Events kept per subscriber
+        self.buffer = buffer
+        # Seconds of silence after which a comment is sent, so that
+        # proxies keep the stream open and closed clients are noticed
+        self.keepalive = keepalive
+        self.loop = None
+        self.subscribers = set()
+        # Last published status, as JSON
+        self._status = "{}"
+        # Writers of the open connections
+        self._writers = set()
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start listening"""
+        self._thread = threading.Thread(target=self._run, name="status-stream",
+                                        daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        """Stop listening and close the streams"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join()
+            self.loop = None
+
+    def publish(self, event, status):
+        """
+        Send status to every subscriber as an event, from any thread;
+        this costs one encoding whatever the number of subscribers
+        """
+        data = json.dumps(status)
+        self._status = data
+        if self.subscribers and self.loop is not None:
+            self.loop.call_soon_threadsafe(self._fan_out, format_event(event, data))
+
+    def _fan_out(self, payload):
+        for subscriber in self.subscribers:
+            subscriber.push(payload)
+
+    def _run(self):
+        loop = self.loop = asyncio.new_event_loop()
+        server = loop.run_until_complete(
+            asyncio.start_server(self._serve, self.host, self.port))
+        self.port = server.sockets[0].getsockname()[1]
+        self._ready.set()
+        loop.run_forever()
+        # Stopped: close the listener and the open streams
+        server.close()
+        for subscriber in self.subscribers:
+            subscriber.close()
+        for writer in self._writers:
+            writer.transport.abort()
+        # The loop is not running any more, so gather it explicitly and
+        # only when streams are left to finish
+        tasks = asyncio.all_tasks(loop)
+        if tasks:
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    async def _serve(self, reader, writer):
+        """Answer one request, streaming events for /events"""
+        self._writers.add(writer)
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            words = head.split(b"\r\n", 1)[0].decode("latin-1").split()
+            method, path = (words + ["", ""])[:2]
+            path = path.split("?", 1)[0]
+            if method != "GET":
+                writer.write(response("405 Method Not Allowed", b'{"error": "GET only"}'))
+            elif path == "/status":
+                writer.write(response("200 OK", self._status.encode()))
+            elif path == "/events":
+                await self._stream(writer)
+            else:
+                writer.write(response("404 Not Found", b'{"error": "not found"}'))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _stream(self, writer):
+        subscriber = Subscriber(self.buffer)
+        writer.write(EVENTS_HEADER + format_event("status", self._status))
+        self.subscribers.add(subscriber)
+        try:
+            while not subscriber.closed:
+                try:
+                    await asyncio.wait_for(subscriber.ready.wait(), self.keepalive)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    subscriber.ready.clear()
+                    writer.write(b"".join(subscriber.buffer))
+                    subscriber.buffer.clear()
+                # Only this client's task waits for a slow reader
+                await writer.drain()
+        finally:
+            self.subscribers.discard(subscriber)
@@ -0,0 +1,81 @@
+"""
+Detection of machine suspends, so the countdown catches up on wake.
+
+Qt timers only count awake time, so after a suspend the next tick and the
+expiry wakeup arrive late by the length of the sleep. The detector reads a
+clock value that grows by the time spent suspended, boot time minus
+monotonic time on Linux, checked on every tick and right away when logind
+announces the resume over D-Bus where that is available. Without boot
+time, the wall clock is only trusted to measure a suspend the OS announced
+both ends of: on its own, a gap between the wall and monotonic clocks may
+just as well be the wall clock being set. Catching up is O(1) whatever the length of
+the sleep: deadlines are absolute, so the state only has to be read again,
+and every expiry missed in the meantime fires at once in a single pass.
+"""
+
+
+class SuspendDetector:
+    """Tell how long the machine was suspended since the last check"""
+
+    def __init__(self, clock, threshold=1.0):
+        self.clock = clock
+        # Smallest gap in seconds reported as a suspend, below which it is
+        # taken for clock noise or a slewing wall clock
+        self.threshold = threshold
+        # Seconds of the suspends announced by the OS and measured on the
+        # wall clock, added to the clock's reading
+        self._announced = 0.0
+        # Wall minus monotonic time when the suspend in progress was
+        # announced, None when none was
+        self._asleep = None
+        self._suspended = clock.suspended()
+
+    def announce(self, sleeping):
+        """
+        Note a suspend (True) or resume (False) announced by the OS, which
+        measures it on the wall clock where the clock cannot count it
+        """
+        if self.clock.counts_suspend:
+            return
+        gap = self.clock.wall() - self.clock.monotonic()
+        if sleeping:
+            self._asleep = gap
+        elif self._asleep is not None:
+            self._announced += max(0.0, gap - self._asleep)
+            self._asleep = None
+
+    def check(self):
+        """Return the seconds spent suspended since the last check, or 0"""
+        suspended = self.clock.suspended() + self._announced
+        slept = suspended - self._suspended
+        if abs(slept) < self.threshold:
+            return 0.0
+        self._suspended = suspended
+        return max(0.0, slept)
+
+
+def watch_sleep(callback):
+    """
+    Call callback(sleeping) when logind announces a suspend (True) or a
+    resume (False), and return the watcher to keep alive, or None when
+    logind is not available
+    """
+    try:
+        from PyQt5.QtCore import QObject, pyqtSlot
+        from PyQt5.QtDBus import QDBusConnection
+    except ImportError:
+        return None
+
+    class Watcher(QObject):
+        @pyqtSlot(bool)
+        def prepare_for_sleep(self, sleeping):
+            callback(sleeping)
+
+    bus = QDBusConnection.systemBus()
+    watcher = Watcher()
+    if not bus.isConnected() or not bus.connect(
+            "org.freedesktop.login1", "/org/freedesktop/login1",
+            "org.freedesktop.login1.Manager", "PrepareForSleep",
+            watcher.prepare_for_sleep):
+        return None
+    return watcher
@@ -0,0 +1,182 @@
+"""
+Headless countdown for terminals, SSH sessions and machines without a
+desktop.
+
+It runs on the same Qt-free core as the tray application, with the same
+time format and presets, and never imports Qt. The countdown is one line,
+redrawn in place and only when its text changes. Between two changes the
+process sleeps until the next second boundary, or until a key is pressed,
+so a running countdown wakes up once per displayed second and costs next
+to no CPU.
+
+Run ``python terminal.py [reset|break|<seconds|mm:ss|hh:mm:ss>]``, or
+``python terminal.py --sequence "4x(50m work, 10m break)"``. On a terminal,
+space or p pauses and resumes, r restarts the reset preset, b starts a
+break and q quits. When the output is not a terminal, every change is
+written on a line of its own.
+"""
+import argparse
+import os
+import select
+import sys
+import time
+
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = tty = None
+
+from countdown_core import (BREAK_TIME, INIT_TIME_LEFT_AMOUNT, RESET_VALUE, SEQUENCE,
+                            Countdown, get_time, parse_duration)
+from render import Renderer
+from timeline import Sequence, Timeline
+
+
+class TerminalCountdown:
+    """A countdown drawn on one terminal line"""
+
+    def __init__(self, seconds, out=sys.stdout, keys=None, clock=time.monotonic):
+        self.clock = clock
+        self.countdown = Countdown(seconds, clock)
+        # Sequence being played, None for a single countdown
+        self.sequence = None
+        self.label = "countdown"
+        self.out = out
+        # File descriptor read for key presses, None without a keyboard
+        self.keys = keys
+        # Redraw the line in place on a terminal, append lines otherwise
+        self.in_place = out.isatty()
+        self.renderer = Renderer(clock)
+        self.renderer.add("line", self.draw)
+        self.done = False
+
+    def draw(self, text):
+        """Write the line, over the previous one on a terminal"""
+        if self.in_place:
+            self.out.write("\r\x1b[K" + text)
+        else:
+            self.out.write(text + "\n")
+        self.out.flush()
+
+    def text(self):
+        """Return the line showing the label and the time left"""
+        hours, minutes, seconds = get_time(self.countdown.time_left())
+        paused = "" if self.countdown.running else "  (paused)"
+        return f"{self.label} {hours:02d}:{minutes:02d}:{seconds:02d}{paused}"
+
+    def set(self, seconds, label="countdown"):
+        """Count down seconds from now, leaving any sequence"""
+        self.sequence = None
+        self.label = label
+        self.countdown.reset(seconds)
+        self.countdown.start()
+
+    def start_sequence(self, text):
+        """Compile a sequence and start its first segment"""
+        self.sequence = Sequence(Timeline.parse(text), self.clock)
+        self.sequence.start()
+        self.enter_segment()
+
+    def enter_segment(self):
+        """Count down what is left of the current segment of the sequence"""
+        self.label = self.sequence.segment.label
+        self.countdown.reset(self.sequence.remaining())
+        self.countdown.start()
+
+    def toggle(self):
+        """Pause a running countdown, resume a paused one"""
+        if self.countdown.running:
+            self.countdown.pause()
+            if self.sequence is not None:
+                self.sequence.pause()
+        else:
+            self.countdown.start()
+            if self.sequence is not None:
+                self.sequence.start()
+
+    def expire(self):
+        """Ring the bell and go on with the next segment, or finish"""
+        self.out.write("\a")
+        if self.sequence is not None and self.sequence.advance():
+            self.enter_segment()
+            return
+        self.renderer.set("line", "Time's up")
+        self.done = True
+
+    def press(self, key):
+        """Handle one key press"""
+        if key in (" ", "p"):
+            self.toggle()
+        elif key == "r":
+            self.set(RESET_VALUE)
+        elif key == "b":
+            self.set(BREAK_TIME, "break")
+        elif key == "q":
+            self.done = True
+
+    def run(self):
+        """Count down until the end, or until q is pressed"""
+        self.countdown.start()
+        while not self.done:
+            if self.countdown.running and self.countdown.expired():
+                self.expire()
+                continue
+            self.renderer.set("line", self.text())
+            # Wake up when the displayed second changes, never while paused
+            timeout = self.countdown.seconds_to_next_change() if self.countdown.running else None
+            if self.keys is None:
+                time.sleep(timeout)
+            elif select.select([self.keys], [], [], timeout)[0]:
+                self.press(os.read(self.keys, 1).decode(errors="ignore").lower())
+        if self.in_place:
+            self.out.write("\n")
+            self.out.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("duration", nargs="?",
+                        help="reset, break, or a duration as seconds, mm:ss or hh:mm:ss, "
+                             f"{INIT_TIME_LEFT_AMOUNT} seconds by default")
+    parser.add_argument("--sequence", nargs="?", const=SEQUENCE, metavar="SPEC",
+                        help=f'play a sequence, "{SEQUENCE}" by default')
+    args = parser.parse_args(argv)
+    if args.duration == "reset":
+        seconds, label = RESET_VALUE, "countdown"
+    elif args.duration == "break":
+        seconds, label = BREAK_TIME, "break"
+    else:
+        try:
+            seconds = parse_duration(args.duration) if args.duration else INIT_TIME_LEFT_AMOUNT
+        except ValueError as error:
+            parser.error(str(error))
+        label = "countdown"
+
+    # Read single key presses when both ends are a terminal
+    keys = None
+    if termios is not None and sys.stdin.isatty() and sys.stdout.isatty():
+        keys = sys.stdin.fileno()
+        saved = termios.tcgetattr(keys)
+        tty.setcbreak(keys)
+    countdown = TerminalCountdown(seconds, keys=keys)
+    countdown.label = label
+    try:
+        if args.sequence is not None:
+            try:
+                countdown.start_sequence(args.sequence)
+            except ValueError as error:
+                parser.error(str(error))
+        countdown.run()
+    except KeyboardInterrupt:
+        if countdown.in_place:
+            sys.stdout.write("\n")
+        return 130
+    finally:
+        if keys is not None:
+            termios.tcsetattr(keys, termios.TCSADRAIN, saved)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import logging
+import shutil
+import sys
+import types
+import wave
+
+import alarm
+
+
+class FakeWinSound(types.ModuleType):
+    SND_FILENAME, SND_ASYNC, SND_NODEFAULT = 0x20000, 0x1, 0x2
+
+    def __init__(self):
+        super().__init__("winsound")
+        self.played = []
+
+    def PlaySound(self, sound, flags):
+        if sound is not None:
+            with wave.open(sound, "rb") as file:
+                sound = file.getnframes()
+        self.played.append(sound)
+
+
+def test_device_falls_back_to_winsound(monkeypatch):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    winsound = FakeWinSound()
+    monkeypatch.setitem(sys.modules, "winsound", winsound)
+    player = alarm.make_alarm("device")
+    assert isinstance(player.sink, alarm.WinSoundSink)
+    sound = alarm.Sound.tone(beeps=1, beep=0.01, gap=0)
+    player.sink.open(sound)
+    player.sink.write(sound.frames)
+    player.sink.close()
+    player.close()
+    # The whole tone was played, then stopped
+    assert winsound.played == [len(sound.frames) // sound.frame_size, None]
+
+
+def test_missing_player_is_logged(monkeypatch, caplog):
+    monkeypatch.setattr(shutil, "which", lambda name: None)
+    monkeypatch.setitem(sys.modules, "winsound", None)
+    with caplog.at_level(logging.WARNING, logger="countdown.alarm"):
+        assert alarm.make_alarm("device") is None
+    assert "the alarm is silent" in caplog.text
@@ -0,0 +1,36 @@
+"""
+Budgets and behaviors the benchmarks measure, checked so that a
+regression fails instead of only printing a worse number.
+"""
+import pytest
+
+import benchmarks
+
+
+def test_simulated_day_runs_in_well_under_a_second():
+    pytest.importorskip("PyQt5")
+    result = benchmarks.simulated_day(blocks=8)
+    assert result["expired"] == 16
+    assert result["elapsed"] < 1.0
+
+
+def test_stalled_event_client_loses_events_without_slowing_the_timer():
+    result = benchmarks.status_stream(clients=(1,), ticks=10)[1]
+    assert result["events"] == 10
+    assert result["stalled_dropped"] > 0
+    assert result["lateness"][50] < 0.005
+
+
+def test_sixty_hertz_display_draws_every_refresh():
+    pytest.importorskip("PyQt5")
+    result = benchmarks.precision(seconds=3.0, rates=(60,))[60]["digits"]
+    # About 180 in 3 s, where skipping every other refresh draws 90
+    assert result["frames"] >= 150
+
+
+def test_idle_widget_memory_does_not_grow():
+    pytest.importorskip("PyQt5")
+    results = benchmarks.idle_cost(seconds=2, simulated_hours=6)
+    for state, result in results.items():
+        assert result["rss_growth"] <= 1024 * 1024, state
+        assert all(latency >= 0 for latency in result["latency"].values()), state
@@ -0,0 +1,81 @@
+import calendar
+import time
+
+import pytest
+
+from clock_alarms import ClockAlarm, ClockAlarms
+from countdown_core import FakeClock
+from scheduler import Scheduler
+
+needs_tzset = pytest.mark.skipif(not hasattr(time, "tzset"), reason="needs time.tzset")
+
+
+@pytest.fixture
+def zone(monkeypatch):
+    """Set the local timezone, a POSIX TZ string, for the test"""
+    def set_zone(tz):
+        monkeypatch.setenv("TZ", tz)
+        time.tzset()
+    yield set_zone
+    monkeypatch.undo()
+    time.tzset()
+
+
+def utc(*fields):
+    return calendar.timegm(fields + (0,) * (6 - len(fields)))
+
+
+def test_parse():
+    assert ClockAlarm.parse("12:30").days == tuple(range(7))
+    assert ClockAlarm.parse("17:55 weekdays").days == (0, 1, 2, 3, 4)
+    assert ClockAlarm.parse("08:00 wed,mon").days == (0, 2)
+    assert ClockAlarm.parse("07:05 once").once
+    assert str(ClockAlarm.parse("08:00 sat,sun")) == "08:00 weekends"
+    for text in ("", "12", "25:00", "12:60", "12:30 sometimes", "12:30 daily now"):
+        with pytest.raises(ValueError):
+            ClockAlarm.parse(text)
+
+
+@needs_tzset
+def test_next_after_keeps_the_time_of_day_across_a_dst_change(zone):
+    zone("CET-1CEST,M3.5.0,M10.5.0/3")
+    alarm = ClockAlarm.parse("12:00")
+    # Saturday noon CET, then Sunday noon CEST, 23 hours later
+    saturday = utc(2024, 3, 30, 11)
+    assert alarm.next_after(saturday) == utc(2024, 3, 31, 10)
+    # Back to CET in October, 25 hours later
+    assert alarm.next_after(utc(2024, 10, 26, 10)) == utc(2024, 10, 27, 11)
+
+
+@needs_tzset
+def test_alarms_ring_once_and_rebuild_after_a_clock_change(zone):
+    zone("UTC0")
+    # Tuesday 2023-11-14 22:13:20
+    clock = FakeClock()
+    scheduler = Scheduler(clock.monotonic)
+    rung = []
+    alarms = ClockAlarms(scheduler, clock.wall, lambda name, alarm: rung.append(name))
+    alarms.add("tea", ClockAlarm.parse("22:30"))
+    alarms.add("once", ClockAlarm.parse("22:20 once"))
+    assert alarms.next() == (utc(2023, 11, 14, 22, 20), "once")
+    assert scheduler.next_deadline() == pytest.approx(400)
+    clock.advance(17 * 60)
+    assert [name for name, alarm in alarms.run_due()] == ["once", "tea"]
+    assert len(alarms) == 1
+    assert alarms.next() == (utc(2023, 11, 15, 22, 30), "tea")
+    # The wall clock set three days ahead: the missed occurrences ring once
+    clock.step_wall(3 * 86400)
+    assert alarms.run_due() == [("tea", alarms.alarms["tea"])]
+    assert alarms.next() == (utc(2023, 11, 18, 22, 30), "tea")
+    assert rung == ["once", "tea", "tea"]
+
+
+def test_widget_starts_without_tzset(monkeypatch):
+    pytest.importorskip("PyQt5")
+    from benchmarks import qt_application
+    qt_application()
+    from countdown_app import CountdownWidget
+    monkeypatch.delattr(time, "tzset", raising=False)
+    widget = CountdownWidget(time_left=5, reset_value=60, break_time=30, clock=FakeClock())
+    widget.clock_alarms.add("tea", ClockAlarm.parse("12:00"))
+    assert len(widget.clock_alarms) == 1
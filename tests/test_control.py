@@ -0,0 +1,28 @@
+import os
+import socket
+
+import pytest
+
+import control
+
+pytestmark = pytest.mark.skipif(not control.AVAILABLE, reason="no Unix-domain sockets")
+
+
+def test_stop_without_connections(tmp_path):
+    server = control.ControlServer(str(tmp_path / "control.sock"), lambda command, args: {})
+    server.start()
+    server.stop()
+    assert not server._thread.is_alive()
+    assert not os.path.exists(server.path)
+
+
+def test_forward_to_an_instance_that_never_answers(tmp_path):
+    path = str(tmp_path / "control.sock")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen()
+    try:
+        reply = control.forward(["status"], path, timeout=0.1)
+    finally:
+        listener.close()
+    assert reply["ok"] is False
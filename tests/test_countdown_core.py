@@ -0,0 +1,8 @@
+import benchmarks
+
+
+def test_deadline_countdown_does_not_drift():
+    result = benchmarks.drift(duration=3600, max_lateness=0.05)
+    # Only the last late tick shows, where decrementing adds up every one
+    assert result["deadline_error"] <= 0.05
+    assert result["decrement_error"] > 60
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks import qt_application
+from countdown_core import FakeClock
+
+pytest.importorskip("PyQt5")
+
+
+def test_expiry_of_a_timer_being_removed_is_ignored():
+    qt_application()
+    from dashboard import TimersModel
+    from scheduler import Scheduler
+    clock = FakeClock()
+    model = TimersModel(Scheduler(clock.monotonic))
+    finished = []
+    model.finished.connect(finished.append)
+    model.add("tea", 60)
+    model.add("eggs", 60)
+    key = model.timers[1].key
+    # Delivered while the view is told the row goes away
+    model.rowsAboutToBeRemoved.connect(lambda *args: model.expire(key))
+    model.remove(1)
+    model.expire(key)
+    assert finished == []
+    assert key not in model.scheduler
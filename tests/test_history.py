@@ -0,0 +1,55 @@
+import csv
+import io
+import json
+import time
+
+import pytest
+
+from history import COLUMNS, History, Session
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = History(str(tmp_path / "history.sqlite3"), batch_size=2)
+    yield history
+    history.close()
+
+
+def at(day, hour):
+    return time.mktime(time.strptime(f"{day} {hour:02d}", "%Y-%m-%d %H"))
+
+
+def add(history, day, hour, preset, planned, remaining, outcome):
+    session = Session(preset, planned, started=at(day, hour))
+    history.add(session.end(outcome, remaining, ended=at(day, hour) + planned))
+
+
+def test_daily_totals_are_kept_by_the_trigger(history):
+    add(history, "2024-05-01", 9, "reset", 1500, 0, "finished")
+    add(history, "2024-05-01", 10, "break", 300, 0, "finished")
+    add(history, "2024-05-01", 11, "custom", 1500, 600, "aborted")
+    add(history, "2024-05-03", 9, "reset", 1500, 0, "finished")
+    history.flush()
+    # Breaks count as sessions, not as focus time
+    assert history.daily_totals("2024-05-01", "2024-05-31") == [
+        ("2024-05-01", 2400.0, 3, 2), ("2024-05-03", 1500.0, 1, 1)]
+    assert history.daily_totals("2024-05-02", "2024-05-02") == []
+    assert history.weekly_totals("2024-05-01", "2024-05-31") == [("2024-W18", 3900.0, 4, 3)]
+
+
+def test_export_streams_every_session(history):
+    add(history, "2024-05-01", 9, "reset", 1500, 0, "finished")
+    add(history, "2024-05-02", 9, "custom", 600, 100, "aborted")
+    history.flush()
+    output = io.StringIO()
+    history.export(output, "csv")
+    output.seek(0)
+    rows = list(csv.reader(output))
+    assert rows[0] == list(COLUMNS)
+    assert [(row[2], row[3], row[7]) for row in rows[1:]] == [
+        ("2024-05-01", "reset", "finished"), ("2024-05-02", "custom", "aborted")]
+    output = io.StringIO()
+    history.export(output, "jsonl", since=at("2024-05-02", 0))
+    assert [json.loads(line)["actual"] for line in output.getvalue().splitlines()] == [500.0]
+    with pytest.raises(ValueError):
+        history.export(io.StringIO(), "xml")
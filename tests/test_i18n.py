@@ -0,0 +1,10 @@
+import pytest
+
+import benchmarks
+
+
+def test_timer_behaves_identically_in_every_locale():
+    pytest.importorskip("PyQt5")
+    result = benchmarks.locales(runs=1)
+    assert len(result["locales"]) > 1
+    assert result["identical"]
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from countdown_core import Countdown, FakeClock
+from journal import Journal
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def open_journal(tmp_path, clock, **kwargs):
+    return Journal(str(tmp_path / "journal"), clock=clock.monotonic, wall_clock=clock.wall,
+                   **kwargs)
+
+
+def test_restore_skips_a_truncated_last_line(tmp_path, clock):
+    journal = open_journal(tmp_path, clock)
+    countdown = Countdown(300, clock.monotonic)
+    countdown.start()
+    journal.record("start", countdown)
+    journal.close()
+    # A crash cut the next line short
+    with open(journal.path, "a", encoding="ascii") as file:
+        file.write("pause 0 12")
+    clock.advance(100)
+    journal = open_journal(tmp_path, clock)
+    assert journal.restore() == ("start", True, pytest.approx(200), 300)
+    # The cut line is terminated before the next one is appended
+    countdown.pause()
+    journal.record("pause", countdown)
+    journal.close()
+    assert journal.restore() == ("pause", False, pytest.approx(200), 300)
+
+
+def test_long_journal_is_compacted_to_its_last_line(tmp_path, clock):
+    journal = open_journal(tmp_path, clock, compact_after=10)
+    countdown = Countdown(60, clock.monotonic)
+    for seconds in range(1, 26):
+        countdown.reset(seconds)
+        journal.record("edit", countdown)
+    journal.close()
+    with open(journal.path, encoding="ascii") as file:
+        lines = file.read().splitlines()
+    # Compacted at the 10th and 19th lines, the last of them kept
+    assert lines == [f"edit 0 {seconds}.000 {seconds}" for seconds in range(19, 26)]
+    assert not os.path.exists(journal.path + ".tmp")
+    assert journal.restore() == ("edit", False, 25.0, 25.0)
+
+
+def test_sync_is_batched_and_skipped_when_clean(tmp_path, clock, monkeypatch):
+    synced = []
+    monkeypatch.setattr(os, "fsync", synced.append)
+    journal = open_journal(tmp_path, clock, fsync_interval=5.0)
+    countdown = Countdown(60, clock.monotonic)
+    journal.record("start", countdown)
+    journal.record("pause", countdown)
+    # Both lines wait for the fsync interval
+    assert synced == []
+    clock.advance(5)
+    journal.sync()
+    assert len(synced) == 1
+    # Nothing changed since, so nothing is written however long it waits
+    clock.advance(60)
+    journal.sync()
+    journal.sync(force=True)
+    assert len(synced) == 1
@@ -0,0 +1,86 @@
+import pytest
+
+from countdown_core import FakeClock
+from metrics import Histogram, Metrics
+
+
+class Timer:
+    def interval(self):
+        return 1000
+
+
+def make_widget_class(clock):
+    class Widget:
+        def __init__(self):
+            self.clock = clock
+            self.timer = Timer()
+            self.ticks = 0
+
+        def schedule_tick(self):
+            pass
+
+        def update_timer(self):
+            self.ticks += 1
+            # Each tick takes 2 ms of the metrics' clock
+            clock.advance(0.002)
+
+        def update_tray_icon(self):
+            return "icon"
+
+    return Widget
+
+
+def test_instrument_counts_and_times_calls():
+    clock = FakeClock()
+    metrics = Metrics(clock=clock.monotonic)
+    Widget = make_widget_class(clock)
+    update_tray_icon = Widget.update_tray_icon
+    metrics.instrument(Widget, names=("update_timer", "update_tray_icon"))
+    assert Widget.update_tray_icon is not update_tray_icon
+    assert Widget.update_tray_icon.__name__ == "update_tray_icon"
+    widget = Widget()
+    for _ in range(3):
+        widget.schedule_tick()
+        clock.advance(1.25)
+        widget.update_timer()
+    assert widget.update_tray_icon() == "icon"
+    assert widget.ticks == 3
+    timing = metrics.histograms["update_timer"]
+    assert timing.count == 3
+    assert timing.sum == pytest.approx(0.006)
+    assert metrics.histograms["update_tray_icon"].count == 1
+    # Armed for 1 s, each tick fired 250 ms late
+    lateness = metrics.histograms["tick_lateness"]
+    assert lateness.count == 3
+    assert lateness.sum == pytest.approx(0.75)
+    # A tick that was never armed has no lateness
+    widget.update_timer()
+    assert lateness.count == 3
+
+
+def test_histogram_quantile_is_a_bucket_bound():
+    histogram = Histogram(bounds=(0.001, 0.01, 0.1))
+    for value in (0.0005, 0.001, 0.005, 0.05, 1.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == 0.001
+    assert histogram.quantile(0.8) == 0.1
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_text_is_in_the_prometheus_exposition_format(tmp_path):
+    metrics = Metrics(path=str(tmp_path / "metrics.prom"))
+    metrics.histograms["tick"] = Histogram(bounds=(0.001, 0.01))
+    metrics.observe("tick", 0.0005)
+    metrics.observe("tick", 0.005)
+    metrics.observe("tick", 0.5)
+    expected = (
+        "# TYPE countdown_tick_seconds histogram\n"
+        'countdown_tick_seconds_bucket{le="0.001"} 1\n'
+        'countdown_tick_seconds_bucket{le="0.01"} 2\n'
+        'countdown_tick_seconds_bucket{le="+Inf"} 3\n'
+        "countdown_tick_seconds_sum 0.505500000\n"
+        "countdown_tick_seconds_count 3\n")
+    assert metrics.text() == expected
+    metrics.dump()
+    assert (tmp_path / "metrics.prom").read_text(encoding="ascii") == expected
@@ -0,0 +1,22 @@
+from countdown_core import FakeClock
+from notifications import NotificationDispatcher
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.shown = []
+
+    def show(self, title, message):
+        self.shown.append((title, message))
+
+
+def test_different_messages_with_one_title_are_all_shown():
+    clock = FakeClock()
+    backend = RecordingBackend()
+    dispatcher = NotificationDispatcher(backend, clock)
+    dispatcher.notify("Time's up", "tea is done")
+    dispatcher.notify("Time's up", "eggs are done")
+    dispatcher.notify("Time's up", "tea is done")
+    clock.advance(5)
+    assert backend.shown == [("Time's up", "eggs are done"), ("Time's up", "tea is done")]
+    assert dispatcher.coalesced == 1
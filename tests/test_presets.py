@@ -0,0 +1,69 @@
+import pytest
+
+import presets
+from presets import Preset, PresetLibrary
+
+
+PRESETS = """\
+# Kitchen
+4:00 green tea #kitchen #tea
+3m black tea #kitchen #tea
+7m soft eggs #kitchen
+25m pomodoro #work
+50m deep work #work
+"""
+
+
+@pytest.fixture
+def paths(tmp_path):
+    path = tmp_path / "presets.txt"
+    path.write_text(PRESETS, encoding="utf-8")
+    return str(path), str(tmp_path / "presets.cache")
+
+
+def test_cache_round_trip_skips_parsing(paths, monkeypatch):
+    parsed = PresetLibrary(*paths)
+    assert parsed.refresh()
+    assert parsed.presets[0] == Preset("green tea", 240, ("kitchen", "tea"))
+
+    def parse_presets(lines):
+        raise AssertionError("parsed despite an up-to-date cache")
+
+    monkeypatch.setattr(presets, "parse_presets", parse_presets)
+    cached = PresetLibrary(*paths)
+    assert cached.refresh()
+    assert cached.presets == parsed.presets
+    assert cached.tags == parsed.tags
+    assert cached.search("te") == parsed.search("te")
+    assert not cached.refresh()
+
+
+def test_cache_is_ignored_once_the_file_changes(paths):
+    path, cache_path = paths
+    PresetLibrary(path, cache_path).refresh()
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("10m stretch #health\n")
+    library = PresetLibrary(path, cache_path)
+    library.refresh()
+    assert library.find("Stretch") == Preset("stretch", 600, ("health",))
+    # A damaged or empty cache is parsed over
+    for content in (b"garbage", b""):
+        with open(cache_path, "wb") as file:
+            file.write(content)
+        library = PresetLibrary(path, cache_path)
+        library.refresh()
+        assert len(library) == 6
+
+
+def test_prefix_matches_come_before_fuzzy_ones(paths):
+    library = PresetLibrary(*paths)
+    library.refresh()
+    # Words starting with "te" (the tags of both teas), then names holding
+    # t, e in order
+    assert [preset.name for preset in library.search("te")] == [
+        "green tea", "black tea", "soft eggs"]
+    assert [preset.name for preset in library.search("Work")] == ["pomodoro", "deep work"]
+    assert [preset.name for preset in library.search("dwk")] == ["deep work"]
+    assert [preset.name for preset in library.search("tea", limit=1)] == ["green tea"]
+    assert library.search("zz") == []
+    assert len(library.search("  ")) == 5
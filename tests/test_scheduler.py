@@ -0,0 +1,14 @@
+from scheduler import Scheduler
+
+
+def test_early_wakeup_is_armed_again_for_the_same_deadline():
+    now = 0.0
+    scheduler = Scheduler(clock=lambda: now)
+    armed = []
+    scheduler.on_rearm = armed.append
+    scheduler.add_countdown("countdown", 10)
+    scheduler.start("countdown")
+    assert scheduler.run_due(9.999) == []
+    assert armed[-1] == 10.0
+    assert scheduler.run_due(10.0) == ["countdown"]
+    assert armed[-1] is None
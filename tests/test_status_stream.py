@@ -0,0 +1,8 @@
+from status_stream import StatusStream
+
+
+def test_stop_without_subscribers():
+    stream = StatusStream()
+    stream.start()
+    stream.stop()
+    assert not stream._thread.is_alive()
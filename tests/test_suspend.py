@@ -0,0 +1,39 @@
+import pytest
+
+import benchmarks
+from countdown_core import FakeClock
+from suspend import SuspendDetector
+
+
+def test_wall_clock_step_is_not_a_suspend_without_boot_time():
+    clock = FakeClock(counts_suspend=False)
+    detector = SuspendDetector(clock)
+    clock.step_wall(3600)
+    assert detector.check() == 0
+    clock.suspend(600)
+    assert detector.check() == 0
+
+
+def test_announced_suspend_is_measured_on_the_wall_clock():
+    clock = FakeClock(counts_suspend=False)
+    detector = SuspendDetector(clock)
+    detector.announce(True)
+    clock.suspend(600)
+    detector.announce(False)
+    assert detector.check() == 600
+    assert detector.check() == 0
+
+
+def test_suspend_catches_up_to_the_right_segment():
+    pytest.importorskip("PyQt5")
+    results = benchmarks.suspend()
+    for case in ("boot time, next tick", "boot time, logind resume",
+                 "no boot time, logind resume"):
+        result = results[case]
+        assert result["segment"] == result["expected"], case
+        assert abs(result["error"]) < 1, case
+        # Missed transitions are coalesced into one
+        assert result["transitions"] == 1, case
+    # Without boot time nor an announced suspend, nothing tells a suspend
+    for case in ("no boot time, next tick", "no catch-up"):
+        assert results[case]["segment"] != results[case]["expected"], case
@@ -0,0 +1,50 @@
+import io
+import time
+
+import pytest
+
+from countdown_core import FakeClock
+from terminal import TerminalCountdown
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    sleeps = clock.sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.advance(seconds)
+
+    monkeypatch.setattr(time, "sleep", sleep)
+    return clock
+
+
+def test_every_second_is_drawn_once_until_zero(clock):
+    out = io.StringIO()
+    countdown = TerminalCountdown(3, out=out, clock=clock.monotonic)
+    countdown.run()
+    assert out.getvalue() == ("countdown 00:00:03\n"
+                              "countdown 00:00:02\n"
+                              "countdown 00:00:01\n"
+                              "\aTime's up\n")
+    # One wakeup per displayed second, none in between
+    assert clock.sleeps == [1.0, 1.0, 1.0]
+    assert clock.monotonic() == 3.0
+
+
+def test_terminal_line_is_redrawn_in_place(clock):
+    out = Terminal()
+    countdown = TerminalCountdown(0, out=out, clock=clock.monotonic)
+    countdown.start_sequence("2s work, 1s break")
+    countdown.run()
+    assert out.getvalue() == ("\r\x1b[Kwork 00:00:02"
+                              "\r\x1b[Kwork 00:00:01"
+                              "\a\r\x1b[Kbreak 00:00:01"
+                              "\a\r\x1b[KTime's up\n")
+    assert clock.monotonic() == 3.0
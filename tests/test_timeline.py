@@ -0,0 +1,41 @@
+import pytest
+
+from countdown_core import FakeClock
+from timeline import Segment, Sequence, Timeline, parse_sequence
+
+
+def test_parse_sequence_flattens_repeats():
+    assert parse_sequence("2x(50m work, 10m break), 30m long-break") == [
+        Segment("work", 3000), Segment("break", 600), Segment("work", 3000),
+        Segment("break", 600), Segment("long-break", 1800)]
+
+
+@pytest.mark.parametrize("text", [
+    "", "   ", "x(25m, 5m break)", "2x(25m, 5m break", "2x()", "25m, , 5m",
+    "25q work", "25m work extra", "0m"])
+def test_parse_sequence_rejects(text):
+    with pytest.raises(ValueError):
+        parse_sequence(text)
+
+
+def test_advance_lands_on_the_segment_after_several_boundaries():
+    clock = FakeClock()
+    timeline = Timeline.parse("3x(10m work, 5m break), 20m long-break")
+    sequence = Sequence(timeline, clock.monotonic)
+    sequence.start()
+    # Asleep through the end of four segments, 2 minutes into the fifth
+    clock.advance(32 * 60)
+    assert sequence.advance()
+    assert sequence.index == 4
+    assert sequence.segment == Segment("work", 600)
+    assert sequence.remaining() == pytest.approx(8 * 60)
+    # Skipping drops the rest of the current segment
+    assert sequence.advance()
+    assert sequence.index == 5
+    assert sequence.elapsed() == pytest.approx(40 * 60)
+    clock.advance(5 * 60)
+    assert sequence.advance()
+    assert sequence.segment.label == "long-break"
+    clock.advance(20 * 60)
+    assert not sequence.advance()
+    assert sequence.finished
@@ -0,0 +1,11 @@
+import pytest
+
+import benchmarks
+
+
+def test_worker_expiry_is_on_time_while_the_gui_is_blocked():
+    pytest.importorskip("PyQt5")
+    result = benchmarks.worker_expiry(rounds=10, delay=0.05, block=0.2)
+    assert result["worker thread fired"][99] < 0.02
+    # The GUI thread only hears of it once unblocked
+    assert result["GUI-thread wakeup"][50] > 0.1
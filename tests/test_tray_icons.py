@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from tray_icons import TrayIconRenderer
+
+
+def frames(renderer, seconds, duration):
+    keys = []
+    for remaining in seconds:
+        progress = 1.0 - remaining / duration if duration > 0 else 1.0
+        key = renderer.key(remaining, progress)
+        if not keys or keys[-1] != key:
+            keys.append(key)
+    return keys
+
+
+@pytest.mark.parametrize("time_left, duration", [
+    (3600, 3600), (1500, 3600), (7 * 3600 + 13, 24 * 3600), (59, 59), (0, 0), (10, 0)])
+def test_changes_cover_every_frame(time_left, duration):
+    renderer = TrayIconRenderer()
+    every_second = frames(renderer, range(time_left, -1, -1), duration)
+    assert frames(renderer, renderer.changes(time_left, duration), duration) == every_second
@@ -0,0 +1,125 @@
+import pytest
+
+from benchmarks import qt_application
+from countdown_core import FakeClock
+
+pytest.importorskip("PyQt5")
+
+
+@pytest.fixture
+def widget():
+    qt_application()
+    from countdown_app import CountdownWidget
+    clock = FakeClock()
+    widget = CountdownWidget(time_left=5, reset_value=60, break_time=30, clock=clock)
+    widget.create_layout_menu()
+    widget.notifications = []
+    widget.show_notification = lambda title, message: widget.notifications.append(title)
+    return widget
+
+
+def test_stale_queued_expiry_is_ignored(widget):
+    widget.start()
+    widget.clock.advance(6)
+    assert widget.notifications.count("Time's up") == 1
+    # Reset before a late delivery of the same expiry
+    widget.custom_countdown()
+    widget.expire(widget.name)
+    assert widget.notifications.count("Time's up") == 1
+    assert widget.countdown.running
+
+
+class RecordingAlarm:
+    def __init__(self):
+        self.calls = []
+
+    def play(self):
+        self.calls.append("play")
+
+    def stop(self):
+        self.calls.append("stop")
+
+    def prepare(self):
+        self.calls.append("prepare")
+
+
+def test_next_segment_keeps_the_alarm_ringing(widget):
+    widget.alarm = RecordingAlarm()
+    widget.start_sequence("2x(1m work, 30s break)")
+    widget.alarm.calls.clear()
+    widget.clock.advance(61)
+    assert "play" in widget.alarm.calls
+    assert "stop" not in widget.alarm.calls
+    # An explicit start silences it
+    widget.start()
+    assert widget.alarm.calls[-2:] == ["stop", "prepare"]
+
+
+def test_refined_sync_moves_the_deadline_in_place(widget):
+    state = {"event": "reset", "running": True, "remaining": 60, "duration": 60,
+             "deadline": widget.clock.wall() + 60, "preset": "reset"}
+    widget.apply_sync(state)
+    session = widget.session
+    widget.clock.advance(10)
+    widget.apply_sync(dict(state, deadline=state["deadline"] + 0.5, refined=True))
+    assert widget.session is session
+    assert widget.countdown.running
+    assert widget.countdown.remaining() == pytest.approx(50.5)
+
+
+def test_dashboard_is_translated():
+    qt_application()
+    from countdown_app import CountdownWidget
+    from i18n import load_catalog
+    widget = CountdownWidget(time_left=5, reset_value=60, break_time=30, clock=FakeClock(),
+                             catalog=load_catalog("zh"))
+    widget.open_dashboard()
+    model = widget.dashboard.model
+    model.add("tea", 240)
+    assert widget.dashboard.windowTitle() == "多计时器面板"
+    assert model.data(model.index(0, model.START)) == "开始"
+
+
+def test_hidden_tray_text_is_never_stale(widget):
+    widget.time_left_action.setText("")
+    widget.countdown.duration = 125
+    widget.scheduler.reset(widget.name, 125)
+    widget.start()
+    # Ticking every 10 s while hidden, the tray shows whole minutes
+    widget.clock.advance(63.5)
+    assert widget.tray_icon.toolTip() == "Time left: 2 min"
+    widget.clock.advance(2)
+    assert widget.tray_icon.toolTip() == "Time left: 1 min"
+    # The menu opens on the time left at that moment
+    widget.tray_icon.contextMenu().aboutToShow.emit()
+    assert widget.time_left_action.text() == "Time left: 1 min"
+
+
+def test_editing_the_time_records_one_session_boundary(widget):
+    from PyQt5.QtCore import QTime
+    rows = []
+    widget.history = type("History", (), {"add": staticmethod(rows.append)})()
+    widget.open_window()
+    widget.start()
+    widget.clock.advance(2)
+    # Each step of the edit changes the time, only its end is a boundary
+    for seconds in (10, 20, 30):
+        widget.time_edit.setTime(QTime(0, 0, seconds))
+    assert rows == []
+    widget.clock.advance(1)
+    widget.time_edit.editingFinished.emit()
+    assert [(row[3], row[5], row[7]) for row in rows] == [("custom", 3.0, "aborted")]
+    assert widget.session.planned == pytest.approx(29)
+    widget.time_edit.editingFinished.emit()
+    assert len(rows) == 1
+
+
+def test_unknown_command_is_a_usage_error(monkeypatch, capsys):
+    import control
+    import countdown_app
+    monkeypatch.setattr(control, "forward", lambda command: None)
+    monkeypatch.setattr(countdown_app, "create_app", pytest.fail)
+    assert countdown_app.main(["count_down_en.py", "frobnicate"]) == 1
+    error = capsys.readouterr().err
+    assert error.startswith("unknown command: 'frobnicate'")
+    assert "Run ``python control.py <command> [args]``" in error
@@ -0,0 +1,168 @@
+"""
+Programmable countdown sequences, such as Pomodoro blocks.
+
+A sequence like ``4x(50m work, 10m break), 30m long-break`` is compiled
+once into a timeline: the list of its segments and the offsets at which
+each of them ends. Playing it needs a single countdown over the whole
+timeline. The current segment, skipping ahead and progress all come from a
+binary search of the elapsed time over the end offsets. Transitions happen
+when the display countdown of a segment expires, without any per-second
+state, and landing several boundaries ahead, after a suspend for example,
+costs the same O(log n) search as the next one.
+"""
+import bisect
+import collections
+import itertools
+import re
+import time
+
+from countdown_core import Countdown, parse_duration
+
+
+# One segment of a timeline, label is "work", "break", "long-break"...
+Segment = collections.namedtuple("Segment", "label seconds")
+
+# Seconds per duration unit in a sequence
+UNITS = {"h": 3600, "m": 60, "s": 1}
+
+TOKENS = re.compile(r"\s*(?:(\d+)\s*[x×]\s*\(|([(),])|([^(),]+))")
+
+
+def is_break(segment):
+    """Whether a segment is a break, whose time does not count as focus"""
+    return segment.label == "break" or segment.label.endswith("-break")
+
+
+def parse_segment(text):
+    """Parse ``<duration> [label]``, the duration in seconds, mm:ss, hh:mm:ss or 50m"""
+    words = text.split()
+    if not 1 <= len(words) <= 2:
+        raise ValueError(f"invalid segment: {text.strip()!r}")
+    duration = words[0]
+    if duration[-1:] in UNITS and duration[:-1].isdigit():
+        seconds = int(duration[:-1]) * UNITS[duration[-1]]
+    else:
+        seconds = parse_duration(duration)
+    if seconds <= 0:
+        raise ValueError(f"empty segment: {text.strip()!r}")
+    return Segment(words[1] if len(words) == 2 else "work", seconds)
+
+
+def parse_sequence(text):
+    """
+    Parse a comma-separated list of segments and ``N x (...)`` repeats
+    and return the flat list of segments
+    """
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKENS.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"invalid sequence: {text!r}")
+        tokens.append(match.groups())
+        position = match.end()
+
+    def items(index, nested):
+        segments = []
+        while index < len(tokens):
+            repeat, punctuation, segment = tokens[index]
+            if repeat is not None:
+                inner, index = items(index + 1, True)
+                segments.extend(inner * int(repeat))
+            elif segment is not None:
+                segments.append(parse_segment(segment))
+                index += 1
+            else:
+                raise ValueError(f"unexpected {punctuation!r} in sequence: {text!r}")
+            if index < len(tokens) and tokens[index][1] == ",":
+                index += 1
+            elif index < len(tokens) and tokens[index][1] == ")" and nested:
+                return segments, index + 1
+            elif index < len(tokens):
+                raise ValueError(f"expected ',' in sequence: {text!r}")
+        if nested:
+            raise ValueError(f"missing ')' in sequence: {text!r}")
+        return segments, index
+
+    segments, _ = items(0, False)
+    if not segments:
+        raise ValueError(f"empty sequence: {text!r}")
+    return segments
+
+
+class Timeline:
+    """Segments and the offsets at which each of them ends"""
+
+    def __init__(self, segments):
+        self.segments = list(segments)
+        # Seconds from the start of the timeline to the end of each segment
+        self.ends = list(itertools.accumulate(segment.seconds for segment in self.segments))
+        self.total = self.ends[-1] if self.ends else 0
+
+    @classmethod
+    def parse(cls, text):
+        return cls(parse_sequence(text))
+
+    def __len__(self):
+        return len(self.segments)
+
+    def index_at(self, elapsed):
+        """Return the index of the segment holding elapsed, len(self) past the end"""
+        return bisect.bisect_right(self.ends, elapsed)
+
+    def start(self, index):
+        """Return the offset at which a segment starts"""
+        return self.ends[index - 1] if index else 0
+
+
+class Sequence:
+    """A timeline being played, on one countdown over its whole length"""
+
+    def __init__(self, timeline, clock=time.monotonic):
+        self.timeline = timeline
+        self.countdown = Countdown(timeline.total, clock)
+        # Index of the segment being counted down
+        self.index = 0
+
+    @property
+    def segment(self):
+        return self.timeline.segments[self.index]
+
+    @property
+    def finished(self):
+        return self.index >= len(self.timeline)
+
+    def elapsed(self):
+        return self.timeline.total - self.countdown.remaining()
+
+    def remaining(self):
+        """Return the seconds left in the current segment"""
+        return max(0.0, self.timeline.ends[self.index] - self.elapsed())
+
+    def progress(self):
+        """Return the elapsed fraction of the whole timeline"""
+        return self.elapsed() / self.timeline.total
+
+    def start(self):
+        self.countdown.start()
+
+    def pause(self):
+        self.countdown.pause()
+
+    def advance(self):
+        """
+        Move to the next segment, or to the one holding the elapsed time
+        when several boundaries were passed, skipping the rest of the
+        current one; return False once the timeline is finished
+        """
+        index = max(self.index + 1, self.timeline.index_at(self.elapsed()))
+        self.index = min(index, len(self.timeline))
+        if self.finished:
+            self.countdown.reset(0)
+            return False
+        start = self.timeline.start(self.index)
+        if self.elapsed() < start:
+            # Skipped ahead, or the display countdown expired a hair early
+            self.countdown.reset(self.timeline.total - start)
+        return True
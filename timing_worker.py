@@ -0,0 +1,83 @@
+"""
+Timing core running on a dedicated worker thread.
+
+The scheduler's single wakeup is a QTimer living in a QThread with its own
+event loop, so expiries are processed on time even while the GUI thread is
+stuck in a slow native call or a blocking notification backend. State
+changes are posted back to the GUI through queued signals.
+"""
+import math
+from collections import deque
+
+from PyQt5.QtCore import QObject, QThread, QTimer, Qt, pyqtSignal, pyqtSlot
+
+
+class TimingWorker(QObject):
+    """Arm the scheduler's wakeup and fire its expiries on a worker thread"""
+
+    # Emitted on the worker thread with the name of an expired entry,
+    # delivered to GUI-thread receivers through a queued connection
+    expired = pyqtSignal(object)
+    # Carries a new deadline from any thread to the worker thread
+    rearm_requested = pyqtSignal(object)
+
+    def __init__(self, scheduler, history=256):
+        super().__init__()
+        self.scheduler = scheduler
+        # Seconds between each deadline and the moment the worker fired it
+        self.lateness = deque(maxlen=history)
+        self.wakeup = None
+        self._deadline = None
+        self.thread = QThread()
+        self.thread.setObjectName("timing-worker")
+        self.moveToThread(self.thread)
+        self.thread.started.connect(self._create_wakeup)
+        self.rearm_requested.connect(self._rearm)
+
+    def start(self):
+        """Start the worker thread"""
+        self.thread.start()
+
+    def stop(self):
+        """Stop the worker thread and wait for it to finish"""
+        self.thread.quit()
+        self.thread.wait()
+
+    def arm(self, deadline):
+        """Arm the wakeup for deadline, or disarm it for None; callable from any thread"""
+        self.rearm_requested.emit(deadline)
+
+    def fire(self, name):
+        """Scheduler callback, runs on the worker thread"""
+        self.expired.emit(name)
+
+    @pyqtSlot()
+    def _create_wakeup(self):
+        # Created here so that the timer belongs to the worker thread
+        self.wakeup = QTimer()
+        self.wakeup.setSingleShot(True)
+        self.wakeup.setTimerType(Qt.PreciseTimer)
+        self.wakeup.timeout.connect(self._run_due)
+        if self._deadline is not None:
+            self._rearm(self._deadline)
+
+    @pyqtSlot(object)
+    def _rearm(self, deadline):
+        self._deadline = deadline
+        if self.wakeup is None:
+            return
+        if deadline is None:
+            self.wakeup.stop()
+            return
+        delay = max(0.0, deadline - self.scheduler.clock())
+        self.wakeup.start(math.ceil(delay * 1000))
+
+    @pyqtSlot()
+    def _run_due(self):
+        deadline = self._deadline
+        now = self.scheduler.clock()
+        if self.scheduler.run_due(now) and deadline is not None:
+            self.lateness.append(now - deadline)
+        # Arm again for the earliest deadline, unchanged when the timer
+        # fired a little early and nothing was due yet
+        self._rearm(self.scheduler.next_deadline())
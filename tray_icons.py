@@ -0,0 +1,126 @@
+"""
+Dynamic tray icons showing the minutes left and a progress ring.
+
+Frames are keyed by what they display rather than by the exact time left,
+so a whole minute of ticks maps to a handful of frames. Painted frames are
+kept in a bounded LRU cache, and the frames a countdown is going to need
+can be painted ahead of time when it starts, so that a tick only looks up
+an existing QIcon.
+"""
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtGui import QColor, QFont, QIcon, QPainter, QPen, QPixmap
+
+
+class TrayIconRenderer:
+    """Paint and cache tray icon frames by display state"""
+
+    # Number of distinct positions of the progress ring
+    PROGRESS_STEPS = 60
+
+    def __init__(self, size=64, capacity=256):
+        # Width and height of the painted frames in pixels
+        self.size = size
+        # Largest number of frames kept in the cache
+        self.capacity = capacity
+        # Painted QIcons by display state, least recently used first
+        self.frames = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, time_left, progress):
+        """Return the display state of a frame"""
+        minutes = (time_left + 59) // 60
+        text = f"{minutes}" if minutes < 100 else f"{minutes // 60}h"
+        step = round(min(max(progress, 0.0), 1.0) * self.PROGRESS_STEPS)
+        return text, step
+
+    def icon(self, time_left, progress):
+        """Return the icon for the time left, painting it only on a cache miss"""
+        key = self.key(time_left, progress)
+        frame = self.frames.get(key)
+        if frame is not None:
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+        self.misses += 1
+        frame = self.paint(*key)
+        self.frames[key] = frame
+        if len(self.frames) > self.capacity:
+            self.frames.popitem(last=False)
+        return frame
+
+    def prewarm(self, time_left, duration):
+        """
+        Paint the frames a countdown of duration seconds will show from
+        time_left down to zero, as far as the cache can hold them
+        """
+        keys = []
+        for remaining in self.changes(time_left, duration):
+            progress = 1.0 - remaining / duration if duration > 0 else 1.0
+            key = self.key(remaining, progress)
+            if not keys or keys[-1] != key:
+                keys.append(key)
+            if len(keys) >= self.capacity:
+                break
+        # Paint the last frames first, so the ones shown next stay
+        # the most recently used
+        for key in reversed(keys):
+            if key not in self.frames:
+                self.misses += 1
+                self.frames[key] = self.paint(*key)
+            else:
+                self.frames.move_to_end(key)
+        while len(self.frames) > self.capacity:
+            self.frames.popitem(last=False)
+
+    def changes(self, time_left, duration):
+        """
+        Return the seconds left, from time_left down to zero, on either
+        side of every minute and progress step boundary, so that every
+        frame the countdown shows is keyed by one of them at least
+        """
+        seconds = {time_left, 0}
+        # Minutes are shown below 100, whole hours from there on
+        for minutes in range(min(time_left // 60, 100) + 1):
+            seconds.update((60 * minutes, 60 * minutes + 1))
+        for hours in range(1, time_left // 3600 + 2):
+            seconds.update((3600 * hours - 60, 3600 * hours - 59))
+        if duration > 0:
+            for step in range(self.PROGRESS_STEPS):
+                boundary = int(duration * (1 - (step + 0.5) / self.PROGRESS_STEPS))
+                seconds.update((boundary - 1, boundary, boundary + 1))
+        return sorted((second for second in seconds if 0 <= second <= time_left),
+                      reverse=True)
+
+    def paint(self, text, step):
+        """Paint one frame with the text inside a progress ring"""
+        pixmap = QPixmap(self.size, self.size)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        width = self.size / 10
+        rect = QRectF(width / 2, width / 2, self.size - width, self.size - width)
+
+        # Remaining part of the ring, then the elapsed part on top
+        pen = QPen(QColor(90, 90, 90))
+        pen.setWidthF(width)
+        painter.setPen(pen)
+        painter.drawEllipse(rect)
+        if step:
+            pen = QPen(QColor(220, 60, 50))
+            pen.setWidthF(width)
+            pen.setCapStyle(Qt.FlatCap)
+            painter.setPen(pen)
+            span = -int(360 * 16 * step / self.PROGRESS_STEPS)
+            painter.drawArc(rect, 90 * 16, span)
+
+        font = QFont("Arial")
+        font.setBold(True)
+        font.setPixelSize(int(self.size * (0.5 if len(text) < 3 else 0.36)))
+        painter.setFont(font)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignCenter, text)
+        painter.end()
+        return QIcon(pixmap)